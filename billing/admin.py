@@ -3,18 +3,21 @@ from .models import Payment, InvoiceSequence, PaymentReceipt
 
 @admin.register(Payment)
 class BillingPaymentAdmin(admin.ModelAdmin):
-    list_display = ("id", "order", "amount", "currency", "status", "created_at")
-    list_filter = ("status", "currency")
+    list_display = ("id", "order", "method", "amount", "currency", "status", "created_at")
+    list_filter = ("status", "method", "currency")
     search_fields = ("reference",)
     autocomplete_fields = ("order",)
 
 @admin.register(InvoiceSequence)
 class InvoiceSequenceAdmin(admin.ModelAdmin):
-    list_display = ("prefix", "last_number")
+    list_display = ("prefix", "location", "last_number", "gapless", "updated_at")
+    list_filter = ("gapless",)
     search_fields = ("prefix",)
+    readonly_fields = ("last_number",)
 
 @admin.register(PaymentReceipt)
 class PaymentReceiptAdmin(admin.ModelAdmin):
-    list_display = ("receipt_no", "payment", "issued_at")
-    search_fields = ("receipt_no",)
+    list_display = ("receipt_no", "order", "payment", "file_name", "issued_at")
+    search_fields = ("receipt_no", "file_name")
     autocomplete_fields = ("payment",)
+    raw_id_fields = ("order", "generated_by")
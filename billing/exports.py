@@ -0,0 +1,20 @@
+from core.exports import Export, register
+from .models import Payment
+
+register(Export(
+    name="payments",
+    description="Billing payments with their order's location, by creation time",
+    queryset=lambda: Payment.objects.all(),
+    columns=[
+        ("id", "id"),
+        ("order", "order_id"),
+        ("location", "order__location_id"),
+        ("method", "method"),
+        ("amount", "amount"),
+        ("currency", "currency"),
+        ("status", "status"),
+        ("reference", "reference"),
+        ("created_at", "created_at"),
+    ],
+    location_field="order__location",
+))
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from billing.services import receipt_data, render_receipt_pdf
+
+
+def sample_data(items):
+    return {
+        "org_name": "Benchmark Kitchen",
+        "org_address": "Putalisadak, Kathmandu",
+        "org_phone": "+977-1-5550000",
+        "invoice_no": "INV1-000001",
+        "date": "2025-01-01 12:00",
+        "service": "DINE_IN",
+        "customer": "Walk-in",
+        "items": [(f"Menu item {i}", "2", "NPR 250.00", "NPR 500.00") for i in range(items)],
+        "totals": [("Subtotal:", f"NPR {500 * items}.00"), ("Total:", f"NPR {500 * items}.00"),
+                   ("Paid:", f"NPR {500 * items}.00")],
+        "payments": [("Card (Stripe)", f"NPR {500 * items}.00")],
+        "qr": "Order: INV1-000001\nTotal: NPR 500.00\nDate: 2025-01-01",
+    }
+
+
+class Command(BaseCommand):
+    help = "Render receipts in memory (no DB, no storage) and report receipts per second."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=200)
+        parser.add_argument("--items", type=int, default=8, help="Lines per synthetic receipt.")
+        parser.add_argument("--order", type=int, help="Render this order's receipt instead of synthetic data.")
+
+    def handle(self, *args, **opts):
+        if opts["order"]:
+            from orders.models import Order
+            order = Order.objects.select_related("location__organization").filter(pk=opts["order"]).first()
+            if order is None:
+                raise CommandError(f"Order {opts['order']} not found")
+            data = receipt_data(order)
+        else:
+            data = sample_data(opts["items"])
+
+        render_receipt_pdf(data)  # warm up fonts and styles
+        count = opts["count"]
+        size = 0
+        start = time.perf_counter()
+        for _ in range(count):
+            size += len(render_receipt_pdf(data))
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{count} receipts in {elapsed:.2f}s: {count / elapsed:.1f} receipts/s, "
+            f"{elapsed / count * 1000:.1f} ms each, {size / count / 1024:.1f} KB avg"
+        ))
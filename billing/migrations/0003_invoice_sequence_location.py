@@ -0,0 +1,39 @@
+# Generated by Django 5.1.2 on 2026-10-18 04:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0002_payment_billpay_created_id_idx'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoicesequence',
+            name='gapless',
+            field=models.BooleanField(default=False, help_text='Strictly consecutive numbers (no block reservation).'),
+        ),
+        migrations.AddField(
+            model_name='invoicesequence',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='invoice_sequences', to='core.location'),
+        ),
+        migrations.AddField(
+            model_name='invoicesequence',
+            name='padding',
+            field=models.PositiveSmallIntegerField(default=6),
+        ),
+        migrations.AddField(
+            model_name='invoicesequence',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddConstraint(
+            model_name='invoicesequence',
+            constraint=models.UniqueConstraint(fields=('location',), name='invoiceseq_location_uniq'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 05:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0004_payment_receipt_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='method',
+            field=models.CharField(choices=[('CASH', 'Cash'), ('CARD', 'Card'), ('UPI', 'UPI')], default='CARD', max_length=8),
+        ),
+    ]
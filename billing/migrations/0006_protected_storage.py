@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2026-10-18 05:56
+
+import core.storage
+from django.db import migrations, models
+
+
+def move_files(apps, schema_editor):
+    # Files rendered before this migration sit under MEDIA_ROOT, where /media/ serves them.
+    model = apps.get_model("billing", "paymentreceipt")
+    names = model.objects.exclude(receipt_file="").exclude(receipt_file=None).values_list("receipt_file", flat=True)
+    core.storage.move_to_protected(names.distinct().iterator())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0005_payment_method'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='paymentreceipt',
+            name='receipt_file',
+            field=models.FileField(blank=True, storage=core.storage.protected_storage, upload_to='receipts/%Y/%m/'),
+        ),
+        migrations.RunPython(move_files, migrations.RunPython.noop),
+    ]
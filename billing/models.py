@@ -1,12 +1,19 @@
+import os
+
+from django.conf import settings
 from django.db import models
 
+from core.storage import protected_storage
+
 class Payment(models.Model):
+    METHOD_CHOICES = [("CASH", "Cash"), ("CARD", "Card"), ("UPI", "UPI")]
     order = models.ForeignKey(
         "orders.Order",
         on_delete=models.CASCADE,
         related_name="billing_payments",
         related_query_name="billing_payment",
     )
+    method = models.CharField(max_length=8, choices=METHOD_CHOICES, default="CARD")
     amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     currency = models.CharField(max_length=8, default="NPR")
     status = models.CharField(max_length=32, default="created")
@@ -16,27 +23,50 @@ class Payment(models.Model):
     class Meta:
         verbose_name = "Billing Payment"
         verbose_name_plural = "Billing Payments"
+        indexes = [models.Index(fields=["created_at", "id"], name="billpay_created_id_idx")]
     def __str__(self):
         return f"BillingPayment {self.pk} for Order {self.order_id} ({self.amount} {self.currency})"
 
 class InvoiceSequence(models.Model):
+    """Per-location invoice series; numbers are handed out by billing.numbering."""
+    location = models.ForeignKey(
+        "core.Location", on_delete=models.CASCADE,
+        null=True, blank=True, related_name="invoice_sequences",
+    )
     prefix = models.CharField(max_length=16, unique=True)
-    last_number = models.PositiveIntegerField(default=0)
+    last_number = models.PositiveIntegerField(default=0)  # highest number reserved so far
+    padding = models.PositiveSmallIntegerField(default=6)
+    gapless = models.BooleanField(default=False, help_text="Strictly consecutive numbers (no block reservation).")
+    updated_at = models.DateTimeField(auto_now=True)
     class Meta:
         verbose_name = "Invoice Sequence"
         verbose_name_plural = "Invoice Sequences"
-    def __str__(self): return f"{self.prefix}-{self.last_number:06d}"
+        constraints = [models.UniqueConstraint(fields=["location"], name="invoiceseq_location_uniq")]
+    def __str__(self): return self.format(self.last_number)
+    def format(self, number) -> str:
+        return f"{self.prefix}-{number:0{self.padding}d}"
+    def peek_next_invoice_no(self) -> str:
+        return self.format(self.last_number + 1)
     def next_invoice_no(self) -> str:
-        self.last_number += 1
-        self.save(update_fields=["last_number"])
-        return f"{self.prefix}-{self.last_number:06d}"
+        from .numbering import allocate_number
+        return self.format(allocate_number(self))
 
 class PaymentReceipt(models.Model):
+    order = models.ForeignKey(
+        "orders.Order", on_delete=models.SET_NULL,
+        null=True, blank=True, related_name="receipts",
+    )
     payment = models.ForeignKey(
         Payment, on_delete=models.SET_NULL,
         null=True, blank=True, related_name="receipts", related_query_name="receipt",
     )
     receipt_no = models.CharField(max_length=32, unique=True, null=True, blank=True)
+    receipt_file = models.FileField(upload_to="receipts/%Y/%m/", storage=protected_storage, blank=True)
+    file_name = models.CharField(max_length=255, blank=True, default="")
+    generated_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        null=True, blank=True, related_name="generated_receipts",
+    )
     issued_at = models.DateTimeField(auto_now_add=True)
     notes = models.TextField(blank=True, default="")
     class Meta:
@@ -44,3 +74,7 @@ class PaymentReceipt(models.Model):
         verbose_name_plural = "Payment Receipts"
     def __str__(self):
         return f"Receipt {self.receipt_no or '-'} for BillingPayment {self.payment_id or '-'}"
+    def save(self, *args, **kwargs):
+        if self.receipt_file and not self.file_name:
+            self.file_name = os.path.basename(self.receipt_file.name)
+        super().save(*args, **kwargs)
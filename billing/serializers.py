@@ -7,35 +7,35 @@ class InvoiceSequenceSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = InvoiceSequence
-        fields = ['id', 'location', 'prefix', 'next_number', 'padding', 'updated_at', 'next_invoice_preview']
-        read_only_fields = ['updated_at', 'next_invoice_preview']
+        fields = ['id', 'location', 'prefix', 'last_number', 'padding', 'gapless', 'updated_at', 'next_invoice_preview']
+        read_only_fields = ['last_number', 'updated_at', 'next_invoice_preview']
 
     def get_next_invoice_preview(self, obj):
         return obj.peek_next_invoice_no()
 
 
 class PaymentSerializer(serializers.ModelSerializer):
-    created_by = serializers.PrimaryKeyRelatedField(read_only=True)
-
     class Meta:
         model = Payment
         fields = [
-            'id', 'order', 'method', 'amount', 'reference', 'notes',
-            'created_at', 'created_by'
+            'id', 'order', 'method', 'amount', 'currency', 'status', 'reference',
+            'created_at'
         ]
-        read_only_fields = ['created_at', 'created_by']
+        read_only_fields = ['created_at']
 
 
 class PaymentReceiptSerializer(serializers.ModelSerializer):
     generated_by = serializers.PrimaryKeyRelatedField(read_only=True)
+    # Protected storage has no public URL; the file is fetched through the download action.
+    receipt_file = serializers.FileField(use_url=False, required=False)
 
     class Meta:
         model = PaymentReceipt
         fields = [
             'id', 'order', 'receipt_file', 'file_name',
-            'generated_at', 'generated_by'
+            'issued_at', 'generated_by'
         ]
-        read_only_fields = ['generated_at', 'generated_by']
+        read_only_fields = ['issued_at', 'generated_by']
 
     def validate(self, attrs):
         # Optional: if a file is provided without file_name, we’ll auto-fill in model.save()
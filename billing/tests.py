@@ -1,3 +1,132 @@
-from django.test import TestCase
+import multiprocessing
+import tempfile
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from core.models import Location, Organization
+from core.storage import protected_storage
+from menu.models import MenuCategory, MenuItem
+from orders.models import Order, OrderItem
+from .models import InvoiceSequence, Payment
+from .numbering import allocate_invoice_no, reset_blocks
+from .services import ReceiptService, receipt_data, render_receipt_pdf
+
+WORKERS = 4
+PER_WORKER = 40
+
+
+def _allocate_in_child(location_id, count, block_size, queue):
+    # Forked children must not reuse the parent's DB connection.
+    connections.close_all()
+    reset_blocks()
+    with override_settings(INVOICE_NUMBER_BLOCK_SIZE=block_size):
+        numbers = [allocate_invoice_no(location_id) for _ in range(count)]
+    connections.close_all()
+    queue.put(numbers)
+
+
+class InvoiceNumberingTests(TransactionTestCase):
+    def setUp(self):
+        reset_blocks()
+        org = Organization.objects.create(name="Org")
+        self.location = Location.objects.create(organization=org, name="Main")
+
+    def _run_workers(self, block_size):
+        ctx = multiprocessing.get_context("fork")
+        queue = ctx.Queue()
+        connections.close_all()
+        procs = [
+            ctx.Process(target=_allocate_in_child, args=(self.location.pk, PER_WORKER, block_size, queue))
+            for _ in range(WORKERS)
+        ]
+        for p in procs:
+            p.start()
+        results = [queue.get(timeout=60) for _ in procs]
+        for p in procs:
+            p.join(timeout=60)
+            self.assertEqual(p.exitcode, 0)
+        return [n for batch in results for n in batch]
+
+    def _skip_without_shared_db(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("needs a database shared between processes")
+
+    def test_concurrent_workers_never_share_a_number(self):
+        self._skip_without_shared_db()
+        numbers = self._run_workers(block_size=1)
+        self.assertEqual(len(numbers), len(set(numbers)))
+        # Single mode without rollbacks is also consecutive.
+        expected = {f"INV{self.location.pk}-{i:06d}" for i in range(1, WORKERS * PER_WORKER + 1)}
+        self.assertEqual(set(numbers), expected)
+
+    def test_block_mode_concurrent_workers_never_share_a_number(self):
+        self._skip_without_shared_db()
+        numbers = self._run_workers(block_size=10)
+        self.assertEqual(len(numbers), WORKERS * PER_WORKER)
+        self.assertEqual(len(numbers), len(set(numbers)))
+        self.assertEqual(InvoiceSequence.objects.get(location=self.location).last_number, WORKERS * PER_WORKER)
+
+    @override_settings(INVOICE_NUMBER_BLOCK_SIZE=10)
+    def test_block_mode_touches_the_row_once_per_block(self):
+        allocate_invoice_no(self.location)
+        self.assertEqual(InvoiceSequence.objects.get(location=self.location).last_number, 10)
+        numbers = [allocate_invoice_no(self.location) for _ in range(9)]
+        self.assertEqual(numbers[-1], f"INV{self.location.pk}-000010")
+        self.assertEqual(InvoiceSequence.objects.get(location=self.location).last_number, 10)
+
+    @override_settings(INVOICE_NUMBER_BLOCK_SIZE=10)
+    def test_rolled_back_block_is_not_reused(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                allocate_invoice_no(self.location)
+                raise RuntimeError
+        # The reservation rolled back with the transaction, so the block restarts at 1.
+        self.assertEqual(allocate_invoice_no(self.location), f"INV{self.location.pk}-000001")
+
+    @override_settings(INVOICE_NUMBER_BLOCK_SIZE=10)
+    def test_gapless_sequence_ignores_blocks_and_rollbacks(self):
+        InvoiceSequence.objects.create(location=self.location, prefix="AUD", gapless=True)
+        self.assertEqual(allocate_invoice_no(self.location), "AUD-000001")
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                allocate_invoice_no(self.location)
+                raise RuntimeError
+        self.assertEqual(allocate_invoice_no(self.location), "AUD-000002")
+        self.assertEqual(InvoiceSequence.objects.get(location=self.location).last_number, 2)
+
+
+class ReceiptRenderingTests(TestCase):
+    def setUp(self):
+        root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(PROTECTED_MEDIA_ROOT=root, PDF_RENDER_BACKEND="inline",
+                                            DEFAULT_CURRENCY="NPR"))
+        org = Organization.objects.create(name="Momo House", address="Thamel", phone="01-555", tax_percent=Decimal("13.00"))
+        location = Location.objects.create(organization=org, name="Thamel")
+        item = MenuItem.objects.create(category=MenuCategory.objects.create(organization=org, name="Mains"),
+                                       name="Momo <steamed>", price=Decimal("10.00"))
+        self.order = Order.objects.create(location=location, subtotal=Decimal("20.00"), tax_amount=Decimal("2.60"),
+                                          total=Decimal("22.60"))
+        OrderItem.objects.create(order=self.order, menu_item=item, quantity=2, unit_price=item.price)
+        Payment.objects.create(order=self.order, amount=Decimal("20.00"), reference="CASH-1")
+
+    def test_receipt_data_is_plain_strings(self):
+        data = receipt_data(self.order)
+        self.assertEqual((data["org_name"], data["invoice_no"], data["customer"]),
+                         ("Momo House", f"ORD-{self.order.pk}", "Walk-in"))
+        self.assertEqual(data["items"], [("Momo <steamed>", "2", "NPR 10.00", "NPR 20.00")])
+        self.assertEqual(data["totals"], [("Subtotal:", "NPR 20.00"), ("Tax (13.00%):", "NPR 2.60"),
+                                          ("Total:", "NPR 22.60"), ("Paid:", "NPR 20.00"), ("Balance:", "NPR 2.60")])
+        self.assertEqual(data["payments"], [("CASH-1", "NPR 20.00")])
+        self.assertTrue(render_receipt_pdf(data).startswith(b"%PDF"))
+
+    def test_generate_stores_one_file_per_content(self):
+        user = get_user_model().objects.create_user("cashier", password="x", is_staff=True)
+        first = ReceiptService.generate_receipt_pdf(self.order, user)
+        second = ReceiptService.generate_receipt_pdf(self.order, user)
+        self.assertEqual(first.receipt_file.name, second.receipt_file.name)
+        self.assertTrue(first.receipt_file.name.startswith("receipts/"))
+        with protected_storage().open(first.receipt_file.name) as f:
+            self.assertTrue(f.read().startswith(b"%PDF"))
@@ -1,7 +1,10 @@
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
+from core.downloads import PassthroughRenderer, protected_file_response
+
 from .models import Payment, PaymentReceipt, InvoiceSequence
 from .serializers import PaymentSerializer, PaymentReceiptSerializer, InvoiceSequenceSerializer
 
@@ -29,6 +32,12 @@ class PaymentReceiptViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(generated_by=self.request.user)
 
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAdminUser],
+            renderer_classes=[JSONRenderer, PassthroughRenderer])
+    def download(self, request, pk=None):
+        receipt = self.get_object()
+        return protected_file_response(request, receipt.receipt_file.name, receipt.file_name or f"receipt-{receipt.pk}.pdf")
+
 
 class InvoiceSequenceViewSet(viewsets.ModelViewSet):
     queryset = InvoiceSequence.objects.select_related('location').all()
@@ -39,5 +48,5 @@ class InvoiceSequenceViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAdminUser])
     def consume(self, request, pk=None):
         seq = self.get_object()
-        number = seq.consume_next_invoice_no()
+        number = seq.next_invoice_no()
         return Response({'invoice_no': number})
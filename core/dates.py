@@ -0,0 +1,28 @@
+"""
+Local business days.
+
+Reports, exports and invoices take inclusive date ranges that mean whole days
+in a location's timezone; `day_window` turns one into the [start, end) pair of
+aware datetimes to filter on, and `parse_day` reads the YYYY-MM-DD strings the
+API and management commands accept.
+"""
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+
+def parse_day(value):
+    """The date in a YYYY-MM-DD string; None if empty, malformed or impossible (2026-02-30)."""
+    try:
+        return parse_date(value) if value else None
+    except ValueError:
+        return None
+
+
+def day_window(date_from, date_to=None, tz=None):
+    """[start, end) covering local days date_from..date_to (inclusive) in `tz` (default: TIME_ZONE)."""
+    tz = tz or timezone.get_default_timezone()
+    start = datetime.combine(date_from, time.min, tzinfo=tz)
+    end = datetime.combine((date_to or date_from) + timedelta(days=1), time.min, tzinfo=tz)
+    return start, end
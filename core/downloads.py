@@ -0,0 +1,72 @@
+"""
+Protected file downloads.
+
+Files live in the private storage (core.storage, PROTECTED_MEDIA_ROOT). Views
+check authorization, then hand the transfer to the front-end server so Python
+never reads the file:
+
+  * PROTECTED_MEDIA_SERVER = "nginx":  X-Accel-Redirect to PROTECTED_MEDIA_PREFIX + name
+        location /protected-media/ { internal; alias /srv/rms/protected_media/; }
+  * PROTECTED_MEDIA_SERVER = "sendfile":  X-Sendfile with the absolute path (Apache, lighttpd)
+  * unset: a streaming FileResponse (reads the file in chunks)
+
+Links that must work without an Authorization header (plain <a href>) carry
+a short-lived signed token from `sign_download`.
+"""
+import os
+
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils.http import content_disposition_header
+from rest_framework.renderers import BaseRenderer
+
+from .storage import protected_storage
+
+SALT = "core.downloads"
+
+
+def sign_download(kind, pk):
+    return signing.TimestampSigner(salt=SALT).sign(f"{kind}:{pk}")
+
+
+def check_download_token(token, kind, pk):
+    max_age = getattr(settings, "DOWNLOAD_LINK_MAX_AGE", 600)
+    try:
+        value = signing.TimestampSigner(salt=SALT).unsign(token or "", max_age=max_age)
+    except signing.BadSignature:
+        return False
+    return value == f"{kind}:{pk}"
+
+
+def protected_file_response(request, name, download_name, content_type="application/pdf"):
+    """Serve storage file `name`; content-addressed names double as a strong ETag."""
+    storage = protected_storage()
+    if not name or not storage.exists(name):
+        raise Http404("File not found")
+    etag = f'"{os.path.splitext(os.path.basename(name))[0]}"'
+    if request.headers.get("If-None-Match") == etag:
+        return HttpResponseNotModified(headers={"ETag": etag})
+
+    server = getattr(settings, "PROTECTED_MEDIA_SERVER", "")
+    if server == "nginx":
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = getattr(settings, "PROTECTED_MEDIA_PREFIX", "/protected-media/") + name
+    elif server == "sendfile":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = storage.path(name)
+    else:
+        response = FileResponse(storage.open(name, "rb"), content_type=content_type)
+    response["Content-Disposition"] = content_disposition_header(False, download_name)
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, max-age=3600"
+    return response
+
+
+class PassthroughRenderer(BaseRenderer):
+    """Lets DRF actions that return file responses accept any Accept header."""
+    media_type = "*/*"
+    format = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
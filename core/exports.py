@@ -0,0 +1,134 @@
+"""
+Streaming CSV / JSONL exports, served by `GET /api/reports/exports/<name>.<csv|jsonl>`
+and `manage.py export_data`.
+
+Apps declare their datasets in an `exports.py` module:
+
+    from core.exports import Export, register
+
+    register(Export(
+        name="orders",
+        queryset=lambda: Order.objects.all(),
+        columns=[("id", "id"), ("total", "total"), ("location", "location_id")],
+        date_field="created_at",
+    ))
+
+`columns` are (header, ORM lookup) pairs. Rows are read with
+`.values_list(...).iterator(chunk_size=EXPORT_CHUNK_SIZE)`: no model
+instances, and on PostgreSQL a server-side cursor, so only one chunk is ever
+in memory. The header goes out before the query runs, and rows are flushed
+in ~64 KB pieces, so the first byte arrives immediately however many rows
+follow. CSV text cells that start like a formula (`=`, `+`, `-`, `@`, tab, CR)
+are prefixed with `'` so spreadsheets show them as text.
+"""
+import csv
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import autodiscover_modules
+
+from .dates import day_window
+
+FORMATS = {"csv": "text/csv; charset=utf-8", "jsonl": "application/x-ndjson"}
+FLUSH_BYTES = 64 * 1024
+# Spreadsheets run cells starting with these as formulas; user text (names, references) must not.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+@dataclass
+class Export:
+    name: str
+    queryset: Callable
+    columns: List[Tuple[str, str]]
+    date_field: str = "created_at"
+    location_field: Optional[str] = "location"
+    order_by: Tuple[str, ...] = ("pk",)
+    description: str = ""
+    date_only: bool = False  # date_field is a DateField (already a local date)
+
+
+EXPORTS = {}
+
+
+def register(export):
+    EXPORTS[export.name] = export
+    return export
+
+
+def discover():
+    autodiscover_modules("exports")
+    return EXPORTS
+
+
+def chunk_size():
+    return int(getattr(settings, "EXPORT_CHUNK_SIZE", 2000))
+
+
+def filtered(export, location=None, date_from=None, date_to=None):
+    """The export's queryset narrowed to a location and local date range (both inclusive)."""
+    qs = export.queryset()
+    if location is not None and export.location_field:
+        qs = qs.filter(**{export.location_field: location})
+    if export.date_only:
+        if date_from:
+            qs = qs.filter(**{f"{export.date_field}__gte": date_from})
+        if date_to:
+            qs = qs.filter(**{f"{export.date_field}__lte": date_to})
+    else:
+        tz = location.tzinfo if location is not None else None  # None: TIME_ZONE
+        if date_from:
+            qs = qs.filter(**{f"{export.date_field}__gte": day_window(date_from, tz=tz)[0]})
+        if date_to:
+            qs = qs.filter(**{f"{export.date_field}__lt": day_window(date_to, tz=tz)[1]})
+    return qs.order_by(*export.order_by)
+
+
+class _Echo:
+    """csv.writer target that hands each formatted line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def csv_cell(value):
+    """`value` for a CSV cell; text that a spreadsheet would evaluate is prefixed with a quote."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _format_rows(export, rows, fmt):
+    headers = [header for header, _ in export.columns]
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(headers)
+        for row in rows:
+            yield writer.writerow([csv_cell(value) for value in row])
+    else:
+        encoder = DjangoJSONEncoder(separators=(",", ":"))
+        for row in rows:
+            yield encoder.encode(dict(zip(headers, row))) + "\n"
+
+
+def stream(export, fmt, location=None, date_from=None, date_to=None):
+    """Yield the export as encoded byte chunks: the first line at once, then about FLUSH_BYTES each."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}")
+    qs = filtered(export, location, date_from, date_to)
+    rows = qs.values_list(*[lookup for _, lookup in export.columns]).iterator(chunk_size=chunk_size())
+    lines = _format_rows(export, rows, fmt)
+    first = next(lines, None)
+    if first is None:
+        return
+    yield first.encode()
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield "".join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode()
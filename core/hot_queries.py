@@ -0,0 +1,71 @@
+"""
+Registry of hot queries checked by `manage.py audit_hot_queries`.
+
+Apps declare their hot paths in a `hot_queries.py` module:
+
+    from core.hot_queries import hot_query
+
+    @hot_query("my-orders", tables=["orders_order"])
+    def my_orders(sample):
+        return Order.objects.filter(created_by_id=sample.created_by_id).order_by("-created_at")[:50]
+
+`sample` is one existing Order, used to pick realistic parameter values.
+`tables` are the (large) tables that must never be read with a sequential scan.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Callable, List
+
+from django.apps import apps
+from django.utils.module_loading import autodiscover_modules
+
+
+@dataclass
+class HotQuery:
+    name: str
+    build: Callable
+    tables: List[str] = field(default_factory=list)
+
+
+HOT_QUERIES = {}
+
+
+def hot_query(name, tables):
+    def decorator(build):
+        HOT_QUERIES[name] = HotQuery(name=name, build=build, tables=list(tables))
+        return build
+    return decorator
+
+
+def discover():
+    autodiscover_modules("hot_queries")
+    return HOT_QUERIES
+
+
+def partial_index_names():
+    return {
+        index.name
+        for model in apps.get_models()
+        for index in model._meta.indexes
+        if index.condition is not None
+    }
+
+
+def seq_scanned_tables(plan: str, vendor: str, tables):
+    """
+    Tables from `tables` that the EXPLAIN output reads in full.
+    On SQLite "SCAN t USING INDEX i" walks the whole index too, which is
+    only acceptable when `i` is a partial index.
+    """
+    partial = partial_index_names()
+    hits = []
+    for line in plan.splitlines():
+        text = line.strip()
+        for table in tables:
+            if vendor == "postgresql" and f"Seq Scan on {table}" in text:
+                hits.append(table)
+            elif vendor == "sqlite":
+                match = re.search(rf"\bSCAN {re.escape(table)}\b(?: USING (?:COVERING )?INDEX (\w+))?", text)
+                if match and match.group(1) not in partial:
+                    hits.append(table)
+    return sorted(set(hits))
@@ -0,0 +1,127 @@
+"""
+Idempotency-Key support for unsafe API actions.
+
+    class OrderViewSet(IdempotencyMixin, viewsets.ModelViewSet):
+        idempotent_actions = ("create", "quick_checkout")
+
+A request carrying `Idempotency-Key: <client-generated id>` runs at most
+once per caller and key. The first response (anything but 5xx, 409 and 429)
+is kept in the cache for IDEMPOTENCY_TTL together with a fingerprint of the
+request. Retries get that response back verbatim, with the header
+`Idempotent-Replayed: true`, without running the view. A duplicate that
+arrives while the first request is still in flight waits for it (up to
+IDEMPOTENCY_WAIT seconds). Reusing a key with a different body is rejected
+with 422.
+
+The caller is identified without any DB access, so a replay costs only cache
+reads. The JWT user claim is tried first, then the session cookie, then the
+anonymous cart cookie, and last the client IP (DRF's throttle ident, which
+honours REST_FRAMEWORK["NUM_PROXIES"]). Anonymous callers never share a scope
+just because they all lack a cookie.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from rest_framework.throttling import BaseThrottle
+
+HEADER = "HTTP_IDEMPOTENCY_KEY"
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL = 0.05
+# Not cached: the client is expected to retry these with the same key.
+RETRYABLE_STATUSES = {409, 429}
+STORED_HEADERS = ("Content-Type", "Location")
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _digest(value):
+    return hashlib.sha256(value.encode()).hexdigest()[:32]
+
+
+def _caller(request):
+    header = request.META.get("HTTP_AUTHORIZATION", "")
+    if header.startswith("Bearer "):
+        from rest_framework_simplejwt.exceptions import TokenError
+        from rest_framework_simplejwt.settings import api_settings
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        try:
+            return f"user:{AccessToken(header[7:])[api_settings.USER_ID_CLAIM]}"
+        except (TokenError, KeyError):
+            pass
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session_key:
+        return "session:" + _digest(session_key)
+    cart_id = request.COOKIES.get(getattr(settings, "CART_COOKIE_NAME", "cart_id"))
+    if cart_id:
+        return "cart:" + _digest(cart_id)
+    return "ip:" + _digest(BaseThrottle().get_ident(request) or "")
+
+
+def fingerprint(request):
+    digest = hashlib.sha256()
+    for part in (request.method.encode(), request.get_full_path().encode(), request.body):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IdempotencyMixin:
+    idempotent_actions = ("create",)
+
+    def dispatch(self, request, *args, **kwargs):
+        key = request.META.get(HEADER)
+        action = getattr(self, "action_map", {}).get(request.method.lower())
+        if not key or action not in self.idempotent_actions:
+            return super().dispatch(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return JsonResponse({"detail": "Idempotency-Key is too long."}, status=400)
+
+        scope = hashlib.sha256(f"{_caller(request)}:{action}:{key}".encode()).hexdigest()
+        record_key, lock_key = f"idem:{scope}", f"idem:lock:{scope}"
+        fp = fingerprint(request)
+
+        deadline = time.monotonic() + _setting("IDEMPOTENCY_WAIT", 10)
+        while True:
+            record = cache.get(record_key)
+            if record is not None:
+                return self._replay(record, fp)
+            if cache.add(lock_key, fp, _setting("IDEMPOTENCY_LOCK_TIMEOUT", 60)):
+                break
+            if time.monotonic() >= deadline:
+                return JsonResponse(
+                    {"detail": "A request with this Idempotency-Key is still in progress."}, status=409
+                )
+            time.sleep(POLL_INTERVAL)
+
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+            if response.status_code < 500 and response.status_code not in RETRYABLE_STATUSES:
+                headers = {h: response[h] for h in STORED_HEADERS if response.has_header(h)}
+                cache.set(
+                    record_key,
+                    (fp, response.status_code, headers, response.content),
+                    _setting("IDEMPOTENCY_TTL", 24 * 3600),
+                )
+            return response
+        finally:
+            cache.delete(lock_key)
+
+    def _replay(self, record, fp):
+        stored_fp, status_code, headers, content = record
+        if stored_fp != fp:
+            return JsonResponse(
+                {"detail": "Idempotency-Key was already used with a different request."}, status=422
+            )
+        response = HttpResponse(content, status=status_code)
+        for name, value in headers.items():
+            response[name] = value
+        response["Idempotent-Replayed"] = "true"
+        return response
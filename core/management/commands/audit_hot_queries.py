@@ -0,0 +1,88 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models.functions import Mod
+from django.utils import timezone
+
+from core.hot_queries import discover, seq_scanned_tables
+from core.models import Organization, Location
+from menu.models import MenuCategory, MenuItem
+from orders.models import Order, OrderItem
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN every registered hot query and fail if any reads a large table with a "
+        "sequential scan. --seed N runs against N synthetic orders and rolls them back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0, help="Synthetic orders to insert (rolled back)")
+        parser.add_argument("--verbose-plans", action="store_true")
+
+    def handle(self, *args, **options):
+        queries = discover()
+        with transaction.atomic():
+            if options["seed"]:
+                self._seed(options["seed"])
+            failures = self._audit(queries, options["verbose_plans"])
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"Sequential scans in hot queries: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS(f"All {len(queries)} hot queries use indexes."))
+
+    def _audit(self, queries, verbose):
+        sample = Order.objects.exclude(created_by=None).exclude(location=None).order_by("-id").first() \
+            or Order.objects.order_by("-id").first()
+        if sample is None:
+            raise CommandError("No orders to sample; run against a populated database or pass --seed.")
+
+        failures = []
+        for name, hq in sorted(queries.items()):
+            plan = hq.build(sample).explain()
+            scanned = seq_scanned_tables(plan, connection.vendor, hq.tables)
+            if scanned:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"SEQ SCAN  {name}: {', '.join(scanned)}"))
+            else:
+                self.stdout.write(f"ok        {name}")
+            if verbose or scanned:
+                self.stdout.write("    " + plan.replace("\n", "\n    "))
+        return failures
+
+    def _seed(self, count):
+        self.stdout.write(f"Seeding {count} orders...")
+        rnd = random.Random(42)
+        org = Organization.objects.create(name="audit-seed")
+        locations = Location.objects.bulk_create(Location(organization=org, name=f"L{i}") for i in range(20))
+        User = get_user_model()
+        users = User.objects.bulk_create(User(username=f"audit-seed-{i}") for i in range(max(count // 20, 1)))
+        category = MenuCategory.objects.create(organization=org, name="audit-seed")
+        item = MenuItem.objects.create(category=category, name="audit-seed", price=10)
+
+        now = timezone.now()
+        statuses = ["PAID"] * 90 + ["PENDING"] * 6 + ["FAILED"] * 2 + ["CANCELLED"] * 2
+        for start in range(0, count, 5000):
+            batch = []
+            for i in range(start, min(start + 5000, count)):
+                status = rnd.choice(statuses)
+                batch.append(Order(
+                    created_by=rnd.choice(users),
+                    location=rnd.choice(locations),
+                    status=status,
+                    is_paid=status == "PAID",
+                    stripe_session_id=f"cs_seed_{i}",
+                    stripe_payment_intent_id=f"pi_seed_{i}" if status == "PAID" else "",
+                ))
+            orders = Order.objects.bulk_create(batch)
+            OrderItem.objects.bulk_create(OrderItem(order=o, menu_item=item, quantity=1, unit_price=10) for o in orders)
+        # Spread created_at over a year in weekly buckets (auto_now_add overrides insert values)
+        seeded = Order.objects.filter(location__organization=org).annotate(week=Mod("id", 52))
+        for week in range(52):
+            seeded.filter(week=week).update(created_at=now - timedelta(weeks=week))
+        with connection.cursor() as cur:
+            cur.execute("ANALYZE")
@@ -0,0 +1,54 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.dates import parse_day
+from core.exports import FORMATS, discover, stream
+from core.models import Location
+
+
+class Command(BaseCommand):
+    help = "Stream a dataset (orders, payments, daily-sales, ...) as CSV or JSONL with flat memory use."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", nargs="?", help="Dataset name; omit with --list")
+        parser.add_argument("--list", action="store_true", help="List the available datasets")
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+        parser.add_argument("--location", type=int)
+        parser.add_argument("--from", dest="date_from", help="YYYY-MM-DD (inclusive, local)")
+        parser.add_argument("--to", dest="date_to", help="YYYY-MM-DD (inclusive, local)")
+        parser.add_argument("--output", "-o", default="-", help="Output file; '-' for stdout")
+
+    def handle(self, *args, **options):
+        exports = discover()
+        if options["list"] or not options["name"]:
+            for name, export in sorted(exports.items()):
+                self.stdout.write(f"{name:<16} {export.description}")
+            return
+        export = exports.get(options["name"])
+        if export is None:
+            raise CommandError(f"Unknown dataset {options['name']!r}; see --list")
+
+        location = None
+        if options["location"] is not None:
+            location = Location.objects.filter(pk=options["location"]).first()
+            if location is None:
+                raise CommandError(f"Location {options['location']} not found")
+        dates = []
+        for key in ("date_from", "date_to"):
+            value = parse_day(options[key])
+            if options[key] and value is None:
+                raise CommandError(f"--{key[5:]} must be a YYYY-MM-DD date")
+            dates.append(value)
+
+        out = sys.stdout.buffer if options["output"] == "-" else open(options["output"], "wb")
+        size = 0
+        try:
+            for chunk in stream(export, options["format"], location, *dates):
+                out.write(chunk)
+                size += len(chunk)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        if options["output"] != "-":
+            self.stdout.write(self.style.SUCCESS(f"Wrote {size} bytes to {options['output']}"))
@@ -1,6 +1,10 @@
+from zoneinfo import ZoneInfo
+
 from django.conf import settings
 from django.db import models
 
+from .dates import day_window
+
 class Organization(models.Model):
     name = models.CharField(max_length=200)
     tax_percent = models.DecimalField(max_digits=5, decimal_places=2, default=0.00)
@@ -24,3 +28,12 @@ class Location(models.Model):
 
     def __str__(self):
         return f"{self.organization.name} - {self.name}"
+
+    @property
+    def tzinfo(self):
+        """Business-day timezone for reports, exports and invoices."""
+        return ZoneInfo(self.timezone or "UTC")
+
+    def day_window(self, date_from, date_to=None):
+        """[start, end) covering local dates date_from..date_to (inclusive) at this location."""
+        return day_window(date_from, date_to, self.tzinfo)
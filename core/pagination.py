@@ -0,0 +1,179 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are addressed by the (created_at, id) of the row at the page edge and
+fetched with a range predicate on that indexed pair, never with OFFSET, so
+page 10,000 costs the same as page 1.
+
+    GET /api/orders/?page_size=100
+    GET /api/orders/?cursor=<opaque>          (from "next"/"previous")
+    GET /api/orders/?count=exact|estimate     (opt-in total)
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    count_query_param = "count"
+    # Views can override with `keyset_ordering`; the pair must be unique and indexed.
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        default = api_settings.PAGE_SIZE or 50
+        maximum = getattr(settings, "API_MAX_PAGE_SIZE", 500)
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, default))
+        except (TypeError, ValueError):
+            size = default
+        return max(1, min(size, maximum))
+
+    # ---- cursor encoding ----
+    def _encode(self, values, reverse):
+        raw = json.dumps({"v": values, "r": reverse}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def _decode(self, token, model):
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            data = json.loads(raw)
+            values, reverse = data["v"], bool(data["r"])
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        # Parse with the ordering fields, so a tampered value is a bad cursor and not an error in the filter.
+        try:
+            values = [model._meta.get_field(field.lstrip("-")).to_python(value)
+                      for field, value in zip(self.ordering, values)]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in values:
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def _edge_values(self, obj):
+        out = []
+        for field in self.ordering:
+            value = getattr(obj, field.lstrip("-"))
+            out.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return out
+
+    def _after(self, values, reverse):
+        """Q for rows strictly after `values` in (possibly reversed) ordering."""
+        q = Q()
+        for i in reversed(range(len(self.ordering))):
+            field = self.ordering[i]
+            descending = field.startswith("-") != reverse
+            name = field.lstrip("-")
+            step = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[i]})
+            eq = Q(**{self.ordering[j].lstrip("-"): values[j] for j in range(i)})
+            q = (eq & step) | q if i else step | q
+        return q
+
+    # ---- pagination API ----
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = tuple(getattr(view, "keyset_ordering", self.ordering))
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.count = self._get_count(queryset, request.query_params.get(self.count_query_param))
+
+        token = request.query_params.get(self.cursor_query_param)
+        values, reverse = self._decode(token, queryset.model) if token else (None, False)
+
+        order = [f[1:] if f.startswith("-") else f"-{f}" for f in self.ordering] if reverse else list(self.ordering)
+        qs = queryset.order_by(*order)
+        if values is not None:
+            qs = qs.filter(self._after(values, reverse))
+
+        rows = list(qs[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = (values is not None) if not reverse else has_more
+        self.page = rows
+        return rows
+
+    def _link(self, obj, reverse):
+        if obj is None:
+            return None
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self._encode(self._edge_values(obj), reverse))
+
+    def get_next_link(self):
+        return self._link(self.page[-1], False) if self.has_next and self.page else None
+
+    def get_previous_link(self):
+        return self._link(self.page[0], True) if self.has_previous and self.page else None
+
+    def get_paginated_response(self, data):
+        body = OrderedDict([("next", self.get_next_link()), ("previous", self.get_previous_link())])
+        if self.count is not None:
+            body["count"] = self.count
+        body["results"] = data
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "count": {"type": "integer", "description": "Only with ?count=exact|estimate"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {"name": self.cursor_query_param, "required": False, "in": "query",
+             "description": "Opaque cursor from next/previous.", "schema": {"type": "string"}},
+            {"name": self.page_size_query_param, "required": False, "in": "query",
+             "description": "Results per page.", "schema": {"type": "integer"}},
+            {"name": self.count_query_param, "required": False, "in": "query",
+             "description": "exact = COUNT(*); estimate = planner row estimate (PostgreSQL).",
+             "schema": {"type": "string", "enum": ["exact", "estimate"]}},
+        ]
+
+    # ---- optional totals ----
+    def _get_count(self, queryset, mode):
+        if mode == "estimate":
+            estimate = estimate_count(queryset)
+            if estimate is not None:
+                return estimate
+            return queryset.count()
+        if mode == "exact":
+            return queryset.count()
+        return None
+
+
+def estimate_count(queryset):
+    """Planner row estimate for `queryset` (PostgreSQL only), else None."""
+    conn = connections[queryset.db]
+    if conn.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with conn.cursor() as cur:
+        cur.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cur.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
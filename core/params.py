@@ -0,0 +1,48 @@
+"""
+Query-parameter parsing shared by the admin report, export and invoice endpoints.
+
+Bad input raises ParseError (400) naming the parameter; dates are YYYY-MM-DD
+local business days (see core.dates).
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+
+from .dates import parse_day
+from .models import Location
+
+
+def location_param(params, required=False):
+    """The Location in ?location=<id>; None when it is omitted and not required."""
+    value = params.get("location", "")
+    if not value and not required:
+        return None
+    location = Location.objects.filter(pk=value).first() if value.isdigit() else None
+    if location is None:
+        raise ParseError("Unknown location." if value else "location is required.")
+    return location
+
+
+def date_param(params, name, default=None):
+    value = params.get(name)
+    if not value:
+        return default
+    day = parse_day(value)
+    if day is None:
+        raise ParseError(f"{name} must be a YYYY-MM-DD date.")
+    return day
+
+
+def date_range(params, required=False, days=None):
+    """
+    (date_from, date_to) from ?from=&to=, both inclusive. With `days`, missing
+    ends default to the `days` days ending today; with `required`, both must be given.
+    """
+    date_to = date_param(params, "to", timezone.localdate() if days else None)
+    date_from = date_param(params, "from", date_to - timedelta(days=days - 1) if days else None)
+    if required and (date_from is None or date_to is None):
+        raise ParseError("from and to are required.")
+    if date_from and date_to and date_from > date_to:
+        raise ParseError("from must not be after to.")
+    return date_from, date_to
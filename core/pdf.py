@@ -0,0 +1,162 @@
+"""
+PDF rendering service.
+
+Render jobs are plain data: a renderer kind, the dict it draws from (built
+up front by e.g. `payments.services.invoice_data`), and the storage name to
+write. Renderers never see ORM objects, so a job can run in another process.
+
+Output paths are content-addressed (`content_path`): the name is a hash of the
+renderer, its layout version and the job data, so re-rendering unchanged
+inputs finds the file already in storage and skips the work. Files go to the
+private storage (core.storage), never under MEDIA_ROOT.
+
+    render(job)         render now in the bounded process pool; returns the stored name
+    render_many(jobs)   same for a batch, spread across cores
+    enqueue(jobs)       hand the jobs to the Celery "pdf" queue; the worker attaches the file
+
+PDF_RENDER_BACKEND picks where render()/render_many() run: "process" (a pool of
+PDF_RENDER_WORKERS processes, at most PDF_RENDER_MAX_PENDING jobs queued) or
+"inline" (the calling process; tests, single-core hosts). Each web worker
+starts its own pool on first use, so the worker count is small and explicit
+(default 2), never one per core; large batches go through enqueue().
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils.module_loading import import_string
+
+from .storage import protected_storage
+
+# kind -> (renderer, layout version); bump the version when a renderer's output changes
+RENDERERS = {
+    "invoice": ("payments.services.render_invoice_pdf", 1),
+    "receipt": ("billing.services.render_receipt_pdf", 1),
+}
+
+
+def content_hash(kind, data):
+    renderer, version = RENDERERS[kind]
+    raw = json.dumps([renderer, version, data], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def content_path(kind, data, folder):
+    """`<folder>/ab/abcdef....pdf` for the given render inputs."""
+    digest = content_hash(kind, data)
+    return f"{folder}/{digest[:2]}/{digest}.pdf"
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    kind: str
+    data: dict
+    path: str
+    # ("app_label.Model", pk, "file_field"): set to the stored name once written
+    attach: Optional[Tuple[str, int, str]] = None
+
+
+def render_to_storage(job):
+    """Render `job` to `job.path` unless that file already exists; returns the stored name."""
+    storage = protected_storage()
+    if storage.exists(job.path):
+        return job.path
+    pdf = import_string(RENDERERS[job.kind][0])(job.data)
+    name = storage.save(job.path, ContentFile(pdf))
+    if name != job.path:
+        # Lost a race with an identical render; keep the canonical file.
+        storage.delete(name)
+    return job.path
+
+
+def attach(job, name):
+    if job.attach and name:
+        label, pk, field = job.attach
+        apps.get_model(label).objects.filter(pk=pk).update(**{field: name})
+
+
+# ------------------------ Process pool ------------------------
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+DEFAULT_WORKERS = 2
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_slots = None
+
+
+def _get_pool():
+    global _pool, _pool_pid, _slots
+    with _pool_lock:
+        # A pool inherited through fork (e.g. gunicorn --preload) is unusable in the child.
+        if _pool is None or _pool_pid != os.getpid():
+            workers = max(1, getattr(settings, "PDF_RENDER_WORKERS", DEFAULT_WORKERS) or DEFAULT_WORKERS)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            _pool_pid = os.getpid()
+            _slots = threading.BoundedSemaphore(getattr(settings, "PDF_RENDER_MAX_PENDING", 4 * workers))
+        return _pool, _slots
+
+
+def _submit(job):
+    pool, slots = _get_pool()
+    slots.acquire()  # back-pressure: callers wait instead of growing an unbounded queue
+    try:
+        future = pool.submit(render_to_storage, job)
+    except Exception:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+def _inline():
+    return getattr(settings, "PDF_RENDER_BACKEND", "process") == "inline"
+
+
+# ------------------------ API ------------------------
+
+def render(job):
+    if _inline() or protected_storage().exists(job.path):
+        name = render_to_storage(job)
+    else:
+        name = _submit(job).result()
+    attach(job, name)
+    return name
+
+
+def render_many(jobs):
+    """Render a batch in parallel; returns the stored names in job order."""
+    jobs = list(jobs)
+    if _inline():
+        names = [render_to_storage(job) for job in jobs]
+    else:
+        pending = [None if protected_storage().exists(job.path) else _submit(job) for job in jobs]
+        names = [future.result() if future else job.path for job, future in zip(jobs, pending)]
+    for job, name in zip(jobs, names):
+        attach(job, name)
+    return names
+
+
+def enqueue(jobs):
+    """Render in the Celery "pdf" queue (`celery -A rms_backend worker -Q pdf`); returns immediately."""
+    from core.tasks import render_pdf_task
+
+    for job in jobs:
+        render_pdf_task.delay(asdict(job))
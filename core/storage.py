@@ -0,0 +1,48 @@
+"""
+Private file storage for invoices and receipts.
+
+Files live under PROTECTED_MEDIA_ROOT, outside MEDIA_ROOT, so neither the
+DEBUG /media/ route nor a web server's /media/ alias can reach them. They are
+only sent by core.downloads.protected_file_response after an authorization
+check (nginx: `location /protected-media/ { internal; alias <PROTECTED_MEDIA_ROOT>/; }`).
+"""
+import os
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+
+
+class ProtectedStorage(FileSystemStorage):
+    # Read the setting on every use, so override_settings and late configuration apply.
+    @property
+    def base_location(self):
+        return str(settings.PROTECTED_MEDIA_ROOT)
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+    def url(self, name):
+        raise ValueError("Protected files have no public URL; serve them with protected_file_response().")
+
+
+_protected = ProtectedStorage()
+
+
+def protected_storage():
+    """Storage for FileFields that must never be served from MEDIA_URL (callable, so migrations keep a reference)."""
+    return _protected
+
+
+def move_to_protected(names):
+    """Move files from the default (public) storage into the protected one; used by the data migrations."""
+    moved = 0
+    for name in names:
+        if not name or not default_storage.exists(name):
+            continue
+        if not _protected.exists(name):
+            with default_storage.open(name, "rb") as src:
+                _protected.save(name, src)
+        default_storage.delete(name)
+        moved += 1
+    return moved
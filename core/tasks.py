@@ -0,0 +1,9 @@
+from celery import shared_task
+
+
+@shared_task
+def render_pdf_task(job):
+    from core.pdf import RenderJob, attach, render_to_storage
+
+    job = RenderJob(**job)
+    attach(job, render_to_storage(job))
@@ -0,0 +1,123 @@
+import base64
+import json
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.dates import parse_day
+from core.models import Location, Organization
+from menu.models import MenuCategory, MenuItem
+from orders.models import Order
+
+
+class KeysetPaginationTests(TestCase):
+    """List endpoints page on (created_at, id); rows sharing a timestamp must not be skipped or repeated."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user("admin", password="x", is_staff=True))
+        Order.objects.bulk_create(Order() for _ in range(7))
+        Order.objects.update(created_at=timezone.now())  # every row ties on created_at
+        self.ids = list(Order.objects.order_by("-id").values_list("id", flat=True))
+
+    def _ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.json()["results"]]
+
+    def test_round_trip_with_tied_created_at(self):
+        pages, response = [], self.client.get("/api/orders/", {"page_size": 3})
+        while True:
+            pages.append(self._ids(response))
+            if not response.json()["next"]:
+                break
+            response = self.client.get(response.json()["next"])
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), self.ids)
+        self.assertIsNone(self.client.get("/api/orders/", {"page_size": 3}).json()["previous"])
+
+        # ... and back again through "previous".
+        back = []
+        while response.json()["previous"]:
+            response = self.client.get(response.json()["previous"])
+            back.insert(0, self._ids(response))
+        self.assertEqual(back, pages[:-1])
+
+    def test_count_is_opt_in(self):
+        self.assertNotIn("count", self.client.get("/api/orders/").json())
+        self.assertEqual(self.client.get("/api/orders/", {"count": "exact"}).json()["count"], 7)
+
+    def test_bad_cursor(self):
+        tampered = [{"v": ["garbage", 1], "r": False}, {"v": [1, "x"], "r": False}, {"v": [None, 1], "r": True}]
+        cursors = ["not-a-cursor", "eyJ2IjpbMV0sInIiOmZhbHNlfQ"]  # garbage; wrong number of values
+        cursors += [base64.urlsafe_b64encode(json.dumps(data).encode()).decode() for data in tampered]
+        for cursor in cursors:
+            response = self.client.get("/api/orders/", {"cursor": cursor})
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.json()["detail"], "Invalid cursor")
+
+
+@override_settings(STRIPE_BACKEND="fake", CHECKOUT_MODE="sync")
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = MenuCategory.objects.create(organization=Organization.objects.create(name="O"), name="Mains")
+        self.item = MenuItem.objects.create(category=category, name="Burger", price=Decimal("15.00"))
+
+    def post(self, key, quantity=1, **extra):
+        body = {"items": [{"menu_item": self.item.pk, "quantity": quantity}]}
+        return self.client.post("/api/orders/", body, content_type="application/json", HTTP_IDEMPOTENCY_KEY=key, **extra)
+
+    def test_replay_returns_first_response_without_running_again(self):
+        first = self.post("key-1")
+        self.assertEqual(first.status_code, 201)
+        replay = self.post("key-1")
+        self.assertEqual(replay.status_code, 201)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(replay.content, first.content)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_same_key_with_different_body_is_rejected(self):
+        self.assertEqual(self.post("key-1").status_code, 201)
+        response = self.post("key-1", quantity=2)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_anonymous_callers_do_not_share_keys(self):
+        self.assertEqual(self.post("key-1", REMOTE_ADDR="203.0.113.1").status_code, 201)
+        other = self.post("key-1", REMOTE_ADDR="203.0.113.2")
+        self.assertEqual(other.status_code, 201)
+        self.assertFalse(other.has_header("Idempotent-Replayed"))
+        self.client.cookies["cart_id"] = "a" * 24
+        self.assertFalse(self.post("key-1", REMOTE_ADDR="203.0.113.2").has_header("Idempotent-Replayed"))
+        self.assertEqual(Order.objects.count(), 3)
+
+
+class LocalDayTests(TestCase):
+    def test_day_window_covers_whole_local_days(self):
+        location = Location(name="Thamel", timezone="Asia/Kathmandu")  # UTC+05:45
+        start, end = location.day_window(date(2026, 3, 1), date(2026, 3, 2))
+        self.assertEqual(start, datetime(2026, 2, 28, 18, 15, tzinfo=dt_timezone.utc))
+        self.assertEqual(end, datetime(2026, 3, 2, 18, 15, tzinfo=dt_timezone.utc))
+        self.assertEqual(location.day_window(date(2026, 3, 1))[1], start + (end - start) / 2)
+
+    def test_parse_day_rejects_impossible_dates(self):
+        self.assertEqual(parse_day("2026-02-28"), date(2026, 2, 28))
+        for value in ("2026-02-30", "yesterday", "", None):
+            self.assertIsNone(parse_day(value), value)
+
+    def test_report_params_answer_400(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user("admin", password="x", is_staff=True))
+        for url, params in (("/api/reports/shift-reports/z-report/", {}),
+                            ("/api/reports/shift-reports/z-report/", {"location": "x"}),
+                            ("/api/dashboard/summary/", {"location": "999"}),
+                            ("/api/reports/timeseries/", {"from": "2026-02-30"}),
+                            ("/api/reports/timeseries/", {"from": "2026-03-02", "to": "2026-03-01"})):
+            response = client.get(url, params)
+            self.assertEqual(response.status_code, 400, (url, params))
@@ -0,0 +1,79 @@
+"""
+Recipe-based stock deduction.
+
+Each menu item and modifier can have RecipeComponent rows: how much of an
+inventory item one unit (or one modifier pick) uses. Inventory belongs to a
+location, so only components whose inventory item is at the order's location
+apply; a chain keeps one set of components per location.
+
+When an order is paid (orders.signals.order_paid) the usage of all its lines
+is added up first: menu item recipes in one grouped query, modifier recipes
+from the picks stored on the lines. It is then posted to the stock ledger as
+SALE movements (inventory.stock.post): a single `F()` UPDATE per affected
+InventoryItem and one INSERT, inside the order's transaction.
+
+Refunds do not put stock back: the food was made. Such usage shows up as
+variance in the theoretical vs actual report instead.
+"""
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.db.models import DecimalField, F, Sum
+
+from . import stock
+from .models import RecipeComponent
+
+ZERO = Decimal("0.00")
+QUANTITY = DecimalField(max_digits=14, decimal_places=2)
+
+
+def modifier_id(pick):
+    """Modifier id of one entry of OrderItem.modifiers: an id, or a dict with "id"/"modifier_id"."""
+    if isinstance(pick, dict):
+        pick = pick.get("id", pick.get("modifier_id"))
+    try:
+        return int(pick)
+    except (TypeError, ValueError):
+        return None
+
+
+def usage(lines, location_id):
+    """{inventory_item_id: quantity} used by the OrderItem queryset `lines` at a location."""
+    used = defaultdict(lambda: ZERO)
+    components = RecipeComponent.objects.filter(inventory_item__location_id=location_id)
+
+    # Filtering before annotating makes the Sum run over the same order_items join.
+    per_item = (
+        components.filter(menu_item__order_items__in=lines)
+        .values("inventory_item")
+        .annotate(used=Sum(F("quantity") * F("menu_item__order_items__quantity"), output_field=QUANTITY))
+        .order_by()
+        .values_list("inventory_item", "used")
+    )
+    for inventory_item_id, quantity in per_item:
+        used[inventory_item_id] += quantity
+
+    picks = Counter()
+    for quantity, modifiers in lines.exclude(modifiers=[]).values_list("quantity", "modifiers"):
+        for pick in modifiers or ():
+            pk = modifier_id(pick)
+            if pk is not None:
+                picks[pk] += quantity
+    if picks:
+        for pk, inventory_item_id, quantity in components.filter(modifier__in=list(picks)).values_list(
+            "modifier", "inventory_item", "quantity"
+        ):
+            used[inventory_item_id] += quantity * picks[pk]
+    return {pk: quantity for pk, quantity in used.items() if quantity}
+
+
+def order_usage(order):
+    return usage(order.items.all(), order.location_id)
+
+
+def record_sale(sender, order, **kwargs):
+    if order.location_id is None:
+        return
+    used = order_usage(order)
+    if used:
+        stock.post({pk: -quantity for pk, quantity in used.items()}, "SALE", order=order)
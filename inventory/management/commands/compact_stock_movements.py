@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.dates import day_window, parse_day
+from inventory.stock import compact
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold stock movements older than the cutoff into one snapshot per item and delete them. "
+        "Stock at later times is unchanged; earlier times are answered from snapshots only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--before", help="YYYY-MM-DD: compact movements before this date "
+                                             "(default: STOCK_MOVEMENT_RETENTION_DAYS ago)")
+
+    def handle(self, *args, **options):
+        if options["before"]:
+            day = parse_day(options["before"])
+            if day is None:
+                raise CommandError("--before must be a YYYY-MM-DD date")
+        else:
+            day = timezone.localdate() - timedelta(days=int(getattr(settings, "STOCK_MOVEMENT_RETENTION_DAYS", 90)))
+        deleted = compact(day_window(day, tz=timezone.get_current_timezone())[0])
+        self.stdout.write(self.style.SUCCESS(f"Compacted {deleted} stock movement(s) before {day}."))
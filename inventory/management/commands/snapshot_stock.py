@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from inventory.models import InventoryItem
+from inventory.stock import take_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Snapshot every inventory item's current stock. Run it daily (cron / beat): historical stock lookups "
+        "only replay the movements since the last snapshot."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--location", type=int, action="append", help="Location id (repeatable); default: all")
+
+    def handle(self, *args, **options):
+        items = InventoryItem.objects.all()
+        if options["location"]:
+            items = items.filter(location__in=options["location"])
+        taken = take_snapshots(items)
+        self.stdout.write(self.style.SUCCESS(f"Took {taken} stock snapshot(s)."))
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.2 on 2026-10-18 05:22
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_inventoryitem_invitem_created_id_idx'),
+        ('menu', '0002_menu_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeComponent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('inventory_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipe_components', to='inventory.inventoryitem')),
+                ('menu_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='recipe_components', to='menu.menuitem')),
+                ('modifier', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='recipe_components', to='menu.modifier')),
+            ],
+            options={
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('menu_item__isnull', False), ('modifier__isnull', True)), models.Q(('menu_item__isnull', True), ('modifier__isnull', False)), _connector='OR'), name='recipe_menu_item_xor_modifier'), models.UniqueConstraint(fields=('menu_item', 'inventory_item'), name='recipe_menu_item_uniq'), models.UniqueConstraint(fields=('modifier', 'inventory_item'), name='recipe_modifier_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('counted_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('expected', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('notes', models.CharField(blank=True, default='', max_length=255)),
+                ('counted_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('inventory_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='counts', to='inventory.inventoryitem')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['inventory_item', 'counted_at'], name='stockcount_item_at_idx')],
+            },
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 
 class Supplier(models.Model):
     name = models.CharField(max_length=200)
@@ -35,5 +37,94 @@ class InventoryItem(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='invitem_created_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.sku})"
+
+class RecipeComponent(models.Model):
+    """Inventory used by one unit of a menu item, or by one pick of a modifier (in the inventory item's unit)."""
+    menu_item = models.ForeignKey('menu.MenuItem', on_delete=models.CASCADE, null=True, blank=True,
+                                  related_name='recipe_components')
+    modifier = models.ForeignKey('menu.Modifier', on_delete=models.CASCADE, null=True, blank=True,
+                                 related_name='recipe_components')
+    inventory_item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='recipe_components')
+    quantity = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(menu_item__isnull=False, modifier__isnull=True) | Q(menu_item__isnull=True, modifier__isnull=False),
+                name='recipe_menu_item_xor_modifier',
+            ),
+            models.UniqueConstraint(fields=['menu_item', 'inventory_item'], name='recipe_menu_item_uniq'),
+            models.UniqueConstraint(fields=['modifier', 'inventory_item'], name='recipe_modifier_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.menu_item or self.modifier}: {self.quantity} {self.inventory_item.unit} {self.inventory_item.name}"
+
+class StockCount(models.Model):
+    """A physical count; `expected` is what the system held just before it."""
+    inventory_item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='counts')
+    counted_at = models.DateTimeField(default=timezone.now)
+    quantity = models.DecimalField(max_digits=10, decimal_places=2)
+    expected = models.DecimalField(max_digits=10, decimal_places=2)
+    counted_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    notes = models.CharField(max_length=255, blank=True, default='')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['inventory_item', 'counted_at'], name='stockcount_item_at_idx'),
+        ]
+
+    @property
+    def variance(self):
+        return self.quantity - self.expected
+
+    def __str__(self):
+        return f"{self.inventory_item.name} counted {self.quantity} at {self.counted_at:%Y-%m-%d %H:%M}"
+
+class StockMovement(models.Model):
+    """Append-only ledger: every change to an item's stock, as a signed quantity."""
+    KIND_CHOICES = [
+        ('RECEIPT', 'Receipt'),
+        ('SALE', 'Sale'),
+        ('WASTE', 'Waste'),
+        ('COUNT', 'Count adjustment'),
+    ]
+
+    inventory_item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='movements')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    quantity = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField(default=timezone.now)
+    order = models.ForeignKey('orders.Order', on_delete=models.SET_NULL, null=True, blank=True,
+                              related_name='stock_movements')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    notes = models.CharField(max_length=255, blank=True, default='')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['inventory_item', 'created_at'], name='stockmove_item_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.quantity} {self.inventory_item.name}"
+
+class StockSnapshot(models.Model):
+    """An item's stock as of `taken_at`: every movement with id <= `movement_upto` included."""
+    inventory_item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='snapshots')
+    taken_at = models.DateTimeField()
+    quantity = models.DecimalField(max_digits=12, decimal_places=2)
+    movement_upto = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['inventory_item', 'taken_at'], name='stocksnap_item_at_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.name} ({self.sku})"
\ No newline at end of file
+        return f"{self.inventory_item.name}: {self.quantity} at {self.taken_at:%Y-%m-%d %H:%M}"
@@ -1,5 +1,9 @@
+from decimal import Decimal
+
 from rest_framework import serializers
-from .models import Supplier, InventoryItem
+
+from menu.models import MenuItem, Modifier
+from .models import Supplier, InventoryItem, RecipeComponent, StockCount, StockMovement
 
 class SupplierSerializer(serializers.ModelSerializer):
     class Meta:
@@ -11,4 +15,51 @@ class InventoryItemSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = InventoryItem
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        read_only_fields = ['current_stock']  # changes only through the stock ledger (inventory.stock)
+
+    def update(self, instance, validated_data):
+        # Write only the submitted columns, so an edit never puts back a stale current_stock.
+        for name, value in validated_data.items():
+            setattr(instance, name, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        instance.refresh_from_db(fields=['current_stock'])
+        return instance
+
+class RecipeComponentSerializer(serializers.ModelSerializer):
+    inventory_item_name = serializers.CharField(source='inventory_item.name', read_only=True)
+    unit = serializers.CharField(source='inventory_item.unit', read_only=True)
+    # Declared so the unique constraints don't make both required; validate() wants exactly one.
+    menu_item = serializers.PrimaryKeyRelatedField(queryset=MenuItem.objects.all(), allow_null=True, default=None)
+    modifier = serializers.PrimaryKeyRelatedField(queryset=Modifier.objects.all(), allow_null=True, default=None)
+
+    class Meta:
+        model = RecipeComponent
+        fields = '__all__'
+
+    def validate(self, attrs):
+        menu_item = attrs.get('menu_item', getattr(self.instance, 'menu_item', None))
+        modifier = attrs.get('modifier', getattr(self.instance, 'modifier', None))
+        if (menu_item is None) == (modifier is None):
+            raise serializers.ValidationError("Set exactly one of menu_item or modifier.")
+        return attrs
+
+class StockCountSerializer(serializers.ModelSerializer):
+    variance = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = StockCount
+        fields = '__all__'
+        read_only_fields = ['expected', 'counted_by']
+
+class StockMovementSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StockMovement
+        fields = '__all__'
+
+class CountSerializer(serializers.Serializer):
+    quantity = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0'))
+    notes = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+
+class MovementInputSerializer(CountSerializer):
+    quantity = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
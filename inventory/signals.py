@@ -0,0 +1,5 @@
+from orders.signals import order_paid
+
+from . import consumption
+
+order_paid.connect(consumption.record_sale, dispatch_uid="inventory-recipe-deduction")
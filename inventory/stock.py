@@ -0,0 +1,132 @@
+"""
+Stock ledger.
+
+Every change to an item's stock is a StockMovement (receipt, sale, waste,
+count adjustment) with a signed quantity, and `post()` is the only writer:
+in one transaction it moves `InventoryItem.current_stock` with an `F()`
+UPDATE, which also locks the item row, and then appends the movements. So
+current stock always equals the latest snapshot plus the movements after
+it, and concurrent writers add to each other's changes instead of
+overwriting them.
+
+Because each item's movements are written under its row lock, their ids and
+timestamps grow together. That lets a StockSnapshot ("quantity as of
+taken_at, movements up to id N included") stand in for all the history
+before it:
+
+- `stock_at(item, when)` reads the latest snapshot at or before `when`
+  (index stocksnap_item_at_idx) and sums only the movements after it
+  (index stockmove_item_at_idx). The work depends on the movements since the
+  last snapshot, not on the item's whole history.
+- `take_snapshots()` (`manage.py snapshot_stock`, run it daily) keeps that gap short.
+- `compact(before)` (`manage.py compact_stock_movements`) folds older
+  movements into a snapshot at `before` and deletes them.
+
+A count replaces the stock with what was physically there. It keeps what the
+system expected, so the difference (waste, over-portioning, unrecorded usage)
+can be measured later.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Max, Sum
+from django.utils import timezone
+
+from .models import InventoryItem, StockCount, StockMovement, StockSnapshot
+
+ZERO = Decimal("0.00")
+SNAPSHOT_BATCH = 500
+
+
+def post(deltas, kind, order=None, user=None, notes=""):
+    """Apply {inventory_item_id: signed quantity}: one UPDATE per item (in id order), then one INSERT."""
+    with transaction.atomic():
+        for pk in sorted(deltas):
+            InventoryItem.objects.filter(pk=pk).update(
+                current_stock=F("current_stock") + deltas[pk], updated_at=timezone.now()
+            )
+        # Stamped after the row locks are held, so per item the timestamps follow the ids.
+        now = timezone.now()
+        return StockMovement.objects.bulk_create([
+            StockMovement(inventory_item_id=pk, kind=kind, quantity=deltas[pk], created_at=now,
+                          order=order, created_by=user, notes=notes)
+            for pk in sorted(deltas)
+        ])
+
+
+def receive(item, quantity, user=None, notes=""):
+    return post({item.pk: Decimal(quantity)}, "RECEIPT", user=user, notes=notes)[0]
+
+
+def waste(item, quantity, user=None, notes=""):
+    return post({item.pk: -Decimal(quantity)}, "WASTE", user=user, notes=notes)[0]
+
+
+def record_count(item, quantity, user=None, notes="", counted_at=None):
+    quantity = Decimal(quantity)
+    with transaction.atomic():
+        item = InventoryItem.objects.select_for_update().get(pk=item.pk)
+        count = StockCount.objects.create(
+            inventory_item=item,
+            counted_at=counted_at or timezone.now(),
+            quantity=quantity,
+            expected=item.current_stock,
+            counted_by=user,
+            notes=notes,
+        )
+        post({item.pk: quantity - item.current_stock}, "COUNT", user=user, notes=notes)
+    return count
+
+
+def stock_at(item, when):
+    """Stock of `item` (instance or id) at `when`: nearest snapshot plus the movements after it."""
+    snapshot = (
+        StockSnapshot.objects.filter(inventory_item=item, taken_at__lte=when)
+        .order_by("-taken_at", "-id").first()
+    )
+    movements = StockMovement.objects.filter(inventory_item=item, created_at__lte=when)
+    if snapshot is not None:
+        movements = movements.filter(created_at__gte=snapshot.taken_at, id__gt=snapshot.movement_upto)
+    base = snapshot.quantity if snapshot is not None else ZERO
+    return base + (movements.aggregate(total=Sum("quantity"))["total"] or ZERO)
+
+
+def take_snapshots(items=None):
+    """Snapshot the current stock of `items` (default: all), SNAPSHOT_BATCH items per transaction."""
+    ids = list((items if items is not None else InventoryItem.objects.all()).order_by("pk").values_list("pk", flat=True))
+    taken = 0
+    for start in range(0, len(ids), SNAPSHOT_BATCH):
+        with transaction.atomic():
+            # While the rows are locked no movement for them can be written, so every movement
+            # up to the current highest id is already counted in current_stock.
+            stock = list(
+                InventoryItem.objects.filter(pk__in=ids[start:start + SNAPSHOT_BATCH]).order_by("pk")
+                .select_for_update().values_list("pk", "current_stock")
+            )
+            upto = StockMovement.objects.aggregate(upto=Max("id"))["upto"] or 0
+            now = timezone.now()
+            taken += len(StockSnapshot.objects.bulk_create([
+                StockSnapshot(inventory_item_id=pk, taken_at=now, quantity=quantity, movement_upto=upto)
+                for pk, quantity in stock
+            ]))
+    return taken
+
+
+def compact(before):
+    """Replace each item's movements up to `before` with a snapshot at `before`; returns movements deleted."""
+    deleted = 0
+    item_ids = (
+        StockMovement.objects.filter(created_at__lte=before)
+        .order_by().values_list("inventory_item", flat=True).distinct()
+    )
+    for pk in list(item_ids):
+        with transaction.atomic():
+            old = StockMovement.objects.filter(inventory_item_id=pk, created_at__lte=before)
+            upto = old.aggregate(upto=Max("id"))["upto"]
+            if upto is None:
+                continue
+            StockSnapshot.objects.create(
+                inventory_item_id=pk, taken_at=before, quantity=stock_at(pk, before), movement_upto=upto
+            )
+            deleted += old.filter(id__lte=upto).delete()[0]
+    return deleted
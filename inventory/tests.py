@@ -0,0 +1,195 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Location, Organization
+from menu.models import MenuCategory, MenuItem, Modifier, ModifierGroup
+from orders.models import Order, OrderItem
+from . import stock
+from .models import InventoryItem, RecipeComponent, StockMovement
+from .serializers import InventoryItemSerializer
+
+
+class InventoryFixtures(TestCase):
+    def setUp(self):
+        org = Organization.objects.create(name="Org")
+        self.location = Location.objects.create(organization=org, name="Thamel")
+        self.other = Location.objects.create(organization=org, name="Patan")
+        category = MenuCategory.objects.create(organization=org, name="Mains")
+        self.burger = MenuItem.objects.create(category=category, name="Burger", price=Decimal("10.00"))
+        self.fries = MenuItem.objects.create(category=category, name="Fries", price=Decimal("3.00"))
+        group = ModifierGroup.objects.create(name="Extras")
+        self.cheese = Modifier.objects.create(modifier_group=group, name="Cheese")
+        self.admin = get_user_model().objects.create_user("admin", password="x", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def item(self, sku, stock, location=None, **fields):
+        return InventoryItem.objects.create(location=location or self.location, name=sku.title(), sku=sku,
+                                            current_stock=Decimal(stock), **fields)
+
+    def order(self, *lines, location=None):
+        order = Order.objects.create(location=location or self.location)
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, menu_item=menu_item, quantity=quantity, unit_price=menu_item.price,
+                      modifiers=list(modifiers))
+            for menu_item, quantity, *modifiers in lines
+        )
+        return order
+
+    def pay(self, order):
+        order.is_paid, order.status = True, "PAID"
+        order.save()
+        return order
+
+    def on_hand(self, item):
+        item.refresh_from_db()
+        return item.current_stock
+
+
+class RecipeDeductionTests(InventoryFixtures):
+    def test_only_the_paid_order_lines_are_summed(self):
+        bun = self.item("bun", "100")
+        RecipeComponent.objects.create(menu_item=self.burger, inventory_item=bun, quantity=1)
+        # Other orders of the same menu item must not leak into the Sum over the order_items join.
+        self.order((self.burger, 7))
+        self.order((self.burger, 5), location=self.other)
+
+        self.pay(self.order((self.burger, 2)))
+        self.assertEqual(self.on_hand(bun), Decimal("98.00"))
+        self.pay(self.order((self.burger, 1), (self.burger, 3)))
+        self.assertEqual(self.on_hand(bun), Decimal("94.00"))
+
+    def test_menu_item_and_modifier_recipes_at_the_order_location(self):
+        bun, beef, potato, cheddar = (self.item("bun", "100"), self.item("beef", "10", unit="KG"),
+                                      self.item("potato", "10", unit="KG"), self.item("cheddar", "50"))
+        elsewhere = self.item("beef-patan", "10", location=self.other)
+        RecipeComponent.objects.bulk_create([
+            RecipeComponent(menu_item=self.burger, inventory_item=bun, quantity=1),
+            RecipeComponent(menu_item=self.burger, inventory_item=beef, quantity=Decimal("0.15")),
+            RecipeComponent(menu_item=self.burger, inventory_item=elsewhere, quantity=Decimal("0.15")),
+            RecipeComponent(menu_item=self.fries, inventory_item=potato, quantity=Decimal("0.20")),
+            RecipeComponent(modifier=self.cheese, inventory_item=cheddar, quantity=2),
+        ])
+
+        order = self.pay(self.order(
+            (self.burger, 2, self.cheese.pk),
+            (self.burger, 1, {"id": self.cheese.pk, "name": "Cheese"}),
+            (self.fries, 3),
+        ))
+
+        self.assertEqual([self.on_hand(i) for i in (bun, beef, potato, cheddar, elsewhere)],
+                         [Decimal("97.00"), Decimal("9.55"), Decimal("9.40"), Decimal("44.00"), Decimal("10.00")])
+        self.assertEqual(
+            sorted(StockMovement.objects.filter(order=order).values_list("inventory_item", "kind", "quantity")),
+            sorted([(bun.pk, "SALE", Decimal("-3.00")), (beef.pk, "SALE", Decimal("-0.45")),
+                    (potato.pk, "SALE", Decimal("-0.60")), (cheddar.pk, "SALE", Decimal("-6.00"))]),
+        )
+
+    def test_usage_report_adds_count_shortfall_to_recipe_usage(self):
+        beef = self.item("beef", "10", unit="KG", cost_price=Decimal("20.00"))
+        RecipeComponent.objects.create(menu_item=self.burger, inventory_item=beef, quantity=Decimal("0.15"))
+        self.pay(self.order((self.burger, 3)))
+
+        response = self.client.post(f"/api/inventory/items/{beef.pk}/count/", {"quantity": "9.25"}, format="json")
+        self.assertEqual(response.json()["variance"], "-0.30")
+        row, = self.client.get("/api/reports/inventory/usage/").json()["items"]
+        self.assertEqual((row["theoretical"], row["actual"], row["variance_cost"]), ("0.45", "0.75", "6.00"))
+
+    def test_recipe_needs_exactly_one_of_menu_item_or_modifier(self):
+        bun = self.item("bun", "100")
+        body = {"inventory_item": bun.pk, "quantity": "1"}
+        self.assertEqual(self.client.post("/api/inventory/recipes/", body, format="json").status_code, 400)
+        both = {**body, "menu_item": self.burger.pk, "modifier": self.cheese.pk}
+        self.assertEqual(self.client.post("/api/inventory/recipes/", both, format="json").status_code, 400)
+        one = {**body, "menu_item": self.burger.pk}
+        self.assertEqual(self.client.post("/api/inventory/recipes/", one, format="json").status_code, 201)
+        self.assertEqual(self.client.post("/api/inventory/recipes/", one, format="json").status_code, 400)
+        pick = {**body, "modifier": self.cheese.pk}
+        self.assertEqual(self.client.post("/api/inventory/recipes/", pick, format="json").status_code, 201)
+
+
+class StockLedgerTests(InventoryFixtures):
+    def setUp(self):
+        super().setUp()
+        self.beef = self.item("beef", "0", unit="KG")
+
+    def backdate(self, movements, when):
+        StockMovement.objects.filter(pk__in=[m.pk for m in movements]).update(created_at=when)
+
+    def test_movements_move_current_stock(self):
+        receipt = stock.receive(self.beef, "10")
+        waste = stock.waste(self.beef, "1.5")
+        count = stock.record_count(self.beef, "8", user=self.admin)
+
+        self.assertEqual(self.on_hand(self.beef), Decimal("8.00"))
+        self.assertEqual((receipt.kind, receipt.quantity, waste.kind, waste.quantity),
+                         ("RECEIPT", Decimal("10"), "WASTE", Decimal("-1.5")))
+        self.assertEqual((count.expected, count.variance), (Decimal("8.50"), Decimal("-0.50")))
+        self.assertEqual(StockMovement.objects.get(kind="COUNT").quantity, Decimal("-0.50"))
+        self.assertEqual(stock.stock_at(self.beef, timezone.now()), Decimal("8.00"))
+
+    def test_item_actions(self):
+        url = f"/api/inventory/items/{self.beef.pk}/"
+        self.assertEqual(self.client.post(url + "receive/", {"quantity": "10"}, format="json").status_code, 201)
+        self.assertEqual(self.client.post(url + "waste/", {"quantity": "0"}, format="json").status_code, 400)
+        self.assertEqual(self.client.post(url + "waste/", {"quantity": "2"}, format="json").status_code, 201)
+        self.assertEqual(self.client.get(url + "stock/").json()["quantity"], "8.00")
+        self.assertEqual(self.client.get(url + "stock/", {"at": "yesterday"}).status_code, 400)
+
+    def test_edits_never_write_current_stock(self):
+        stock.receive(self.beef, "10")
+        response = self.client.patch(f"/api/inventory/items/{self.beef.pk}/",
+                                     {"current_stock": "999", "minimum_stock": "2"}, format="json")
+        self.assertEqual((response.json()["current_stock"], response.json()["minimum_stock"]), ("10.00", "2.00"))
+
+        stale = InventoryItem.objects.get(pk=self.beef.pk)
+        stock.waste(self.beef, "1.5")
+        serializer = InventoryItemSerializer(stale, data={"name": "Beef mince"}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.assertEqual(serializer.data["current_stock"], "8.50")
+        self.assertEqual(self.on_hand(self.beef), Decimal("8.50"))
+
+    def test_stock_at_reads_history_across_snapshots(self):
+        start = timezone.now() - timedelta(days=30)
+        for day in range(3):
+            self.backdate([stock.receive(self.beef, "10")], start + timedelta(days=day))
+        self.backdate([stock.waste(self.beef, "4")], start + timedelta(days=2, hours=1))
+        self.assertEqual(stock.take_snapshots(), 1)
+        stock.receive(self.beef, "1")
+
+        self.assertEqual(stock.stock_at(self.beef, start - timedelta(hours=1)), Decimal("0"))
+        self.assertEqual(stock.stock_at(self.beef, start + timedelta(days=1, hours=12)), Decimal("20"))
+        self.assertEqual(stock.stock_at(self.beef, start + timedelta(days=2, hours=2)), Decimal("26"))
+        self.assertEqual(stock.stock_at(self.beef, timezone.now()), self.on_hand(self.beef))
+        with self.assertNumQueries(2):
+            stock.stock_at(self.beef, timezone.now())
+
+    def test_compact_keeps_stock_at(self):
+        start = timezone.now() - timedelta(days=200)
+        for day in range(4):
+            self.backdate([stock.receive(self.beef, "5")], start + timedelta(days=day * 50))
+        stock.waste(self.beef, "2")
+        cutoff = start + timedelta(days=120)
+        later = [start + timedelta(days=130), start + timedelta(days=160)]
+        before = [stock.stock_at(self.beef, when) for when in later]
+
+        self.assertEqual(stock.compact(cutoff), 3)
+        self.assertEqual(StockMovement.objects.filter(inventory_item=self.beef).count(), 2)
+        self.assertEqual(stock.stock_at(self.beef, cutoff), Decimal("15"))
+        self.assertEqual([stock.stock_at(self.beef, when) for when in later], before)
+        self.assertEqual(stock.stock_at(self.beef, timezone.now()), self.on_hand(self.beef))
+
+        call_command("snapshot_stock", stdout=StringIO())
+        stock.receive(self.beef, "1")
+        self.assertEqual(self.on_hand(self.beef), Decimal("19.00"))
+        self.assertEqual(stock.stock_at(self.beef, timezone.now()), self.on_hand(self.beef))
+        with self.assertRaisesMessage(CommandError, "--before must be a YYYY-MM-DD date"):
+            call_command("compact_stock_movements", "--before", "2026-02-30", stdout=StringIO())
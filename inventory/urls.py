@@ -1,8 +1,11 @@
 from rest_framework.routers import DefaultRouter
-from .views import SupplierViewSet, InventoryItemViewSet
+from .views import SupplierViewSet, InventoryItemViewSet, RecipeComponentViewSet, StockCountViewSet, StockMovementViewSet
 
 router = DefaultRouter()
 router.register('inventory/suppliers', SupplierViewSet)
 router.register('inventory/items', InventoryItemViewSet)
+router.register('inventory/recipes', RecipeComponentViewSet)
+router.register('inventory/counts', StockCountViewSet)
+router.register('inventory/movements', StockMovementViewSet)
 
 urlpatterns = router.urls
@@ -1,16 +1,101 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError
+from rest_framework.response import Response
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Supplier, InventoryItem
-from .serializers import SupplierSerializer, InventoryItemSerializer
+from . import stock
+from .models import Supplier, InventoryItem, RecipeComponent, StockCount, StockMovement
+from .serializers import (
+    CountSerializer, MovementInputSerializer, SupplierSerializer, InventoryItemSerializer, RecipeComponentSerializer,
+    StockCountSerializer, StockMovementSerializer,
+)
 
 class SupplierViewSet(viewsets.ModelViewSet):
     queryset = Supplier.objects.all()
     serializer_class = SupplierSerializer
+    permission_classes = [permissions.IsAdminUser]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['is_active']
 
 class InventoryItemViewSet(viewsets.ModelViewSet):
     queryset = InventoryItem.objects.select_related('supplier', 'location').all()
     serializer_class = InventoryItemSerializer
+    permission_classes = [permissions.IsAdminUser]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['location', 'supplier', 'is_active', 'unit']
+
+    @action(detail=True, methods=['post'])
+    def count(self, request, pk=None):
+        """
+        Record a physical count; current stock becomes the counted quantity.
+        Body: {"quantity": "12.50", "notes": optional}
+        """
+        item = self.get_object()
+        params = CountSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        count = stock.record_count(item, params.validated_data['quantity'], request.user, params.validated_data['notes'])
+        return Response(StockCountSerializer(count).data, status=201)
+
+    def _move(self, request, post):
+        item = self.get_object()
+        params = MovementInputSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        movement = post(item, params.validated_data['quantity'], request.user, params.validated_data['notes'])
+        return Response(StockMovementSerializer(movement).data, status=201)
+
+    @action(detail=True, methods=['post'])
+    def receive(self, request, pk=None):
+        """Goods received. Body: {"quantity": "5.00", "notes": optional}"""
+        return self._move(request, stock.receive)
+
+    @action(detail=True, methods=['post'])
+    def waste(self, request, pk=None):
+        """Stock thrown away. Body: {"quantity": "0.50", "notes": optional}"""
+        return self._move(request, stock.waste)
+
+    @action(detail=True, methods=['get'], url_path='stock')
+    def stock_at(self, request, pk=None):
+        """
+        Stock at a point in time, from the nearest snapshot plus later movements.
+        GET /api/inventory/items/<id>/stock/?at=<ISO datetime> (default now)
+        """
+        item = self.get_object()
+        at = request.query_params.get('at')
+        try:
+            when = parse_datetime(at) if at else timezone.now()
+        except ValueError:
+            when = None
+        if when is None:
+            raise ParseError("at must be an ISO 8601 datetime.")
+        if timezone.is_naive(when):
+            when = timezone.make_aware(when, item.location.tzinfo)
+        return Response({"inventory_item": item.pk, "at": when, "quantity": str(stock.stock_at(item, when))})
+
+class RecipeComponentViewSet(viewsets.ModelViewSet):
+    queryset = RecipeComponent.objects.select_related('inventory_item').all()
+    serializer_class = RecipeComponentSerializer
+    permission_classes = [permissions.IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['menu_item', 'modifier', 'inventory_item', 'inventory_item__location']
+    keyset_ordering = ('id',)
+
+class StockMovementViewSet(viewsets.ReadOnlyModelViewSet):
+    """The append-only stock ledger; movements are written by sales and the item actions."""
+    queryset = StockMovement.objects.all()
+    serializer_class = StockMovementSerializer
+    permission_classes = [permissions.IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = {'inventory_item': ['exact'], 'inventory_item__location': ['exact'], 'kind': ['exact'],
+                        'order': ['exact'], 'created_at': ['gte', 'lte']}
+    keyset_ordering = ('-created_at', '-id')
+
+class StockCountViewSet(viewsets.ReadOnlyModelViewSet):
+    """Counts are recorded through POST inventory/items/<id>/count/."""
+    queryset = StockCount.objects.select_related('inventory_item').all()
+    serializer_class = StockCountSerializer
+    permission_classes = [permissions.IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['inventory_item', 'inventory_item__location']
+    keyset_ordering = ('-counted_at', '-id')
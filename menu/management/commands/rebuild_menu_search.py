@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from menu.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the menu full-text search index (FTS5 on SQLite, tsvector/GIN on PostgreSQL)."
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS("Menu search index rebuilt."))
@@ -0,0 +1,129 @@
+"""
+Ranked, prefix-matching menu search backed by a database index.
+
+- SQLite: an external-content FTS5 table kept in sync by triggers.
+- PostgreSQL: a generated `tsvector` column with a GIN index.
+
+Both are maintained by the database on every write (including bulk/queryset
+updates), so queries never scan `menu_menuitem`.
+"""
+import re
+
+from django.db import connection
+
+from .models import MenuItem
+
+FTS_TABLE = "menu_menuitem_fts"
+PG_INDEX = "menu_menuitem_search_gin"
+
+_SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description,
+        content='menu_menuitem', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON menu_menuitem BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON menu_menuitem BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON menu_menuitem BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+_POSTGRES_DDL = [
+    """ALTER TABLE menu_menuitem ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+        ) STORED""",
+    f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON menu_menuitem USING GIN (search_vector)",
+]
+
+
+def install_index(conn=connection):
+    """Create the index structures (idempotent)."""
+    statements = {"sqlite": _SQLITE_DDL, "postgresql": _POSTGRES_DDL}.get(conn.vendor, [])
+    with conn.cursor() as cur:
+        for sql in statements:
+            cur.execute(sql)
+
+
+def drop_index(conn=connection):
+    if conn.vendor == "sqlite":
+        statements = [f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{t}" for t in ("ai", "ad", "au")]
+        statements.append(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif conn.vendor == "postgresql":
+        statements = [f"DROP INDEX IF EXISTS {PG_INDEX}", "ALTER TABLE menu_menuitem DROP COLUMN IF EXISTS search_vector"]
+    else:
+        statements = []
+    with conn.cursor() as cur:
+        for sql in statements:
+            cur.execute(sql)
+
+
+def rebuild_index(conn=connection):
+    """Re-create triggers/columns if missing and re-index every row."""
+    install_index(conn)
+    with conn.cursor() as cur:
+        if conn.vendor == "sqlite":
+            cur.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif conn.vendor == "postgresql":
+            cur.execute(f"REINDEX INDEX {PG_INDEX}")
+
+
+def _terms(q):
+    return re.findall(r"\w+", q.lower())[:8]
+
+
+def search_ids(q, organization_id=None, limit=20):
+    """Return MenuItem ids for `q`, best match first."""
+    terms = _terms(q)
+    if not terms:
+        return []
+
+    org_sql = " AND c.organization_id = %s" if organization_id else ""
+    org_params = [organization_id] if organization_id else []
+
+    if connection.vendor == "sqlite":
+        match = " ".join(f'"{t}"*' for t in terms)
+        sql = f"""
+            SELECT m.id FROM {FTS_TABLE} f
+            JOIN menu_menuitem m ON m.id = f.rowid
+            JOIN menu_menucategory c ON c.id = m.category_id
+            WHERE {FTS_TABLE} MATCH %s AND m.is_available{org_sql}
+            ORDER BY bm25({FTS_TABLE}, 10.0, 1.0)
+            LIMIT %s
+        """
+        params = [match, *org_params, limit]
+    elif connection.vendor == "postgresql":
+        tsquery = " & ".join(f"{t}:*" for t in terms)
+        sql = f"""
+            SELECT m.id FROM menu_menuitem m
+            JOIN menu_menucategory c ON c.id = m.category_id
+            WHERE m.search_vector @@ to_tsquery('simple', %s) AND m.is_available{org_sql}
+            ORDER BY ts_rank(m.search_vector, to_tsquery('simple', %s)) DESC, m.id
+            LIMIT %s
+        """
+        params = [tsquery, *org_params, tsquery, limit]
+    else:
+        # No index support on this backend: plain (unranked) substring match.
+        qs = MenuItem.objects.filter(is_available=True)
+        for t in terms:
+            qs = qs.filter(name__icontains=t) | qs.filter(description__icontains=t)
+        if organization_id:
+            qs = qs.filter(category__organization_id=organization_id)
+        return list(qs.values_list("id", flat=True)[:limit])
+
+    with connection.cursor() as cur:
+        cur.execute(sql, params)
+        return [row[0] for row in cur.fetchall()]
+
+
+def search(q, organization_id=None, limit=20):
+    ids = search_ids(q, organization_id=organization_id, limit=limit)
+    by_id = MenuItem.objects.select_related("category").in_bulk(ids)
+    return [by_id[i] for i in ids if i in by_id]
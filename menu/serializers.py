@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import MenuItem, MenuCategory
+from .models import MenuItem, MenuCategory, ModifierGroup, Modifier
 
 class MenuCategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -25,3 +25,53 @@ class MenuItemSerializer(serializers.ModelSerializer):
             "sort_order",
             "created_at",
         )
+
+
+# ---------- Catalog (categories -> items -> modifier groups -> modifiers) ----------
+class CatalogModifierSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Modifier
+        fields = ("id", "name", "price", "sort_order")
+
+
+class CatalogModifierGroupSerializer(serializers.ModelSerializer):
+    modifiers = CatalogModifierSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = ModifierGroup
+        fields = (
+            "id",
+            "name",
+            "selection_type",
+            "min_selections",
+            "max_selections",
+            "is_required",
+            "sort_order",
+            "modifiers",
+        )
+
+
+class CatalogItemSerializer(serializers.ModelSerializer):
+    modifier_groups = CatalogModifierGroupSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = MenuItem
+        fields = (
+            "id",
+            "name",
+            "description",
+            "price",
+            "image",
+            "is_vegetarian",
+            "preparation_time",
+            "sort_order",
+            "modifier_groups",
+        )
+
+
+class CatalogCategorySerializer(serializers.ModelSerializer):
+    items = CatalogItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = MenuCategory
+        fields = ("id", "name", "description", "image", "sort_order", "items")
@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+from .models import MenuCategory, MenuItem, ModifierGroup, Modifier
+from .snapshot import bump_version
+
+
+def _bump_menu_version(sender, **kwargs):
+    # Bump after commit so readers never cache pre-commit rows under the new version.
+    transaction.on_commit(bump_version)
+
+
+for _model in (MenuCategory, MenuItem, ModifierGroup, Modifier):
+    post_save.connect(_bump_menu_version, sender=_model, dispatch_uid=f"menu-version-save-{_model.__name__}")
+    post_delete.connect(_bump_menu_version, sender=_model, dispatch_uid=f"menu-version-delete-{_model.__name__}")
+
+m2m_changed.connect(
+    _bump_menu_version,
+    sender=ModifierGroup.menu_items.through,
+    dispatch_uid="menu-version-modifier-groups",
+)
@@ -0,0 +1,82 @@
+"""
+Versioned, pre-rendered menu snapshots.
+
+Every write to the menu bumps one version counter in the shared cache, and
+rendered JSON is stored per version. A steady-state read is two cache hits
+and no SQL; a client holding the current ETag gets a bodyless 304.
+"""
+import hashlib
+import time
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+
+VERSION_KEY = "menu:version"
+SNAPSHOT_TTL = 60 * 60 * 24  # versions change on write; this only bounds memory
+
+
+def _seed_version():
+    # Seed from the clock so a flushed cache never hands out an old version again.
+    cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+
+
+def current_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        _seed_version()
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version() -> int:
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        _seed_version()
+        return cache.incr(VERSION_KEY)
+
+
+class _MediaHost:
+    """Stands in for the request in serializer context: absolute URLs from MEDIA_BASE_URL."""
+
+    def __init__(self, base):
+        self.base = base
+
+    def build_absolute_uri(self, location):
+        return urljoin(self.base, location)
+
+
+def serializer_context():
+    """Context for snapshot serializers; a request's own host must not leak into a shared snapshot."""
+    base = getattr(settings, "MEDIA_BASE_URL", "")
+    return {"request": _MediaHost(base)} if base else {}
+
+
+def get_snapshot(name, build):
+    """
+    Return (etag, body) for snapshot `name` at the current menu version.
+    `build` is only called on a miss and must return serializer data.
+    """
+    key = f"menu:snapshot:{name}:{current_version()}"
+    hit = cache.get(key)
+    if hit is None:
+        body = JSONRenderer().render(build())
+        hit = ('"%s"' % hashlib.sha256(body).hexdigest(), body)
+        cache.set(key, hit, SNAPSHOT_TTL)
+    return hit
+
+
+def snapshot_response(request, name, build):
+    etag, body = get_snapshot(name, build)
+    if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    # Let browsers keep the body but always revalidate (cheap 304).
+    response["Cache-Control"] = "no-cache"
+    return response
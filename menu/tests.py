@@ -0,0 +1,161 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from core.models import Organization
+from . import search
+from .models import MenuCategory, MenuItem, ModifierGroup, Modifier
+
+
+class CatalogQueryCountTests(TestCase):
+    """The catalog must cost the same fixed number of queries at any menu size."""
+
+    CATALOG_QUERIES = 4  # categories, items, modifier groups, modifiers
+
+    def setUp(self):
+        cache.clear()
+        self.org = Organization.objects.create(name="Org")
+        self.other_org = Organization.objects.create(name="Other")
+
+    def _seed(self, categories, items_per_category, org=None):
+        org = org or self.org
+        cats = MenuCategory.objects.bulk_create(
+            MenuCategory(organization=org, name=f"Cat {i}", sort_order=i) for i in range(categories)
+        )
+        items = MenuItem.objects.bulk_create(
+            MenuItem(category=c, name=f"{c.name} item {j}", price=10)
+            for c in cats for j in range(items_per_category)
+        )
+        group = ModifierGroup.objects.create(name=f"Extras {org.pk}")
+        Modifier.objects.bulk_create(Modifier(modifier_group=group, name=f"Mod {k}") for k in range(3))
+        group.menu_items.add(*items)
+        return items
+
+    def _get_catalog(self, org):
+        cache.clear()
+        with self.assertNumQueries(self.CATALOG_QUERIES):
+            response = self.client.get("/api/menu/catalog/", {"organization": org.pk})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_query_count_is_constant_as_menu_grows(self):
+        self._seed(categories=2, items_per_category=5)
+        small = self._get_catalog(self.org)
+        self.assertEqual(sum(len(c["items"]) for c in small), 10)
+
+        self._seed(categories=20, items_per_category=150)
+        large = self._get_catalog(self.org)
+        self.assertEqual(sum(len(c["items"]) for c in large), 3010)
+        self.assertEqual(len(large[0]["items"][0]["modifier_groups"][0]["modifiers"]), 3)
+
+    def test_filters_by_organization_and_serves_from_snapshot(self):
+        self._seed(categories=1, items_per_category=2)
+        self._seed(categories=3, items_per_category=2, org=self.other_org)
+        self.assertEqual(len(self._get_catalog(self.org)), 1)
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/menu/catalog/", {"organization": self.org.pk})
+        self.assertEqual(response.status_code, 200)
+
+    def test_requires_organization(self):
+        self.assertEqual(self.client.get("/api/menu/catalog/").status_code, 400)
+
+
+class MenuItemSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        org = Organization.objects.create(name="Org")
+        category = MenuCategory.objects.create(organization=org, name="Mains")
+        MenuItem.objects.create(category=category, name="Burger", price=10, image="menu_items/burger.jpg")
+
+    def test_cached_read_and_revalidation_run_no_sql(self):
+        first = self.client.get("/api/menu/items/")
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            cached = self.client.get("/api/menu/items/")
+        self.assertEqual(cached.content, first.content)
+        with self.assertNumQueries(0):
+            not_modified = self.client.get("/api/menu/items/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_write_invalidates_snapshot(self):
+        etag = self.client.get("/api/menu/items/")["ETag"]
+        item = MenuItem.objects.get()
+        item.price = 12
+        with self.captureOnCommitCallbacks(execute=True):
+            item.save()
+        response = self.client.get("/api/menu/items/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["price"], "12.00")
+
+    @override_settings(MEDIA_BASE_URL="https://api.example.com")
+    def test_image_urls_use_configured_host(self):
+        response = self.client.get("/api/menu/items/", HTTP_HOST="localhost")
+        self.assertEqual(response.json()[0]["image"], "https://api.example.com/media/menu_items/burger.jpg")
+
+    def test_image_urls_are_relative_without_configured_host(self):
+        response = self.client.get("/api/menu/items/")
+        self.assertEqual(response.json()[0]["image"], "/media/menu_items/burger.jpg")
+
+
+class MenuSearchTests(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org")
+        category = MenuCategory.objects.create(organization=self.org, name="Mains")
+        self.chicken = MenuItem.objects.create(category=category, name="Chicken momo", price=8,
+                                               description="Steamed dumplings")
+        self.soup = MenuItem.objects.create(category=category, name="Thukpa", price=7,
+                                            description="Noodle soup with chicken stock")
+        self.buff = MenuItem.objects.create(category=category, name="Buff momo", price=8)
+        other = MenuCategory.objects.create(organization=Organization.objects.create(name="Other"), name="Mains")
+        self.elsewhere = MenuItem.objects.create(category=other, name="Chicken momo", price=9)
+
+    def test_prefix_match_ranks_name_above_description(self):
+        self.assertEqual(search.search_ids("chick", organization_id=self.org.pk), [self.chicken.pk, self.soup.pk])
+        self.assertEqual(sorted(search.search_ids("mom", organization_id=self.org.pk)),
+                         sorted([self.chicken.pk, self.buff.pk]))
+        self.assertEqual(search.search_ids("chi mo", organization_id=self.org.pk), [self.chicken.pk])
+        self.assertEqual(search.search_ids("?!"), [])
+
+    def test_filters_by_organization_and_availability(self):
+        self.assertEqual(sorted(search.search_ids("chicken momo")), sorted([self.chicken.pk, self.elsewhere.pk]))
+        MenuItem.objects.filter(pk=self.chicken.pk).update(is_available=False)
+        self.assertEqual(search.search_ids("chicken momo", organization_id=self.org.pk), [])
+
+        response = self.client.get("/api/menu/search/", {"q": "chick", "organization": self.org.pk})
+        self.assertEqual([row["name"] for row in response.json()], ["Thukpa"])
+
+    def test_index_follows_writes(self):
+        self.buff.name = "Veg momo"
+        self.buff.save()
+        MenuItem.objects.filter(pk=self.soup.pk).update(description="Noodle soup")
+        self.chicken.delete()
+        self.assertEqual(search.search_ids("buff"), [])
+        self.assertEqual(search.search_ids("veg"), [self.buff.pk])
+        self.assertEqual(search.search_ids("chicken", organization_id=self.org.pk), [])
+
+    @skipUnless(connection.vendor == "sqlite", "FTS5 triggers are SQLite-only")
+    def test_sqlite_index_survives_migrations(self):
+        # SQLite ALTERs rebuild menu_menuitem and silently drop its triggers; any migration that
+        # remakes the table must re-run menu.search.rebuild_index afterwards or this test fails.
+        with connection.cursor() as cur:
+            cur.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'menu_menuitem'")
+            self.assertEqual(sorted(row[0] for row in cur.fetchall()),
+                             [f"{search.FTS_TABLE}_{t}" for t in ("ad", "ai", "au")])
+            cur.execute(f"INSERT INTO {search.FTS_TABLE}({search.FTS_TABLE}, rank) VALUES ('integrity-check', 1)")
+
+    @skipUnless(connection.vendor == "sqlite", "FTS5 triggers are SQLite-only")
+    def test_rebuild_command_restores_a_stale_index(self):
+        with connection.cursor() as cur:  # lose every row, as when the triggers were dropped by a table rebuild
+            cur.execute(f"INSERT INTO {search.FTS_TABLE}({search.FTS_TABLE}) VALUES ('delete-all')")
+        self.assertEqual(search.search_ids("momo"), [])
+
+        out = StringIO()
+        call_command("rebuild_menu_search", stdout=out)
+        self.assertIn("rebuilt", out.getvalue())
+        self.assertEqual(search.search_ids("thuk"), [self.soup.pk])
+        self.assertEqual(len(search.search_ids("momo")), 3)
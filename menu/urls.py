@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import MenuItemViewSet, MenuCategoryViewSet
+from .views import MenuItemViewSet, MenuCategoryViewSet, catalog, search
 
 app_name = "menu"
 
@@ -9,5 +9,7 @@ router.register(r"menu/categories", MenuCategoryViewSet, basename="menu-categori
 router.register(r"menu/items", MenuItemViewSet, basename="menu-items")
 
 urlpatterns = [
+    path("menu/catalog/", catalog, name="menu-catalog"),
+    path("menu/search/", search, name="menu-search"),
     path("", include(router.urls)),
 ]
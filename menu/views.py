@@ -1,16 +1,92 @@
-from rest_framework import viewsets, permissions
-from .models import MenuItem, MenuCategory
-from .serializers import MenuItemSerializer, MenuCategorySerializer
+from django.db.models import Prefetch
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import api_view, permission_classes, authentication_classes
+from rest_framework.response import Response
+from .models import MenuItem, MenuCategory, ModifierGroup, Modifier
+from .serializers import MenuItemSerializer, MenuCategorySerializer, CatalogCategorySerializer
+from .snapshot import serializer_context, snapshot_response
+from . import search as menu_search
 
 
 class MenuCategoryViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = MenuCategory.objects.all().order_by("name")
     serializer_class = MenuCategorySerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = None  # small, name-ordered; clients expect a plain list
 
 
 class MenuItemViewSet(viewsets.ReadOnlyModelViewSet):
     # Only expose items that are available to order
-    queryset = MenuItem.objects.filter(is_available=True).order_by("sort_order", "name")
+    queryset = MenuItem.objects.filter(is_available=True).select_related("category").order_by("sort_order", "name")
     serializer_class = MenuItemSerializer
     permission_classes = [permissions.AllowAny]
+    # Public menu: skip token/user lookups so snapshot hits cost no SQL at all
+    authentication_classes = []
+    pagination_class = None
+
+    def list(self, request, *args, **kwargs):
+        return snapshot_response(request, "items", self._build_items)
+
+    def _build_items(self):
+        # The snapshot is shared by every client: image URLs are built from MEDIA_BASE_URL, not the request.
+        return MenuItemSerializer(self.get_queryset(), many=True, context=serializer_context()).data
+
+
+def catalog_queryset(organization_id):
+    """
+    Active categories of one organization with available items, their
+    modifier groups and available modifiers: four queries regardless of size.
+    """
+    modifiers = Prefetch("modifiers", queryset=Modifier.objects.filter(is_available=True))
+    groups = Prefetch(
+        "modifier_groups",
+        queryset=ModifierGroup.objects.order_by("sort_order", "name").prefetch_related(modifiers),
+    )
+    items = Prefetch(
+        "items",
+        queryset=MenuItem.objects.filter(is_available=True).order_by("sort_order", "name").prefetch_related(groups),
+    )
+    return (
+        MenuCategory.objects.filter(organization_id=organization_id, is_active=True)
+        .order_by("sort_order", "name")
+        .prefetch_related(items)
+    )
+
+
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+@authentication_classes([])
+def catalog(request):
+    """
+    GET /api/menu/catalog/?organization=<id>
+    Whole menu as one nested document: categories -> items -> modifier groups -> modifiers.
+    """
+    org = request.query_params.get("organization", "")
+    if not org.isdigit():
+        return Response(
+            {"organization": ["A numeric organization id is required."]},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return snapshot_response(
+        request,
+        f"catalog:{org}",
+        lambda: CatalogCategorySerializer(catalog_queryset(int(org)), many=True, context=serializer_context()).data,
+    )
+
+
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+@authentication_classes([])
+def search(request):
+    """
+    GET /api/menu/search/?q=<text>[&organization=<id>][&limit=<n>]
+    Available items ranked by relevance; every word is prefix-matched.
+    """
+    q = request.query_params.get("q", "").strip()
+    org = request.query_params.get("organization", "")
+    try:
+        limit = min(max(int(request.query_params.get("limit", 20)), 1), 50)
+    except ValueError:
+        limit = 20
+    items = menu_search.search(q, organization_id=int(org) if org.isdigit() else None, limit=limit) if q else []
+    return Response(MenuItemSerializer(items, many=True, context={"request": request}).data)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .models import Cart, Order, OrderItem
 
 
 class OrderItemInline(admin.TabularInline):
@@ -19,3 +19,10 @@ class OrderAdmin(admin.ModelAdmin):
     raw_id_fields = ("created_by", "location")
     list_select_related = ("created_by", "location")
     ordering = ("-created_at",)
+
+
+@admin.register(Cart)
+class CartAdmin(admin.ModelAdmin):
+    list_display = ("key", "updated_at")
+    search_fields = ("key",)
+    readonly_fields = ("key", "items", "updated_at")
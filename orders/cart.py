@@ -0,0 +1,135 @@
+"""
+Cart store.
+
+Carts live in the configured cache, keyed by user (authenticated) or by a
+random `cart_id` cookie (anonymous), so cart reads never touch the session
+table and never write anything. A write happens only when the content
+changes, and each write resets the CART_TTL expiry, so abandoned carts
+simply age out.
+
+With CART_WRITE_BEHIND on, changed carts are also copied to `orders.Cart`
+by a debounced Celery task and read back from there on a cache miss.
+"""
+import logging
+import re
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CART_ID_RE = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+
+def cart_ttl():
+    return getattr(settings, "CART_TTL", 7 * 24 * 3600)
+
+
+def cart_cookie_name():
+    return getattr(settings, "CART_COOKIE_NAME", "cart_id")
+
+
+def cache_key(key):
+    return f"cart:{key}"
+
+
+def dirty_key(key):
+    return f"cart:dirty:{key}"
+
+
+class CartStore:
+    def __init__(self, key=None, write_behind=None):
+        self.key = key
+        self.issued = False  # True when a new anonymous cart id must be sent as a cookie
+        if write_behind is None:
+            write_behind = getattr(settings, "CART_WRITE_BEHIND", False)
+        self.write_behind = write_behind
+
+    @classmethod
+    def for_request(cls, request):
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return cls.for_user(user.pk)
+        cart_id = request.COOKIES.get(cart_cookie_name(), "")
+        return cls(f"anon:{cart_id}" if CART_ID_RE.match(cart_id) else None)
+
+    @classmethod
+    def for_user(cls, user_id):
+        return cls(f"user:{user_id}")
+
+    # ---- reads ----
+    def get(self):
+        if self.key is None:
+            return []
+        items = cache.get(cache_key(self.key))
+        if items is None and self.write_behind:
+            items = self._load_persisted()
+        return items or []
+
+    def _load_persisted(self):
+        from orders.models import Cart
+
+        cutoff = timezone.now() - timedelta(seconds=cart_ttl())
+        items = Cart.objects.filter(key=self.key, updated_at__gte=cutoff).values_list("items", flat=True).first()
+        if items is not None:
+            cache.set(cache_key(self.key), items, cart_ttl())
+        return items
+
+    # ---- writes ----
+    def set(self, items):
+        """Store `items` if they differ from the current cart; returns True if anything was written."""
+        items = list(items)
+        if items == self.get():
+            return False
+        if self.key is None:
+            self.key = f"anon:{secrets.token_urlsafe(24)}"
+            self.issued = True
+        cache.set(cache_key(self.key), items, cart_ttl())
+        if self.write_behind:
+            self._schedule_persist()
+        return True
+
+    def clear(self):
+        # An empty list (not a delete) so a write-behind copy is not read back in.
+        return self.set([])
+
+    def _schedule_persist(self):
+        from orders.tasks import persist_cart_task
+
+        delay = getattr(settings, "CART_WRITE_BEHIND_DELAY", 30)
+        # One pending task per cart; writes inside the window ride along with it.
+        if not cache.add(dirty_key(self.key), 1, delay + 60):
+            return
+        try:
+            persist_cart_task.apply_async((self.key,), countdown=delay)
+        except Exception:
+            cache.delete(dirty_key(self.key))
+            logger.exception("Could not queue cart write-behind for %s", self.key)
+
+    def apply_cookie(self, request, response):
+        """Send a freshly issued anonymous cart id to the browser."""
+        if self.issued:
+            response.set_cookie(
+                cart_cookie_name(),
+                self.key.split(":", 1)[1],
+                max_age=cart_ttl(),
+                httponly=True,
+                samesite="Lax",
+                secure=request.is_secure(),
+            )
+        return response
+
+
+def persist(key):
+    """Copy the cached cart to `orders.Cart` (or drop the row when it is empty or expired)."""
+    from orders.models import Cart
+
+    cache.delete(dirty_key(key))
+    items = cache.get(cache_key(key))
+    if items:
+        Cart.objects.update_or_create(key=key, defaults={"items": items})
+    else:
+        Cart.objects.filter(key=key).delete()
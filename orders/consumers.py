@@ -1,11 +1,62 @@
+import asyncio
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+
+
+@database_sync_to_async
+def _user_from_token(token):
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+    auth = JWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(token))
+    except (InvalidToken, TokenError):
+        return None
+
+
 class OrderConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Staff-only order stream for one location. Events arriving within
+    ORDER_EVENTS_COALESCE_MS are sent as a single frame, keeping only the
+    latest event per order.
+    """
+
     async def connect(self):
-        self.location_id = self.scope['url_route']['kwargs'].get('location_id','default')
+        user = self.scope.get("user")
+        if not (user and user.is_authenticated):
+            token = parse_qs(self.scope.get("query_string", b"").decode()).get("token", [None])[0]
+            user = await _user_from_token(token) if token else None
+        if not (user and user.is_staff):
+            await self.close(code=4403)
+            return
+        self.location_id = self.scope['url_route']['kwargs'].get('location_id', 'default')
         self.group = f"loc_{self.location_id}_orders"
+        self.window = getattr(settings, "ORDER_EVENTS_COALESCE_MS", 250) / 1000
+        self.pending = {}
+        self.flush_task = None
         await self.channel_layer.group_add(self.group, self.channel_name)
         await self.accept()
+
     async def disconnect(self, code):
-        await self.channel_layer.group_discard(self.group, self.channel_name)
+        if getattr(self, "flush_task", None):
+            self.flush_task.cancel()
+        if hasattr(self, "group"):
+            await self.channel_layer.group_discard(self.group, self.channel_name)
+
     async def order_event(self, event):
-        await self.send_json(event["data"])
+        data = event["data"]
+        # Re-inserting moves the order to the end, so the frame follows event order.
+        self.pending.pop(data["order"]["id"], None)
+        self.pending[data["order"]["id"]] = data
+        if self.flush_task is None:
+            self.flush_task = asyncio.ensure_future(self.flush_later())
+
+    async def flush_later(self):
+        await asyncio.sleep(self.window)
+        batch, self.pending, self.flush_task = list(self.pending.values()), {}, None
+        if batch:
+            await self.send_json({"type": "orders", "events": batch})
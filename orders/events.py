@@ -0,0 +1,73 @@
+"""
+Order event stream for kitchen screens and rms-admin.
+
+Order saves publish an `order.event` to the location's channel group after
+the transaction commits; `orders.consumers.OrderConsumer` coalesces bursts
+into one frame per flush window. Clients connect to
+
+    ws/orders/<location_id>/      (or ws/orders/ for orders without a location)
+
+and receive {"type": "orders", "events": [{"event": "order.created", "order": {...}}, ...]}.
+"""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+CREATED = "order.created"
+PAID = "order.paid"
+STATUS = "order.status"
+
+
+def group_name(location_id):
+    return f"loc_{location_id or 'default'}_orders"
+
+
+def order_payload(order):
+    # Board fields only; no customer contact details go over the socket.
+    return {
+        "id": order.id,
+        "location": order.location_id,
+        "status": order.status,
+        "is_paid": order.is_paid,
+        "service_type": order.service_type,
+        "total": str(order.total),
+        "created_at": order.created_at.isoformat() if order.created_at else None,
+        "updated_at": order.updated_at.isoformat() if order.updated_at else None,
+    }
+
+
+def send_event(location_id, event, data):
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    try:
+        async_to_sync(layer.group_send)(
+            group_name(location_id),
+            {"type": "order.event", "data": {"event": event, "order": data}},
+        )
+    except Exception:
+        # The order is already committed; a dropped event must not fail the request.
+        logger.exception("Failed to publish %s for order %s", event, data.get("id"))
+
+
+def _send_committed(order_id, location_id, event, fallback):
+    from .models import Order
+
+    # Re-read: later saves in the same transaction (e.g. totals applied after the
+    # first INSERT) emit no event of their own, so the payload must be the committed row.
+    order = Order.objects.filter(pk=order_id).first()
+    if order is not None:
+        send_event(order.location_id, event, order_payload(order))
+    else:
+        send_event(location_id, event, fallback)
+
+
+def publish(order, event):
+    """Queue `event` for `order`; sent only if the surrounding transaction commits, with the committed values."""
+    fallback = order_payload(order)  # only if the order is gone by then
+    order_id, location_id = order.pk, order.location_id
+    transaction.on_commit(lambda: _send_committed(order_id, location_id, event, fallback))
@@ -0,0 +1,24 @@
+from core.exports import Export, register
+from .models import Order
+
+register(Export(
+    name="orders",
+    description="Orders with stored totals, by creation time",
+    queryset=lambda: Order.objects.all(),
+    columns=[
+        ("id", "id"),
+        ("invoice_no", "invoice_no"),
+        ("location", "location_id"),
+        ("status", "status"),
+        ("is_paid", "is_paid"),
+        ("service_type", "service_type"),
+        ("customer_name", "customer_name"),
+        ("subtotal", "subtotal"),
+        ("discount", "discount_amount"),
+        ("tax", "tax_amount"),
+        ("tip", "tip_amount"),
+        ("total", "total"),
+        ("created_at", "created_at"),
+        ("paid_at", "paid_at"),
+    ],
+))
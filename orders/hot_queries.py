@@ -0,0 +1,49 @@
+from core.hot_queries import hot_query
+from .models import Order, OrderItem
+
+ORDERS = ["orders_order"]
+
+
+@hot_query("my-orders", tables=ORDERS)
+def my_orders(sample):
+    return Order.objects.filter(created_by_id=sample.created_by_id).order_by("-created_at")[:50]
+
+
+@hot_query("location-board", tables=ORDERS)
+def location_board(sample):
+    return Order.objects.filter(location_id=sample.location_id, status="PENDING").order_by("-created_at")[:50]
+
+
+@hot_query("admin-status-filter", tables=ORDERS)
+def admin_status_filter(sample):
+    return Order.objects.filter(status="PENDING").order_by("-created_at")[:100]
+
+
+@hot_query("unpaid-orders", tables=ORDERS)
+def unpaid_orders(sample):
+    return Order.objects.filter(is_paid=False).order_by("-created_at")[:100]
+
+
+@hot_query("keyset-page", tables=ORDERS)
+def keyset_page(sample):
+    return Order.objects.filter(created_at__lt=sample.created_at).order_by("-created_at", "-id")[:50]
+
+
+@hot_query("webhook-by-id", tables=ORDERS)
+def webhook_by_id(sample):
+    return Order.objects.filter(id=sample.id)
+
+
+@hot_query("stripe-session-lookup", tables=ORDERS)
+def stripe_session_lookup(sample):
+    return Order.objects.filter(stripe_session_id=sample.stripe_session_id)
+
+
+@hot_query("stripe-intent-lookup", tables=ORDERS)
+def stripe_intent_lookup(sample):
+    return Order.objects.filter(stripe_payment_intent_id=sample.stripe_payment_intent_id)
+
+
+@hot_query("order-lines", tables=ORDERS + ["orders_orderitem"])
+def order_lines(sample):
+    return OrderItem.objects.filter(order_id=sample.id).select_related("menu_item")
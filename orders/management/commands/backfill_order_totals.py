@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Max, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Least, Round
+
+from core.models import Location
+from orders.models import Order, OrderItem
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute stored order totals (subtotal, discount, tax, total) in SQL, in id-range batches. "
+        "Paid orders that already have totals are left alone unless --include-paid is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--include-paid", action="store_true",
+            help="Also rewrite paid orders' stored totals (uses today's tax rate; changes invoiced amounts)",
+        )
+
+    def handle(self, *args, **options):
+        batch = options["batch_size"]
+        last_id = Order.objects.aggregate(m=Max("id"))["m"] or 0
+
+        line_sum = (
+            OrderItem.objects.filter(order=OuterRef("pk"))
+            .values("order")
+            .annotate(s=Sum(F("quantity") * F("unit_price"), output_field=MONEY))
+            .values("s")
+        )
+        tax_percent = Location.objects.filter(pk=OuterRef("location_id")).values("organization__tax_percent")
+        discount = Case(
+            When(discount_type="PERCENT", then=Round(F("subtotal") * F("discount_value") / 100, 2)),
+            When(discount_type="FIXED", then=Least(F("discount_value"), F("subtotal"))),
+            default=Value(0),
+            output_field=MONEY,
+        )
+
+        orders = Order.objects.all()
+        if not options["include_paid"]:
+            # Paid totals are what was invoiced and rolled up; only fill in orders that never had any.
+            orders = orders.filter(Q(is_paid=False) | Q(subtotal=0, total=0))
+
+        updated = 0
+        for start in range(0, last_id, batch):
+            # Fix the ids first: the passes below change the columns the default filter looks at.
+            ids = list(orders.filter(id__gt=start, id__lte=start + batch).values_list("id", flat=True))
+            if not ids:
+                continue
+            rows = Order.objects.filter(id__in=ids)
+            with transaction.atomic():
+                # Each pass reads columns written by the previous one
+                updated += rows.update(subtotal=Coalesce(Subquery(line_sum, output_field=MONEY), Value(0), output_field=MONEY))
+                rows.update(discount_amount=discount)
+                rows.update(tax_amount=Round(
+                    (F("subtotal") - F("discount_amount"))
+                    * Coalesce(Subquery(tax_percent, output_field=MONEY), Value(0), output_field=MONEY) / 100,
+                    2,
+                ))
+                rows.update(total=F("subtotal") - F("discount_amount") + F("tax_amount") + F("tip_amount"))
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled totals for {updated} order(s)."))
@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.cart import cart_ttl
+from orders.models import Cart
+
+
+class Command(BaseCommand):
+    help = "Delete write-behind cart rows untouched for longer than CART_TTL."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(seconds=cart_ttl())
+        deleted, _ = Cart.objects.filter(updated_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired cart(s)."))
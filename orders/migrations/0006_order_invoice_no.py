@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 04:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_cart'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='invoice_no',
+            field=models.CharField(blank=True, max_length=32, null=True, unique=True),
+        ),
+    ]
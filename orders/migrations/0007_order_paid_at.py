@@ -0,0 +1,31 @@
+# Generated by Django 5.1.2 on 2026-10-18 05:08
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_paid_at(apps, schema_editor):
+    # Best available guess for orders paid before paid_at existed.
+    Order = apps.get_model("orders", "Order")
+    Order.objects.filter(is_paid=True, paid_at__isnull=True).update(paid_at=Coalesce("closed_at", "updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_order_invoice_no'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='paid_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('PAID', 'Paid'), ('FAILED', 'Failed'), ('CANCELLED', 'Cancelled'), ('REFUNDED', 'Refunded')], default='PENDING', max_length=16),
+        ),
+        migrations.RunPython(backfill_paid_at, migrations.RunPython.noop),
+    ]
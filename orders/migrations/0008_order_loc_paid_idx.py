@@ -0,0 +1,20 @@
+# Generated by Django 5.1.2 on 2026-10-18 05:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('orders', '0007_order_paid_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['location', 'paid_at'], name='order_loc_paid_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2026-10-18 05:56
+
+import core.storage
+from django.db import migrations, models
+
+
+def move_files(apps, schema_editor):
+    # Files rendered before this migration sit under MEDIA_ROOT, where /media/ serves them.
+    model = apps.get_model("orders", "order")
+    names = model.objects.exclude(invoice_pdf="").exclude(invoice_pdf=None).values_list("invoice_pdf", flat=True)
+    core.storage.move_to_protected(names.distinct().iterator())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_order_loc_paid_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='invoice_pdf',
+            field=models.FileField(blank=True, null=True, storage=core.storage.protected_storage, upload_to='orders/'),
+        ),
+        migrations.RunPython(move_files, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+from django.db.models.functions import Coalesce
+
+
+def backfill_paid_at(apps, schema_editor):
+    # Orders marked paid outside the webhook between 0007 and Order.save stamping paid_at.
+    Order = apps.get_model("orders", "Order")
+    Order.objects.filter(is_paid=True, paid_at__isnull=True).update(paid_at=Coalesce("closed_at", "updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0009_protected_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_paid_at, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+from core.storage import protected_storage
 from menu.models import MenuItem
 
 
@@ -9,6 +11,7 @@ class Order(models.Model):
         ("PAID", "Paid"),
         ("FAILED", "Failed"),
         ("CANCELLED", "Cancelled"),
+        ("REFUNDED", "Refunded"),
     ]
 
     created_by = models.ForeignKey(
@@ -34,6 +37,16 @@ class Order(models.Model):
     customer_email = models.EmailField(blank=True, default="")
     notes = models.TextField(blank=True)
 
+    # Stored totals (kept current by orders.services.PricingService; reads never recompute)
+    DISCOUNT_TYPE_CHOICES = [("PERCENT", "Percent"), ("FIXED", "Fixed")]
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    discount_type = models.CharField(max_length=10, choices=DISCOUNT_TYPE_CHOICES, blank=True, default="")
+    discount_value = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    discount_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    tax_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    tip_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -42,18 +55,46 @@ class Order(models.Model):
 
     # Payment state (used by Stripe integration)
     is_paid = models.BooleanField(default=False)
+    paid_at = models.DateTimeField(null=True, blank=True)
     stripe_session_id = models.CharField(max_length=255, blank=True, default="")
     stripe_payment_intent_id = models.CharField(max_length=255, blank=True, default="")
 
+    # Assigned once, when the order is paid (billing.numbering)
+    invoice_no = models.CharField(max_length=32, unique=True, null=True, blank=True)
+
     # Generated PDF invoice stored in MEDIA_ROOT/orders/
-    invoice_pdf = models.FileField(upload_to="orders/", blank=True, null=True)
+    invoice_pdf = models.FileField(upload_to="orders/", storage=protected_storage, blank=True, null=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # keyset pagination key
+            models.Index(fields=["created_at", "id"], name="order_created_id_idx"),
+            # "My Orders"
+            models.Index(fields=["created_by", "-created_at"], name="order_user_created_idx"),
+            # kitchen / location boards and admin status filters
+            models.Index(fields=["location", "status", "-created_at"], name="order_loc_status_created_idx"),
+            models.Index(fields=["status", "-created_at"], name="order_status_created_idx"),
+            # shift close / Z-report: paid orders of a location in a time window
+            models.Index(fields=["location", "paid_at"], name="order_loc_paid_idx"),
+            # small: only orders still awaiting payment
+            models.Index(fields=["-created_at"], name="order_unpaid_created_idx", condition=models.Q(is_paid=False)),
+            # Stripe webhook / success-page lookups
+            models.Index(fields=["stripe_session_id"], name="order_stripe_session_idx"),
+            models.Index(fields=["stripe_payment_intent_id"], name="order_stripe_intent_idx"),
+        ]
 
     def __str__(self):
         return f"Order #{self.pk}"
 
+    def save(self, *args, **kwargs):
+        # Every path that marks an order paid gets a paid_at; shift close and the rollups key on it.
+        if self.is_paid and self.paid_at is None:
+            self.paid_at = timezone.now()
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "paid_at"}
+        super().save(*args, **kwargs)
+
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
@@ -71,3 +112,13 @@ class OrderItem(models.Model):
 
     def __str__(self):
         return f"{self.menu_item} x {self.quantity}"
+
+
+class Cart(models.Model):
+    """Write-behind copy of a cached cart (orders.cart, CART_WRITE_BEHIND)."""
+    key = models.CharField(max_length=80, unique=True)  # "user:<id>" or "anon:<cart_id>"
+    items = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return self.key
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .consumers import OrderConsumer
+
+websocket_urlpatterns = [
+    path("ws/orders/", OrderConsumer.as_asgi()),
+    path("ws/orders/<int:location_id>/", OrderConsumer.as_asgi()),
+]
@@ -2,10 +2,12 @@ from rest_framework import serializers
 from django.db import transaction
 from menu.models import MenuItem
 from .models import Order, OrderItem
+from .services import PricingService
 
 
 class OrderItemCreateSerializer(serializers.ModelSerializer):
-    menu_item = serializers.PrimaryKeyRelatedField(queryset=MenuItem.objects.all())
+    # Plain id here; OrderCreateSerializer resolves all lines in one query
+    menu_item = serializers.IntegerField(min_value=1)
     quantity = serializers.IntegerField(min_value=1)
 
     class Meta:
@@ -17,6 +19,9 @@ class OrderCreateSerializer(serializers.ModelSerializer):
     """
     'items' may be omitted; the view will fallback to the session cart and
     pass normalized items to this serializer.
+
+    Pass context["menu_items"] ({id: MenuItem}) when the caller has already
+    loaded the menu items, to skip the lookup entirely.
     """
     items = OrderItemCreateSerializer(many=True, required=False)
 
@@ -24,6 +29,16 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         model = Order
         fields = ("id", "service_type", "items")
 
+    def validate_items(self, items):
+        ids = {it["menu_item"] for it in items}
+        by_id = self.context.get("menu_items")
+        if by_id is None or not ids.issubset(by_id):
+            by_id = MenuItem.objects.in_bulk(ids)
+        missing = sorted(ids - set(by_id))
+        if missing:
+            raise serializers.ValidationError(f"Unknown menu item ids: {missing}")
+        return [{**it, "menu_item": by_id[it["menu_item"]]} for it in items]
+
     @transaction.atomic
     def create(self, validated_data):
         request = self.context.get("request")
@@ -33,15 +48,17 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         items_data = validated_data.pop("items", [])
         order = Order.objects.create(created_by=created_by, **validated_data)
 
-        for item in items_data:
-            mi: MenuItem = item["menu_item"]
-            qty = item["quantity"]
-            OrderItem.objects.create(
+        # Prices are snapshotted from the already-loaded menu items; one INSERT for all lines
+        lines = OrderItem.objects.bulk_create([
+            OrderItem(
                 order=order,
-                menu_item=mi,
-                quantity=qty,
-                unit_price=getattr(mi, "price", 0) or 0,
+                menu_item=item["menu_item"],
+                quantity=item["quantity"],
+                unit_price=item["menu_item"].price or 0,
             )
+            for item in items_data
+        ])
+        PricingService.apply_totals(order, items=lines)
 
         return order
 
@@ -61,11 +78,11 @@ class OrderItemReadSerializer(serializers.ModelSerializer):
 
 class OrderReadSerializer(serializers.ModelSerializer):
     items = OrderItemReadSerializer(many=True, read_only=True)
-    total = serializers.SerializerMethodField()
 
     class Meta:
         model = Order
-        fields = ("id", "status", "service_type", "created_at", "items", "total")
-
-    def get_total(self, obj):
-        return sum((it.quantity * it.unit_price) for it in obj.items.all())
+        fields = (
+            "id", "status", "service_type", "created_at", "items",
+            "subtotal", "discount_amount", "tax_amount", "tip_amount", "total",
+        )
+        read_only_fields = fields
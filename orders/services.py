@@ -1,28 +1,42 @@
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 from django.utils import timezone
 from django.db import transaction
-from .models import Order, Ticket
+from .models import Order
+
+CENT = Decimal('0.01')
+TOTAL_FIELDS = ['subtotal', 'discount_amount', 'tax_amount', 'tip_amount', 'total']
+
+
+def _money(value):
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
 
 class PricingService:
     @staticmethod
-    def calculate_totals(order, discount_type=None, discount_value=None, tip_amount=None):
-        """Calculate order totals with discounts, tax, and tip"""
-        subtotal = sum(item.item_total for item in order.items.all())
+    def calculate_totals(order, discount_type=None, discount_value=None, tip_amount=None, items=None):
+        """
+        Calculate order totals with discounts, tax, and tip.
+        Pass `items` (OrderItems already in memory) to skip re-reading the lines.
+        """
+        if items is None:
+            items = order.items.all()
+        subtotal = _money(sum((item.quantity * item.unit_price for item in items), Decimal('0.00')))
         
         # Apply discount
         discount_amount = Decimal('0.00')
         if discount_type and discount_value:
             if discount_type == 'PERCENT':
-                discount_amount = subtotal * (discount_value / 100)
+                discount_amount = _money(subtotal * (Decimal(discount_value) / 100))
             else:  # FIXED
-                discount_amount = min(discount_value, subtotal)
+                discount_amount = min(_money(discount_value), subtotal)
         
         # Calculate tax on discounted amount
         taxable_amount = subtotal - discount_amount
-        tax_amount = taxable_amount * (order.location.organization.tax_percent / 100)
+        tax_percent = order.location.organization.tax_percent if order.location_id else Decimal('0')
+        tax_amount = _money(taxable_amount * (tax_percent / 100))
         
         # Calculate total
-        tip_amount = tip_amount or Decimal('0.00')
+        tip_amount = _money(tip_amount or Decimal('0.00'))
         total = subtotal - discount_amount + tax_amount + tip_amount
         
         return {
@@ -33,18 +47,29 @@ class PricingService:
             'total': total
         }
 
+    @staticmethod
+    def apply_totals(order, items=None, save=True):
+        """Recompute the stored totals from the order's own discount/tip and persist them."""
+        totals = PricingService.calculate_totals(
+            order, order.discount_type, order.discount_value, order.tip_amount, items=items
+        )
+        for key, value in totals.items():
+            setattr(order, key, value)
+        if save:
+            order.save(update_fields=TOTAL_FIELDS + ['updated_at'])
+        return totals
+
 class OrderService:
     @staticmethod
     @transaction.atomic
     def place_order(order):
         """Place an order and create KOT ticket"""
+        from .models import Ticket  # KOT tickets are not modelled yet
         if order.status != 'DRAFT':
             raise ValueError("Only draft orders can be placed")
         
         # Calculate totals
-        totals = PricingService.calculate_totals(order)
-        for key, value in totals.items():
-            setattr(order, key, value)
+        PricingService.apply_totals(order, save=False)
         
         # Update status and timestamp
         order.status = 'PLACED'
@@ -74,7 +99,8 @@ class OrderService:
     @transaction.atomic
     def pay_order(order, payment_data):
         """Process payment for an order"""
-        from billing.models import Payment, InvoiceSequence
+        from billing.models import Payment
+        from billing.numbering import allocate_invoice_no
         from billing.services import PaymentService
         
         # Apply discount and tip
@@ -88,6 +114,7 @@ class OrderService:
         # Update order financial fields
         order.discount_type = discount_type or ''
         order.discount_value = discount_value or Decimal('0.00')
+        order.subtotal = totals['subtotal']
         order.discount_amount = totals['discount_amount']
         order.tax_amount = totals['tax_amount']
         order.tip_amount = totals['tip_amount']
@@ -115,17 +142,8 @@ class OrderService:
             order.closed_at = timezone.now()
             
             # Assign invoice number
-            sequence, created = InvoiceSequence.objects.get_or_create(
-                location=order.location,
-                defaults={'prefix': 'INV', 'next_number': 1, 'padding': 4}
-            )
-            
-            invoice_no = f"{sequence.prefix}-{str(sequence.next_number).zfill(sequence.padding)}"
-            order.invoice_no = invoice_no
-            
-            # Increment sequence
-            sequence.next_number += 1
-            sequence.save()
+            if not order.invoice_no:
+                order.invoice_no = allocate_invoice_no(order.location_id)
         
         order.save()
         return order
\ No newline at end of file
@@ -0,0 +1,48 @@
+from django.db import transaction
+from django.db.models.signals import post_init, post_save
+from django.dispatch import Signal
+
+from . import events
+from .cart import CartStore
+from .models import Order
+
+# Sent inside the saving transaction, so receivers commit or roll back with the order.
+order_paid = Signal()  # kwargs: order
+order_refunded = Signal()  # kwargs: order
+
+
+def _remember_state(sender, instance, **kwargs):
+    # Read __dict__ directly: touching a deferred field here would reload the row (and recurse).
+    instance._event_state = (instance.__dict__.get("status"), instance.__dict__.get("is_paid"))
+
+
+def _publish_order_event(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    status, is_paid = getattr(instance, "_event_state", (None, None))
+    if created:
+        events.publish(instance, events.CREATED)
+    elif instance.is_paid and is_paid is False:
+        events.publish(instance, events.PAID)
+    elif status is not None and instance.status != status:
+        events.publish(instance, events.STATUS)
+
+    if instance.is_paid and (created or is_paid is False):
+        order_paid.send(sender=Order, order=instance)
+    if not created and instance.status == "REFUNDED" and status not in (None, "REFUNDED") and instance.is_paid:
+        order_refunded.send(sender=Order, order=instance)
+    instance._event_state = (instance.status, instance.is_paid)
+
+
+post_init.connect(_remember_state, sender=Order, dispatch_uid="orders-event-state")
+post_save.connect(_publish_order_event, sender=Order, dispatch_uid="orders-event-publish")
+
+
+def _clear_buyer_cart(sender, order, **kwargs):
+    # The success page is reached without a JWT, so it cannot see an API user's cart; clear it here.
+    if order.created_by_id:
+        user_id = order.created_by_id
+        transaction.on_commit(lambda: CartStore.for_user(user_id).clear())
+
+
+order_paid.connect(_clear_buyer_cart, dispatch_uid="orders-clear-buyer-cart")
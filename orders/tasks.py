@@ -0,0 +1,7 @@
+from celery import shared_task
+
+
+@shared_task
+def persist_cart_task(key):
+    from orders.cart import persist
+    persist(key)
@@ -0,0 +1,267 @@
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import Location, Organization
+from core.storage import move_to_protected
+from menu.models import MenuCategory, MenuItem
+from orders import events
+from orders.cart import CartStore
+from orders.models import Order, OrderItem
+from orders.routing import websocket_urlpatterns
+from orders.services import TOTAL_FIELDS, PricingService
+
+
+@override_settings(STRIPE_BACKEND="fake", CHECKOUT_MODE="sync")
+class OrderEventTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = MenuCategory.objects.create(organization=Organization.objects.create(name="O"), name="Mains")
+        self.item = MenuItem.objects.create(category=category, name="Burger", price=Decimal("15.00"))
+
+    @mock.patch("orders.events.send_event")
+    def test_created_event_carries_committed_totals(self, send_event):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/orders/", {"items": [{"menu_item": self.item.pk, "quantity": 2}]}, content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 201, response.content)
+        order = Order.objects.get()
+        self.assertGreater(order.total, 0)
+
+        created = [c.args for c in send_event.call_args_list if c.args[1] == events.CREATED]
+        self.assertEqual(len(created), 1)
+        self.assertEqual(created[0][2]["id"], order.pk)
+        self.assertEqual(created[0][2]["total"], str(order.total))
+
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+                   ORDER_EVENTS_COALESCE_MS=100)
+class OrderConsumerTests(TransactionTestCase):
+    # Not TestCase: database_sync_to_async closes connections that are not in autocommit mode.
+    def setUp(self):
+        self.staff = get_user_model().objects.create_user("kitchen", password="x", is_staff=True)
+        self.customer = get_user_model().objects.create_user("customer", password="x")
+
+    def communicator(self, path="/ws/orders/1/", user=None):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), path)
+        if user is not None:
+            communicator.scope["user"] = user
+        return communicator
+
+    async def send(self, location_id, order_id, event, status="PENDING"):
+        await get_channel_layer().group_send(events.group_name(location_id), {
+            "type": "order.event", "data": {"event": event, "order": {"id": order_id, "status": status}},
+        })
+
+    async def test_only_staff_may_connect(self):
+        for path, user in (("/ws/orders/1/", None), ("/ws/orders/1/", self.customer),
+                           (f"/ws/orders/1/?token={AccessToken.for_user(self.customer)}", None),
+                           ("/ws/orders/1/?token=garbage", None)):
+            communicator = self.communicator(path, user)
+            connected, code = await communicator.connect()
+            self.assertEqual((connected, code), (False, 4403), path)
+
+        for path, user in (("/ws/orders/1/", self.staff), (f"/ws/orders/?token={AccessToken.for_user(self.staff)}", None)):
+            communicator = self.communicator(path, user)
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected, path)
+            await communicator.disconnect()
+
+    async def test_events_within_the_window_arrive_as_one_frame(self):
+        communicator = self.communicator(user=self.staff)
+        self.assertTrue((await communicator.connect())[0])
+        await self.send(1, 10, events.CREATED)
+        await self.send(1, 11, events.CREATED)
+        await self.send(2, 12, events.CREATED)  # another location's group
+        await self.send(1, 10, events.PAID, status="PAID")
+
+        frame = await communicator.receive_json_from(timeout=1)
+        self.assertEqual(frame["type"], "orders")
+        self.assertEqual([(e["event"], e["order"]["id"], e["order"]["status"]) for e in frame["events"]],
+                         [(events.CREATED, 11, "PENDING"), (events.PAID, 10, "PAID")])
+        self.assertTrue(await communicator.receive_nothing(timeout=0.2))
+
+        await self.send(1, 11, events.STATUS, status="CANCELLED")
+        frame = await communicator.receive_json_from(timeout=1)
+        self.assertEqual([e["order"]["id"] for e in frame["events"]], [11])
+        await communicator.disconnect()
+
+class PaidOrderCartTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_paying_clears_the_buyers_cart(self):
+        buyer = get_user_model().objects.create_user("buyer", password="x")
+        CartStore.for_user(buyer.pk).set([{"menu_item": 1, "quantity": 2}])
+        order = Order.objects.create(created_by=buyer)
+        order.is_paid, order.status = True, "PAID"
+        with self.captureOnCommitCallbacks(execute=True):
+            order.save()
+        self.assertEqual(CartStore.for_user(buyer.pk).get(), [])
+
+
+class InvoiceDownloadTests(TestCase):
+    """Invoices live in PROTECTED_MEDIA_ROOT and are only sent through the download action."""
+
+    def setUp(self):
+        self.protected = self.enterContext(tempfile.TemporaryDirectory())
+        self.media = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(PROTECTED_MEDIA_ROOT=self.protected, MEDIA_ROOT=self.media,
+                                            PDF_RENDER_BACKEND="inline"))
+        User = get_user_model()
+        self.owner = User.objects.create_user("owner", password="x")
+        self.stranger = User.objects.create_user("stranger", password="x")
+        self.staff = User.objects.create_user("staff", password="x", is_staff=True)
+        category = MenuCategory.objects.create(organization=Organization.objects.create(name="O"), name="Mains")
+        item = MenuItem.objects.create(category=category, name="Burger", price=Decimal("15.00"))
+        self.order = Order.objects.create(created_by=self.owner, subtotal=Decimal("30.00"), total=Decimal("30.00"),
+                                          is_paid=True, status="PAID")
+        OrderItem.objects.create(order=self.order, menu_item=item, quantity=2, unit_price=item.price)
+        self.url = f"/api/orders/{self.order.pk}/invoice/download/"
+
+    def get(self, user=None, **params):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        return client.get(self.url, params)
+
+    def signed_link(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        return client.get(f"/api/orders/{self.order.pk}/invoice/").json()["invoice"]
+
+    def test_file_is_stored_outside_media_root(self):
+        response = self.get(self.owner)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF"))
+        self.order.refresh_from_db()
+        self.assertTrue(os.path.exists(os.path.join(self.protected, self.order.invoice_pdf.name)))
+        self.assertEqual([files for _, _, files in os.walk(self.media) if files], [])
+        with self.assertRaises(ValueError):
+            self.order.invoice_pdf.url
+
+    def test_owner_staff_and_signed_link_are_allowed(self):
+        self.assertEqual(self.get(self.owner).status_code, 200)
+        self.assertEqual(self.get(self.staff).status_code, 200)
+        link = self.signed_link()
+        self.assertEqual(APIClient().get(link).status_code, 200)
+
+    def test_anonymous_and_other_users_are_refused(self):
+        self.assertEqual(self.get().status_code, 404)
+        self.assertEqual(self.get(self.stranger).status_code, 404)
+        self.assertEqual(self.get(token="forged").status_code, 404)
+        other = Order.objects.create(is_paid=True, status="PAID")
+        token = self.signed_link().split("token=")[1]
+        self.assertEqual(APIClient().get(f"/api/orders/{other.pk}/invoice/download/", {"token": token}).status_code, 404)
+        with override_settings(DOWNLOAD_LINK_MAX_AGE=-1):
+            self.assertEqual(self.get(token=token).status_code, 404)
+
+    def test_unpaid_order_has_no_invoice(self):
+        Order.objects.filter(pk=self.order.pk).update(is_paid=False, status="PENDING")
+        self.assertEqual(self.get(self.staff).status_code, 404)
+
+    def test_etag_answers_not_modified(self):
+        etag = self.get(self.owner)["ETag"]
+        self.order.refresh_from_db()
+        self.assertIn(os.path.splitext(os.path.basename(self.order.invoice_pdf.name))[0], etag)
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response["ETag"]), (304, etag))
+
+    def test_front_end_server_sends_the_file(self):
+        with override_settings(PROTECTED_MEDIA_SERVER="nginx"):
+            response = self.get(self.owner)
+        self.order.refresh_from_db()
+        name = self.order.invoice_pdf.name
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{name}")
+        self.assertEqual(response.content, b"")
+        with override_settings(PROTECTED_MEDIA_SERVER="sendfile"):
+            response = self.get(self.owner)
+        self.assertEqual(response["X-Sendfile"], os.path.join(os.path.abspath(self.protected), name))
+        self.assertEqual(response["Content-Disposition"], f'inline; filename="invoice-{self.order.pk}.pdf"')
+
+    def test_files_rendered_under_media_root_are_moved(self):
+        name = default_storage.save("invoices/ab/old.pdf", ContentFile(b"%PDF-old"))
+        self.assertEqual(move_to_protected([name, "invoices/missing.pdf", ""]), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.media, name)))
+        with open(os.path.join(self.protected, name), "rb") as moved:
+            self.assertEqual(moved.read(), b"%PDF-old")
+
+
+class OrderTotalsTests(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="O", tax_percent=Decimal("13.00"))
+        self.location = Location.objects.create(organization=self.org, name="Thamel")
+        category = MenuCategory.objects.create(organization=self.org, name="Mains")
+        self.burger = MenuItem.objects.create(category=category, name="Burger", price=Decimal("9.99"))
+        self.tea = MenuItem.objects.create(category=category, name="Tea", price=Decimal("0.05"))
+
+    def order(self, lines, location=True, **fields):
+        order = Order.objects.create(location=self.location if location else None, **fields)
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, menu_item=item, quantity=qty, unit_price=item.price) for item, qty in lines
+        )
+        return order
+
+    def stored(self, order):
+        order.refresh_from_db()
+        return {name: getattr(order, name) for name in TOTAL_FIELDS}
+
+    def expected(self, order):
+        return PricingService.calculate_totals(order, order.discount_type, order.discount_value, order.tip_amount)
+
+    def test_backfill_sql_matches_pricing_service(self):
+        orders = [
+            self.order([(self.burger, 3), (self.tea, 1)], discount_type="PERCENT", discount_value=Decimal("12.50"),
+                       tip_amount=Decimal("2.00")),
+            self.order([(self.tea, 7)], discount_type="FIXED", discount_value=Decimal("50.00")),
+            self.order([(self.burger, 1)], discount_type="FIXED", discount_value=Decimal("1.25")),
+            self.order([(self.burger, 2)], location=False),
+            self.order([]),
+        ]
+        call_command("backfill_order_totals", "--batch-size", "2", stdout=StringIO())
+        for order in orders:
+            self.assertEqual(self.stored(order), self.expected(order), order.pk)
+
+    def test_backfill_leaves_paid_totals_alone_by_default(self):
+        invoiced = self.order([(self.burger, 2)], is_paid=True, status="PAID")
+        PricingService.apply_totals(invoiced)
+        before = self.stored(invoiced)
+        never_totalled = self.order([(self.burger, 1)], is_paid=True, status="PAID")
+        self.org.tax_percent = Decimal("15.00")
+        self.org.save()
+
+        call_command("backfill_order_totals", stdout=StringIO())
+        self.assertEqual(self.stored(invoiced), before)
+        self.assertEqual(self.stored(never_totalled), self.expected(never_totalled))
+
+        call_command("backfill_order_totals", "--include-paid", stdout=StringIO())
+        self.assertEqual(self.stored(invoiced)["tax_amount"], Decimal("3.00"))
+
+    @override_settings(STRIPE_BACKEND="fake", CHECKOUT_MODE="sync")
+    def test_totals_are_stored_on_create(self):
+        cache.clear()
+        response = self.client.post("/api/orders/", {"items": [
+            {"menu_item": self.burger.pk, "quantity": 3}, {"menu_item": self.tea.pk, "quantity": 1},
+        ]}, content_type="application/json")
+        self.assertEqual(response.status_code, 201, response.content)
+        order = Order.objects.get()
+        self.assertEqual(self.stored(order)["subtotal"], Decimal("30.02"))
+        self.assertEqual(self.stored(order), self.expected(order))
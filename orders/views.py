@@ -1,20 +1,32 @@
 import json
 from typing import List, Dict, Any, Optional
 
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from django.urls import reverse
 from django.utils.encoding import force_str
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.authentication import SessionAuthentication
 
 from menu.models import MenuItem
+from .cart import CartStore
 from .models import Order, OrderItem
 from .serializers import OrderCreateSerializer, OrderReadSerializer
-from payments.services import create_checkout_session, generate_order_invoice_pdf
+from payments.invoice_export import iter_invoice_zip
+from payments.services import (
+    create_checkout_session, generate_order_invoice_pdf, queue_checkout, render_order_invoices,
+)
 from core.authentication import LenientJWTAuthentication
+from core.downloads import PassthroughRenderer, check_download_token, protected_file_response, sign_download
+from core.idempotency import IdempotencyMixin
+from core.params import date_range, location_param
 
 
 # ------------------------ Normalization helpers ------------------------
@@ -117,11 +129,6 @@ def _normalize_items(raw_items: Any) -> List[Dict[str, int]]:
     return [{"menu_item": mid, "quantity": q} for mid, q in merged.items()]
 
 
-def _force_session(request):
-    if not request.session.session_key:
-        request.session.save()
-
-
 def _get_items_from_anywhere(request) -> (List[Dict[str, int]], Dict[str, Any]):
     """
     Try hard to find cart items in multiple locations. Also return a small debug dict.
@@ -131,7 +138,7 @@ def _get_items_from_anywhere(request) -> (List[Dict[str, int]], Dict[str, Any]):
       3) request.POST string fields (items/cart/cart_json)
       4) header: X-Cart (JSON string)
       5) raw body (if JSON list/dict)
-      6) session["cart"]
+      6) cart store (orders.cart)
       7) cookie "cart" (JSON string)
     """
     debug = {"sources_checked": [], "raw_echo": {}}
@@ -185,12 +192,11 @@ def _get_items_from_anywhere(request) -> (List[Dict[str, int]], Dict[str, Any]):
             if norm:
                 return norm, debug
 
-    # 6) session
-    _force_session(request)
-    sess = request.session.get("cart", [])
-    debug["sources_checked"].append("session[cart]")
-    debug["raw_echo"]["session_cart"] = sess
-    norm = _normalize_items(sess)
+    # 6) cart store
+    stored = CartStore.for_request(request).get()
+    debug["sources_checked"].append("cart_store")
+    debug["raw_echo"]["cart_store"] = stored
+    norm = _normalize_items(stored)
     if norm:
         return norm, debug
 
@@ -206,31 +212,35 @@ def _get_items_from_anywhere(request) -> (List[Dict[str, int]], Dict[str, Any]):
     return [], debug
 
 
-# ------------------------ Cart (Session) ------------------------
+# ------------------------ Cart ------------------------
 
 @method_decorator(csrf_exempt, name="dispatch")  # allow JS sync without CSRF hassles
 class SessionCartViewSet(viewsets.ViewSet):
     """
-    Session cart API:
+    Cart API (orders.cart.CartStore; keyed by JWT user or the cart_id cookie):
       GET    /api/cart/               -> { "items": [{ "menu_item": <id>, "quantity": <int> }, ...] }
       POST   /api/cart/sync/          -> body { "items": [...] }  (replaces whole cart; many shapes allowed)
       POST   /api/cart/reset_session/ -> clears session + cart
       GET    /api/cart/debug/         -> diagnostic; shows what server sees (remove in prod)
     """
-    authentication_classes = (LenientJWTAuthentication, SessionAuthentication)
+    # JWT only: cart reads must not load (or create) a DB session
+    authentication_classes = (LenientJWTAuthentication,)
     permission_classes = [permissions.AllowAny]
 
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.cart = CartStore.for_request(request)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        cart = getattr(self, "cart", None)
+        return cart.apply_cookie(request, response) if cart else response
+
     def list(self, request):
-        _force_session(request)
-        items = request.session.get("cart", [])
-        safe = _normalize_items(items)
-        request.session["cart"] = safe
-        request.session.modified = True
-        return Response({"items": safe})
+        return Response({"items": self.cart.get()})
 
     @action(detail=False, methods=["post"], url_path="sync")
     def sync(self, request):
-        _force_session(request)
         # Accept from multiple shapes:
         incoming = request.data if request.data else {}
         normalized = []
@@ -241,36 +251,46 @@ class SessionCartViewSet(viewsets.ViewSet):
                 break
         if not normalized:
             normalized = _normalize_items(incoming)
-        request.session["cart"] = normalized
-        request.session.modified = True
+        self.cart.set(normalized)
         return Response({"items": normalized})
 
     @action(detail=False, methods=["post"], url_path="reset_session")
     def reset_session(self, request):
-        try:
-            request.session.flush()
-        except Exception:
-            pass
+        self.cart.clear()
+        if request.session.session_key:
+            try:
+                request.session.flush()
+            except Exception:
+                pass
         return Response({"ok": True})
 
     @action(detail=False, methods=["get"], url_path="debug")
     def debug_cart(self, request):
         """Temporary diagnostic endpoint."""
-        _force_session(request)
         return Response({
-            "session_key": request.session.session_key,
-            "session_cart": request.session.get("cart", []),
+            "cart_key": self.cart.key,
+            "cart": self.cart.get(),
         })
 
 
 # ------------------------ Orders ------------------------
 
-class OrderViewSet(viewsets.ModelViewSet):
+MAX_BULK_INVOICES = 1000
+MAX_SYNC_INVOICES = 20  # larger batches go to the Celery "pdf" queue instead of holding the request
+
+
+def invoice_download_url(request, order):
+    path = reverse("orders:orders-invoice-download", kwargs={"pk": order.pk})
+    return request.build_absolute_uri(f"{path}?token={sign_download('invoice', order.pk)}")
+
+class OrderViewSet(IdempotencyMixin, viewsets.ModelViewSet):
     """
     POST /api/orders/  -> creates an Order from cart (robust cart detection)
+    Send an Idempotency-Key header to make create / quick-checkout safe to retry.
     """
     queryset = Order.objects.all().select_related("created_by").prefetch_related("items__menu_item")
     authentication_classes = (LenientJWTAuthentication, SessionAuthentication)
+    idempotent_actions = ("create", "quick_checkout")
 
     def get_serializer_class(self):
         if self.action in ["list", "retrieve"]:
@@ -278,7 +298,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         return OrderCreateSerializer
 
     def get_permissions(self):
-        if self.action in ["create", "quick_checkout"]:
+        if self.action in ["create", "quick_checkout", "invoice_download"]:
             return [permissions.AllowAny()]
         if self.action in ["list", "retrieve", "invoice"]:
             return [permissions.IsAuthenticated()]
@@ -287,18 +307,43 @@ class OrderViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         qs = super().get_queryset()
         user = self.request.user
-        if self.action in ["list", "retrieve"] and user.is_authenticated and not user.is_staff:
+        if self.action in ["list", "retrieve", "invoice"] and user.is_authenticated and not user.is_staff:
             qs = qs.filter(created_by=user)
         return qs
 
-    def _resolve_existing_menu_items(self, items: List[Dict[str, int]]) -> List[Dict[str, int]]:
+    def _resolve_existing_menu_items(self, items: List[Dict[str, int]]):
         """
-        Convert normalized items (with ids) into only those that exist in DB.
-        If some IDs are missing in DB, skip them.
+        Load every referenced MenuItem in one query.
+        Returns (items that exist in DB, {id: MenuItem}); missing IDs are skipped.
         """
-        ids = [it["menu_item"] for it in items]
-        existing = set(MenuItem.objects.filter(id__in=ids).values_list("id", flat=True))
-        return [it for it in items if it["menu_item"] in existing]
+        by_id = MenuItem.objects.in_bulk([it["menu_item"] for it in items])
+        return [it for it in items if it["menu_item"] in by_id], by_id
+
+    def _save_order(self, request, normalized, menu_items):
+        payload = request.data.copy() if isinstance(request.data, dict) else {}
+        payload["items"] = normalized
+
+        context = {**self.get_serializer_context(), "menu_items": menu_items}
+        serializer = self.get_serializer(data=payload, context=context)
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    def _checkout_response(self, request, order):
+        """
+        sync:  create the Stripe session now -> 201 {order_id, checkout_url}
+        async: queue it -> 202 {order_id, checkout_token, status, poll_url}; poll until ready
+        """
+        if getattr(settings, "CHECKOUT_MODE", "sync") == "async":
+            req = queue_checkout(order)
+            poll_url = reverse("payments_api:checkout_status", kwargs={"token": req.token})
+            return Response(
+                {"order_id": order.id, "checkout_token": str(req.token), "status": req.status,
+                 "poll_url": request.build_absolute_uri(poll_url)},
+                status=status.HTTP_202_ACCEPTED,
+            )
+        session = create_checkout_session(order)
+        Order.objects.filter(pk=order.pk).update(stripe_session_id=session.id)
+        return Response({"order_id": order.id, "checkout_url": session.url}, status=status.HTTP_201_CREATED)
 
     def create(self, request, *args, **kwargs):
         normalized, debug = _get_items_from_anywhere(request)
@@ -320,7 +365,7 @@ class OrderViewSet(viewsets.ModelViewSet):
             )
 
         # Drop IDs not present in DB (prevents FK errors)
-        normalized = self._resolve_existing_menu_items(normalized)
+        normalized, menu_items = self._resolve_existing_menu_items(normalized)
         if not normalized:
             return Response(
                 {"detail": "Cart items refer to unknown menu IDs.",
@@ -328,18 +373,8 @@ class OrderViewSet(viewsets.ModelViewSet):
                 status=422,
             )
 
-        payload = request.data.copy() if isinstance(request.data, dict) else {}
-        payload["items"] = normalized
-
-        serializer = self.get_serializer(data=payload, context={"request": request})
-        serializer.is_valid(raise_exception=True)
-        order = serializer.save()
-
-        session = create_checkout_session(order)
-        return Response(
-            {"order_id": order.id, "checkout_url": session.url},
-            status=status.HTTP_201_CREATED,
-        )
+        order = self._save_order(request, normalized, menu_items)
+        return self._checkout_response(request, order)
 
     @action(detail=False, methods=["post"], url_path="quick-checkout")
     def quick_checkout(self, request):
@@ -351,21 +386,16 @@ class OrderViewSet(viewsets.ModelViewSet):
         if not normalized:
             return Response({"detail": "Cart is empty.", "debug": debug}, status=400)
 
-        normalized = self._resolve_existing_menu_items(normalized)
+        normalized, menu_items = self._resolve_existing_menu_items(normalized)
         if not normalized:
             return Response({"detail": "Unknown menu IDs.", "debug": debug}, status=422)
 
-        payload = request.data.copy() if isinstance(request.data, dict) else {}
-        payload["items"] = normalized
-
-        serializer = self.get_serializer(data=payload, context={"request": request})
-        serializer.is_valid(raise_exception=True)
-        order = serializer.save()
-        session = create_checkout_session(order)
-        return Response({"order_id": order.id, "checkout_url": session.url}, status=201)
+        order = self._save_order(request, normalized, menu_items)
+        return self._checkout_response(request, order)
 
     @action(detail=True, methods=["get"], url_path="invoice")
     def invoice(self, request, pk=None):
+        """Returns a short-lived signed download link (DOWNLOAD_LINK_MAX_AGE) for paid orders."""
         order = self.get_object()
         if order.is_paid and not order.invoice_pdf:
             try:
@@ -375,6 +405,59 @@ class OrderViewSet(viewsets.ModelViewSet):
         data = {
             "id": order.id,
             "is_paid": order.is_paid,
-            "invoice": order.invoice_pdf.url if order.invoice_pdf else None,
+            "invoice": invoice_download_url(request, order) if order.invoice_pdf else None,
         }
         return Response(data)
+
+    @action(detail=True, methods=["get"], url_path="invoice/download",
+            renderer_classes=[JSONRenderer, PassthroughRenderer])
+    def invoice_download(self, request, pk=None):
+        """
+        Streams the invoice PDF (or hands it to nginx, see core.downloads).
+        Allowed with a signed ?token= from the invoice action, or for the owner / staff.
+        """
+        order = Order.objects.filter(pk=pk).first()
+        user = request.user
+        allowed = order is not None and (
+            check_download_token(request.query_params.get("token"), "invoice", order.pk)
+            or (user.is_authenticated and (user.is_staff or order.created_by_id == user.id))
+        )
+        if not allowed or not order.is_paid:
+            raise Http404
+        if not order.invoice_pdf:
+            generate_order_invoice_pdf(order)
+        return protected_file_response(request, order.invoice_pdf.name, f"invoice-{order.invoice_no or order.id}.pdf")
+
+    @action(detail=False, methods=["get"], url_path="invoices/export",
+            renderer_classes=[JSONRenderer, PassthroughRenderer])
+    def export_invoices(self, request):
+        """
+        Admin: stream a ZIP of every paid invoice for a location and local date range.
+        GET /api/orders/invoices/export/?location=<id>&from=YYYY-MM-DD&to=YYYY-MM-DD
+        Missing PDFs are rendered on the way; memory use does not grow with the range.
+        """
+        location = location_param(request.query_params, required=True)
+        date_from, date_to = date_range(request.query_params, required=True)
+        response = StreamingHttpResponse(iter_invoice_zip(location, date_from, date_to), content_type="application/zip")
+        filename = f"invoices-{location.pk}-{date_from:%Y%m%d}-{date_to:%Y%m%d}.zip"
+        response["Content-Disposition"] = content_disposition_header(True, filename)
+        return response
+
+    @action(detail=False, methods=["post"], url_path="render-invoices")
+    def render_invoices(self, request):
+        """
+        Admin: render invoices for many orders at once in the PDF pool.
+        Body: {"order_ids": [1, 2, ...], "background": false}
+        background=true, or more than MAX_SYNC_INVOICES orders, hands the batch to the
+        Celery "pdf" queue and returns 202.
+        """
+        ids = request.data.get("order_ids") or []
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return Response({"detail": "order_ids must be a list of integers."}, status=400)
+        if len(ids) > MAX_BULK_INVOICES:
+            return Response({"detail": f"At most {MAX_BULK_INVOICES} orders per request."}, status=400)
+        if request.data.get("background") or len(ids) > MAX_SYNC_INVOICES:
+            render_order_invoices(ids, background=True)
+            return Response({"queued": len(ids)}, status=status.HTTP_202_ACCEPTED)
+        rendered = render_order_invoices(ids)
+        return Response({"rendered": len(rendered), "invoices": rendered})
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Payment
+from .models import Payment, WebhookEvent
 
 @admin.register(Payment)
 class GatewayPaymentAdmin(admin.ModelAdmin):
@@ -7,3 +7,11 @@ class GatewayPaymentAdmin(admin.ModelAdmin):
     list_filter = ("provider", "status", "currency")
     search_fields = ("provider_order_id", "provider_payment_id")
     autocomplete_fields = ("order",)
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "event_id", "type", "status", "attempts", "received_at", "processed_at")
+    list_filter = ("status", "type")
+    search_fields = ("event_id",)
+    readonly_fields = ("payload", "last_error")
@@ -0,0 +1,72 @@
+"""
+Offline stand-in for the parts of the Stripe SDK we call (STRIPE_BACKEND=fake).
+
+Sessions "complete" immediately: the checkout URL is the success URL.
+Webhooks must still be signed the way Stripe signs them
+(`Stripe-Signature: t=<unix time>,v1=<HMAC-SHA256 of "<t>.<payload">` keyed
+with STRIPE_WEBHOOK_SECRET; see `sign()`), so turning the fake on does not
+let anyone post forged payment events. STRIPE_FAKE_LATENCY_MS simulates the
+Stripe round trip for load tests. Never enable in production.
+"""
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from types import SimpleNamespace
+
+from django.conf import settings
+
+
+class checkout:
+    class Session:
+        @staticmethod
+        def create(**params):
+            latency = getattr(settings, "STRIPE_FAKE_LATENCY_MS", 0)
+            if latency:
+                time.sleep(latency / 1000)
+            session_id = f"cs_test_fake_{uuid.uuid4().hex}"
+            url = params["success_url"]
+            if "{CHECKOUT_SESSION_ID}" in url:
+                url = url.replace("{CHECKOUT_SESSION_ID}", session_id)
+            else:
+                url = f"{url}{'&' if '?' in url else '?'}session_id={session_id}"
+            return SimpleNamespace(
+                id=session_id,
+                url=url,
+                payment_intent=None,
+                metadata=params.get("metadata", {}),
+            )
+
+
+class SignatureVerificationError(ValueError):
+    pass
+
+
+def sign(payload, secret, timestamp=None):
+    """Stripe-Signature header value for `payload` (bytes), for load-test clients."""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+class Webhook:
+    DEFAULT_TOLERANCE = 300  # seconds, as in the Stripe SDK
+
+    @staticmethod
+    def construct_event(payload, sig_header, secret, tolerance=DEFAULT_TOLERANCE):
+        if isinstance(payload, str):
+            payload = payload.encode()
+        if not secret or not sig_header:
+            raise SignatureVerificationError("Missing webhook secret or Stripe-Signature header")
+        parts = dict(part.split("=", 1) for part in sig_header.split(",") if "=" in part)
+        try:
+            timestamp = int(parts["t"])
+        except (KeyError, ValueError):
+            raise SignatureVerificationError("Malformed Stripe-Signature header")
+        expected = sign(payload, secret, timestamp).split("v1=", 1)[1]
+        if not hmac.compare_digest(expected, parts.get("v1", "")):
+            raise SignatureVerificationError("Signature does not match the payload")
+        if tolerance and abs(time.time() - timestamp) > tolerance:
+            raise SignatureVerificationError("Timestamp outside the tolerance zone")
+        return json.loads(payload)
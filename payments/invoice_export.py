@@ -0,0 +1,92 @@
+"""
+Streaming ZIP export of invoice PDFs for a location and date range.
+
+`iter_invoice_zip` yields the archive in small pieces as it goes: orders are
+read in id-ordered batches, invoices missing from storage are rendered for
+that batch only (in parallel, see core.pdf), and each PDF is copied into the
+archive in chunks. Memory stays flat no matter how many invoices are included.
+"""
+import zipfile
+
+from core.models import Location
+from core.pdf import render_many
+from orders.models import Order
+from payments.services import invoice_job
+
+BATCH_SIZE = 200
+
+
+class _Sink:
+    """Write-only, non-seekable file object; zipfile then writes data descriptors."""
+
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        out = b"".join(self.chunks)
+        self.chunks = []
+        return out
+
+
+def paid_orders(location, date_from, date_to):
+    start, end = location.day_window(date_from, date_to)
+    return Order.objects.filter(
+        location=location, is_paid=True, created_at__gte=start, created_at__lt=end,
+    ).order_by("id")
+
+
+def _batches(queryset):
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id).only("id", "invoice_no", "invoice_pdf", "created_at")[:BATCH_SIZE])
+        if not batch:
+            return
+        last_id = batch[-1].id
+        yield batch
+
+
+def _ensure_invoices(batch):
+    missing = [o for o in batch if not o.invoice_pdf or not o.invoice_pdf.storage.exists(o.invoice_pdf.name)]
+    if not missing:
+        return
+    by_id = {o.id: o for o in Order.objects.filter(id__in=[o.id for o in missing]).prefetch_related("items__menu_item")}
+    jobs = [invoice_job(by_id[o.id], by_id[o.id].items.all()) for o in missing]
+    for order, name in zip(missing, render_many(jobs)):
+        order.invoice_pdf.name = name
+
+
+def archive_name(order):
+    return f"{order.invoice_no or f'order-{order.id}'}.pdf"
+
+
+def iter_invoice_zip(location, date_from, date_to):
+    if not isinstance(location, Location):
+        location = Location.objects.get(pk=location)
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        for batch in _batches(paid_orders(location, date_from, date_to)):
+            _ensure_invoices(batch)
+            for order in batch:
+                info = zipfile.ZipInfo(archive_name(order), date_time=order.created_at.timetuple()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with order.invoice_pdf.storage.open(order.invoice_pdf.name, "rb") as src, zf.open(info, "w") as dest:
+                    for chunk in src.chunks():
+                        dest.write(chunk)
+                        if sink.chunks:
+                            yield sink.drain()
+                if sink.chunks:
+                    yield sink.drain()
+    # central directory
+    yield sink.drain()
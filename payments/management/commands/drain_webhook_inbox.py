@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from payments.webhooks import drain_inbox
+
+
+class Command(BaseCommand):
+    help = "Apply received Stripe webhook events from the inbox (cron fallback for the Celery drain)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def handle(self, *args, **options):
+        processed, failed = drain_inbox(batch_size=options["batch_size"])
+        self.stdout.write(f"Processed {processed} event(s), {failed} failed.")
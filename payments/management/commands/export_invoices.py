@@ -0,0 +1,37 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.dates import parse_day
+from core.models import Location
+from payments.invoice_export import iter_invoice_zip
+
+
+class Command(BaseCommand):
+    help = "Write a ZIP of every paid invoice PDF for a location and local date range (missing PDFs are rendered)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--location", type=int, required=True)
+        parser.add_argument("--from", dest="date_from", required=True, help="YYYY-MM-DD (inclusive)")
+        parser.add_argument("--to", dest="date_to", required=True, help="YYYY-MM-DD (inclusive)")
+        parser.add_argument("--output", "-o", default="-", help="Output file; '-' for stdout")
+
+    def handle(self, *args, **options):
+        location = Location.objects.filter(pk=options["location"]).first()
+        if location is None:
+            raise CommandError(f"Location {options['location']} not found")
+        date_from, date_to = parse_day(options["date_from"]), parse_day(options["date_to"])
+        if date_from is None or date_to is None or date_from > date_to:
+            raise CommandError("--from and --to must be YYYY-MM-DD dates with from <= to")
+
+        out = sys.stdout.buffer if options["output"] == "-" else open(options["output"], "wb")
+        size = 0
+        try:
+            for chunk in iter_invoice_zip(location, date_from, date_to):
+                out.write(chunk)
+                size += len(chunk)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        if options["output"] != "-":
+            self.stdout.write(self.style.SUCCESS(f"Wrote {size} bytes to {options['output']}"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.webhooks import drain_inbox, requeue
+
+
+class Command(BaseCommand):
+    help = "Requeue Stripe webhook events (failed, stuck, or by id) and apply them again."
+
+    def add_arguments(self, parser):
+        parser.add_argument("event_ids", nargs="*", help="Stripe event ids (evt_...)")
+        parser.add_argument("--failed", action="store_true", help="Requeue every failed event")
+        parser.add_argument("--stuck-minutes", type=int, default=None,
+                            help="Requeue events left 'processing' for longer than this")
+        parser.add_argument("--no-drain", action="store_true", help="Only requeue; let the worker apply them")
+
+    def handle(self, *args, **options):
+        if not (options["event_ids"] or options["failed"] or options["stuck_minutes"] is not None):
+            raise CommandError("Give event ids, --failed or --stuck-minutes.")
+        count = requeue(options["event_ids"], failed=options["failed"], stuck_minutes=options["stuck_minutes"])
+        self.stdout.write(f"Requeued {count} event(s).")
+        if count and not options["no_drain"]:
+            processed, failed = drain_inbox()
+            self.stdout.write(f"Processed {processed} event(s), {failed} failed.")
@@ -1,3 +1,4 @@
+import uuid
 from django.db import models
 from django.conf import settings
 
@@ -22,3 +23,34 @@ class Payment(models.Model):
         verbose_name = "Gateway Payment"
         verbose_name_plural = "Gateway Payments"
     def __str__(self): return f"{self.provider} {self.amount} {self.currency} for Order {self.order_id}"
+
+
+class CheckoutRequest(models.Model):
+    """A Stripe Checkout session being created off the request thread (CHECKOUT_MODE=async)."""
+    STATUS_CHOICES = [("pending", "Pending"), ("ready", "Ready"), ("failed", "Failed")]
+    token = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    order = models.ForeignKey("orders.Order", on_delete=models.CASCADE, related_name="checkout_requests")
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default="pending")
+    checkout_url = models.CharField(max_length=2048, blank=True, default="")
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    def __str__(self): return f"Checkout {self.token} for Order {self.order_id} ({self.status})"
+
+
+class WebhookEvent(models.Model):
+    """Inbox of verified Stripe events; the webhook only inserts, a worker applies them."""
+    RECEIVED, PROCESSING, PROCESSED, FAILED = "received", "processing", "processed", "failed"
+    STATUS_CHOICES = [(RECEIVED, "Received"), (PROCESSING, "Processing"), (PROCESSED, "Processed"), (FAILED, "Failed")]
+    event_id = models.CharField(max_length=255, unique=True)
+    type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=RECEIVED)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    class Meta:
+        indexes = [models.Index(fields=["status", "id"], name="webhook_status_id_idx")]
+    def __str__(self): return f"{self.type} {self.event_id} ({self.status})"
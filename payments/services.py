@@ -1,14 +1,28 @@
 import stripe
 from decimal import Decimal
 from io import BytesIO
-from pathlib import Path
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import reverse
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
 from reportlab.pdfgen import canvas
 
+from core.pdf import RenderJob, content_path, enqueue, render, render_many
+
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
+CHECKOUT_STATE_TTL = 60 * 60
+
+
+def stripe_client():
+    """The Stripe SDK, or the offline fake when STRIPE_BACKEND=fake."""
+    if getattr(settings, "STRIPE_BACKEND", "stripe") == "fake":
+        from payments import fake_stripe
+        return fake_stripe
+    return stripe
+
 
 def _order_to_line_items(order):
     currency = getattr(settings, "STRIPE_CURRENCY", "usd")
@@ -29,21 +43,92 @@ def _order_to_line_items(order):
 
 
 def create_checkout_session(order):
-    session = stripe.checkout.Session.create(
+    session = stripe_client().checkout.Session.create(
         payment_method_types=["card"],
         line_items=_order_to_line_items(order),
         mode="payment",
-        success_url=f"{settings.DOMAIN}/payments/success/?order_id={order.id}",
-        cancel_url=f"{settings.DOMAIN}/payments/cancel/",
+        success_url=f"{settings.DOMAIN}{reverse('payments:checkout_success')}?order_id={order.id}"
+                    "&session_id={CHECKOUT_SESSION_ID}",
+        cancel_url=f"{settings.DOMAIN}{reverse('payments:checkout_cancel')}",
         metadata={"order_id": order.id},
     )
     return session
 
 
-def generate_order_invoice_pdf(order):
-    items = list(order.items.select_related("menu_item").all())
+# ------------------------ Async checkout (CHECKOUT_MODE=async) ------------------------
+
+def checkout_state_key(token):
+    return f"checkout:{token}"
+
+
+def _publish_checkout_state(req):
+    # Pollers read this cache entry, never the DB
+    cache.set(
+        checkout_state_key(req.token),
+        {"order_id": req.order_id, "status": req.status, "checkout_url": req.checkout_url or None},
+        CHECKOUT_STATE_TTL,
+    )
+
+
+def queue_checkout(order):
+    """Record a pending checkout and hand session creation to Celery after commit."""
+    from payments.models import CheckoutRequest
+    from payments.tasks import create_checkout_session_task
+
+    req = CheckoutRequest.objects.create(order=order)
+    _publish_checkout_state(req)
+    transaction.on_commit(lambda: create_checkout_session_task.delay(str(req.token)))
+    return req
+
+
+def complete_checkout_request(req):
+    session = create_checkout_session(req.order)
+    req.status = "ready"
+    req.checkout_url = session.url
+    req.save(update_fields=["status", "checkout_url", "updated_at"])
+    type(req.order).objects.filter(pk=req.order_id).update(stripe_session_id=session.id)
+    _publish_checkout_state(req)
+    return req
+
 
-    # Build PDF
+def fail_checkout_request(req, error):
+    req.status = "failed"
+    req.error = str(error)[:2000]
+    req.save(update_fields=["status", "error", "updated_at"])
+    _publish_checkout_state(req)
+    return req
+
+
+def invoice_data(order, items=None):
+    """
+    Plain data for `render_invoice_pdf` (no ORM objects, so it can be rendered in another process).
+    Amounts come from the order's stored totals, so the PDF matches `order.total`, payments and reports.
+    """
+    if items is None:
+        items = order.items.select_related("menu_item").all()
+    lines = []
+    for it in items:
+        qty = int(it.quantity or 1)
+        price = Decimal(it.unit_price or 0)
+        lines.append((it.menu_item.name if it.menu_item else "Item", qty, f"{price:.2f}", f"{price * qty:.2f}"))
+    summary = [("Subtotal", f"{order.subtotal:.2f}")]
+    if order.discount_amount:
+        summary.append(("Discount", f"-{order.discount_amount:.2f}"))
+    if order.tax_amount:
+        summary.append(("Tax", f"{order.tax_amount:.2f}"))
+    if order.tip_amount:
+        summary.append(("Tip", f"{order.tip_amount:.2f}"))
+    return {
+        "order_id": order.id,
+        "invoice_no": order.invoice_no or "",
+        "date": order.created_at.strftime("%Y-%m-%d %H:%M"),
+        "lines": lines,
+        "summary": summary,
+        "total": f"{order.total:.2f}",
+    }
+
+
+def render_invoice_pdf(data):
     buf = BytesIO()
     p = canvas.Canvas(buf, pagesize=A4)
     width, height = A4
@@ -51,12 +136,13 @@ def generate_order_invoice_pdf(order):
 
     # Header
     p.setFont("Helvetica-Bold", 16)
-    p.drawString(20 * mm, y, f"Invoice – Order #{order.id}")
+    title = f"Invoice {data['invoice_no']}" if data["invoice_no"] else "Invoice"
+    p.drawString(20 * mm, y, f"{title} – Order #{data['order_id']}")
     y -= 10 * mm
 
     # Date
     p.setFont("Helvetica", 10)
-    p.drawString(20 * mm, y, f"Date: {order.created_at.strftime('%Y-%m-%d %H:%M')}")
+    p.drawString(20 * mm, y, f"Date: {data['date']}")
     y -= 12 * mm
 
     # Table header
@@ -70,35 +156,55 @@ def generate_order_invoice_pdf(order):
     y -= 5 * mm
     p.setFont("Helvetica", 10)
 
-    total = Decimal("0")
-    for it in items:
-        name = it.menu_item.name if it.menu_item else "Item"
-        qty = int(it.quantity or 1)
-        price = Decimal(it.unit_price or 0)
-        line_total = price * qty
-        total += line_total
-
+    for name, qty, price, line_total in data["lines"]:
         p.drawString(20 * mm, y, name[:45])
         p.drawRightString(120 * mm, y, str(qty))
-        p.drawRightString(150 * mm, y, f"{price:.2f}")
-        p.drawRightString(190 * mm, y, f"{line_total:.2f}")
+        p.drawRightString(150 * mm, y, price)
+        p.drawRightString(190 * mm, y, line_total)
         y -= 6 * mm
 
     y -= 6 * mm
     p.line(20 * mm, y, 190 * mm, y)
     y -= 8 * mm
+    for label, amount in data.get("summary", ()):
+        p.drawRightString(150 * mm, y, label)
+        p.drawRightString(190 * mm, y, amount)
+        y -= 6 * mm
     p.setFont("Helvetica-Bold", 12)
     p.drawRightString(150 * mm, y, "Total")
-    p.drawRightString(190 * mm, y, f"{total:.2f}")
+    p.drawRightString(190 * mm, y, data["total"])
     p.showPage()
     p.save()
+    return buf.getvalue()
 
-    rel_dir = "orders"
-    rel_path = f"{rel_dir}/order-{order.id}.pdf"
-    out_dir = Path(settings.MEDIA_ROOT) / rel_dir
-    out_dir.mkdir(parents=True, exist_ok=True)
-    (Path(settings.MEDIA_ROOT) / rel_path).write_bytes(buf.getvalue())
 
-    order.invoice_pdf.name = rel_path
-    order.save(update_fields=["invoice_pdf"])
-    return rel_path
+def invoice_job(order, items=None):
+    data = invoice_data(order, items)
+    return RenderJob(
+        kind="invoice",
+        data=data,
+        path=content_path("invoice", data, "invoices"),
+        attach=("orders.Order", order.pk, "invoice_pdf"),
+    )
+
+
+def generate_order_invoice_pdf(order):
+    """Render the invoice (in the PDF worker pool) and point `order.invoice_pdf` at it."""
+    order.invoice_pdf.name = render(invoice_job(order))
+    return order.invoice_pdf.name
+
+
+def render_order_invoices(order_ids, background=False):
+    """
+    Bulk API: render invoices for many orders in parallel across cores.
+    Returns {order_id: stored name}, or {} with background=True (Celery "pdf" queue).
+    """
+    from orders.models import Order
+
+    orders = Order.objects.filter(pk__in=order_ids).prefetch_related("items__menu_item")
+    jobs = [invoice_job(order, order.items.all()) for order in orders]
+    if background:
+        enqueue(jobs)
+        return {}
+    names = render_many(jobs)
+    return {job.data["order_id"]: name for job, name in zip(jobs, names)}
@@ -0,0 +1,24 @@
+from celery import shared_task
+
+from payments.models import CheckoutRequest
+from payments.services import complete_checkout_request, fail_checkout_request
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=2)
+def create_checkout_session_task(self, token):
+    req = CheckoutRequest.objects.select_related("order").filter(pk=token).first()
+    if req is None or req.status != "pending":
+        return
+    try:
+        complete_checkout_request(req)
+    except Exception as exc:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc)
+        fail_checkout_request(req, exc)
+
+
+@shared_task
+def drain_webhook_inbox_task():
+    from payments.webhooks import drain_inbox
+    drain_inbox()
+
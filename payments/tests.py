@@ -0,0 +1,282 @@
+import json
+import os
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Location, Organization
+from core.storage import protected_storage
+from core.tasks import render_pdf_task
+from menu.models import MenuCategory, MenuItem
+from orders.models import Order, OrderItem
+from payments import fake_stripe
+from payments.models import WebhookEvent
+from payments.services import invoice_data, render_invoice_pdf, render_order_invoices
+from payments.webhooks import HANDLERS, drain_inbox, record_event, requeue
+
+SECRET = "whsec_test"
+
+
+@override_settings(STRIPE_BACKEND="fake", STRIPE_WEBHOOK_SECRET=SECRET)
+@mock.patch("payments.views.drain_webhook_inbox_task.delay")
+class FakeStripeWebhookTests(TestCase):
+    payload = json.dumps({"id": "evt_1", "type": "checkout.session.completed",
+                          "data": {"object": {"metadata": {"order_id": 1}}}}).encode()
+
+    def post(self, signature=None):
+        headers = {"HTTP_STRIPE_SIGNATURE": signature} if signature is not None else {}
+        return self.client.post("/api/payments/webhook/", self.payload, content_type="application/json", **headers)
+
+    def test_signed_event_is_recorded(self, delay):
+        self.assertEqual(self.post(fake_stripe.sign(self.payload, SECRET)).status_code, 200)
+        self.assertTrue(WebhookEvent.objects.filter(event_id="evt_1").exists())
+
+    def test_forged_events_are_rejected(self, delay):
+        stale = fake_stripe.sign(self.payload, SECRET, int(time.time()) - 3600)
+        for signature in (None, "", "t=1,v1=deadbeef", fake_stripe.sign(self.payload, "whsec_other"), stale):
+            self.assertEqual(self.post(signature).status_code, 400, signature)
+        self.assertFalse(WebhookEvent.objects.exists())
+        delay.assert_not_called()
+
+
+def completed(event_id, order_id):
+    return json.dumps({"id": event_id, "type": "checkout.session.completed", "data": {"object": {
+        "id": "cs_1", "payment_intent": "pi_1", "metadata": {"order_id": order_id},
+    }}}).encode()
+
+
+class WebhookInboxTests(TestCase):
+    def setUp(self):
+        self.order = Order.objects.create(total=Decimal("15.00"))
+
+    @override_settings(STRIPE_BACKEND="fake", STRIPE_WEBHOOK_SECRET=SECRET)
+    @mock.patch("payments.views.drain_webhook_inbox_task.delay")
+    def test_duplicate_delivery_is_recorded_once(self, delay):
+        payload = completed("evt_1", self.order.pk)
+        for _ in range(2):
+            response = self.client.post("/api/payments/webhook/", payload, content_type="application/json",
+                                        HTTP_STRIPE_SIGNATURE=fake_stripe.sign(payload, SECRET))
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(WebhookEvent.objects.get().status, WebhookEvent.RECEIVED)
+        self.assertEqual(delay.call_count, 2)
+
+    def test_drain_applies_checkout_completed_once(self):
+        record_event(completed("evt_1", self.order.pk))
+        self.assertEqual(drain_inbox(), (1, 0))
+        self.order.refresh_from_db()
+        self.assertTrue(self.order.is_paid)
+        self.assertEqual((self.order.status, self.order.stripe_payment_intent_id), ("PAID", "pi_1"))
+        self.assertIsNotNone(self.order.paid_at)
+        paid = (self.order.paid_at, self.order.invoice_no)
+
+        record_event(completed("evt_1", self.order.pk))  # redelivery
+        record_event(completed("evt_2", self.order.pk))  # a second event for the same session
+        self.assertEqual(drain_inbox(), (1, 0))
+        self.order.refresh_from_db()
+        self.assertEqual((self.order.paid_at, self.order.invoice_no), paid)
+        self.assertEqual(
+            list(WebhookEvent.objects.order_by("id").values_list("event_id", "status", "attempts")),
+            [("evt_1", WebhookEvent.PROCESSED, 1), ("evt_2", WebhookEvent.PROCESSED, 1)],
+        )
+
+    def test_handler_failure_is_recorded_and_retried(self):
+        record_event(completed("evt_1", self.order.pk))
+        broken = mock.Mock(side_effect=RuntimeError("database went away"))
+        with mock.patch.dict(HANDLERS, {"checkout.session.completed": broken}):
+            self.assertEqual(drain_inbox(), (0, 1))
+        event = WebhookEvent.objects.get()
+        self.assertEqual((event.status, event.attempts), (WebhookEvent.FAILED, 1))
+        self.assertIn("database went away", event.last_error)
+        self.order.refresh_from_db()
+        self.assertFalse(self.order.is_paid)
+        self.assertEqual(drain_inbox(), (0, 0))  # failed events wait for a requeue
+
+        self.assertEqual(requeue(failed=True), 1)
+        self.assertEqual(drain_inbox(), (1, 0))
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts, event.last_error), (WebhookEvent.PROCESSED, 2, ""))
+        self.order.refresh_from_db()
+        self.assertTrue(self.order.is_paid)
+
+    def test_replay_command(self):
+        with self.assertRaises(CommandError):
+            call_command("replay_webhook_events", stdout=StringIO())
+        record_event(completed("evt_1", self.order.pk))
+        record_event(completed("evt_2", 0))
+        WebhookEvent.objects.filter(event_id="evt_1").update(status=WebhookEvent.FAILED)
+        WebhookEvent.objects.filter(event_id="evt_2").update(
+            status=WebhookEvent.PROCESSING, updated_at=timezone.now() - timedelta(hours=1))
+
+        out = StringIO()
+        call_command("replay_webhook_events", "evt_1", "--no-drain", stdout=out)
+        self.assertEqual(out.getvalue(), "Requeued 1 event(s).\n")
+        self.assertEqual(WebhookEvent.objects.get(event_id="evt_1").status, WebhookEvent.RECEIVED)
+
+        out = StringIO()
+        call_command("replay_webhook_events", "--stuck-minutes", "30", stdout=out)
+        self.assertIn("Processed 2 event(s), 0 failed.", out.getvalue())
+        self.assertEqual(set(WebhookEvent.objects.values_list("status", flat=True)), {WebhookEvent.PROCESSED})
+        self.order.refresh_from_db()
+        self.assertTrue(self.order.is_paid)
+
+
+class InvoiceDataTests(TestCase):
+    def test_amounts_come_from_stored_totals(self):
+        category = MenuCategory.objects.create(organization=Organization.objects.create(name="O"), name="Mains")
+        item = MenuItem.objects.create(category=category, name="Burger", price=Decimal("10.00"))
+        order = Order.objects.create(
+            subtotal=Decimal("30.00"), discount_amount=Decimal("3.00"), tax_amount=Decimal("3.51"),
+            tip_amount=Decimal("2.00"), total=Decimal("32.51"),
+        )
+        OrderItem.objects.create(order=order, menu_item=item, quantity=3, unit_price=Decimal("10.00"))
+
+        data = invoice_data(order)
+        self.assertEqual(data["total"], "32.51")
+        self.assertEqual(data["summary"], [("Subtotal", "30.00"), ("Discount", "-3.00"), ("Tax", "3.51"), ("Tip", "2.00")])
+        self.assertTrue(render_invoice_pdf(data).startswith(b"%PDF"))
+
+
+class InvoiceRenderingTests(TestCase):
+    def setUp(self):
+        root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(PROTECTED_MEDIA_ROOT=root, PDF_RENDER_BACKEND="inline"))
+        self.storage = protected_storage()
+        self.admin = get_user_model().objects.create_user("admin", password="x", is_staff=True)
+        category = MenuCategory.objects.create(organization=Organization.objects.create(name="O"), name="Mains")
+        item = MenuItem.objects.create(category=category, name="Burger", price=Decimal("15.00"))
+        self.orders = []
+        for _ in range(3):
+            order = Order.objects.create(subtotal=Decimal("15.00"), total=Decimal("15.00"))
+            OrderItem.objects.create(order=order, menu_item=item, quantity=1, unit_price=item.price)
+            self.orders.append(order)
+        self.ids = [order.pk for order in self.orders]
+
+    def post(self, body):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        return client.post("/api/orders/render-invoices/", body, format="json")
+
+    def test_render_many_attaches_and_skips_unchanged_files(self):
+        rendered = render_order_invoices(self.ids)
+        self.assertEqual(sorted(rendered), self.ids)
+        for order in self.orders:
+            order.refresh_from_db()
+            self.assertEqual(order.invoice_pdf.name, rendered[order.pk])
+            self.assertTrue(self.storage.exists(order.invoice_pdf.name))
+        with mock.patch("payments.services.render_invoice_pdf") as draw:
+            self.assertEqual(render_order_invoices(self.ids), rendered)
+        draw.assert_not_called()
+
+    def test_background_jobs_render_in_the_worker(self):
+        with mock.patch("core.tasks.render_pdf_task.delay") as delay:
+            self.assertEqual(render_order_invoices(self.ids[:1], background=True), {})
+        job, = [call.args[0] for call in delay.call_args_list]
+        self.assertEqual(job["attach"], ("orders.Order", self.ids[0], "invoice_pdf"))
+        render_pdf_task(job)
+        self.orders[0].refresh_from_db()
+        self.assertEqual(self.orders[0].invoice_pdf.name, job["path"])
+        self.assertTrue(self.storage.open(job["path"]).read().startswith(b"%PDF"))
+
+    def test_bulk_endpoint(self):
+        response = self.post({"order_ids": self.ids})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["rendered"], 3)
+        self.assertEqual(Order.objects.filter(pk__in=self.ids, invoice_pdf="").count(), 0)
+
+        with mock.patch("core.tasks.render_pdf_task.delay") as delay:
+            self.assertEqual(self.post({"order_ids": self.ids, "background": True}).status_code, 202)
+            self.assertEqual(delay.call_count, 3)
+            with mock.patch("orders.views.MAX_SYNC_INVOICES", 2):
+                self.assertEqual(self.post({"order_ids": self.ids}).status_code, 202)
+            self.assertEqual(delay.call_count, 6)
+
+        self.assertEqual(self.post({"order_ids": "1,2"}).status_code, 400)
+        with mock.patch("orders.views.MAX_BULK_INVOICES", 2):
+            self.assertEqual(self.post({"order_ids": self.ids}).status_code, 400)
+
+
+class InvoiceExportTests(TestCase):
+    def setUp(self):
+        root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(PROTECTED_MEDIA_ROOT=root, PDF_RENDER_BACKEND="inline"))
+        self.storage = protected_storage()
+        self.admin = get_user_model().objects.create_user("admin", password="x", is_staff=True)
+        org = Organization.objects.create(name="O")
+        self.location = Location.objects.create(organization=org, name="Thamel", timezone="Asia/Kathmandu")
+        other = Location.objects.create(organization=org, name="Patan", timezone="Asia/Kathmandu")
+        self.item = MenuItem.objects.create(category=MenuCategory.objects.create(organization=org, name="Mains"),
+                                            name="Burger", price=Decimal("15.00"))
+        # Kathmandu is UTC+05:45: 18:15 UTC on the 1st is local midnight of the 2nd.
+        self.first = self.order(datetime(2026, 3, 1, 18, 14), invoice_no="INV-1")
+        self.second = self.order(datetime(2026, 3, 1, 18, 15), invoice_no="INV-2")
+        self.third = self.order(datetime(2026, 3, 2, 9, 0))
+        self.order(datetime(2026, 3, 2, 9, 0), is_paid=False)
+        self.order(datetime(2026, 3, 2, 9, 0), location=other)
+        self.order(datetime(2026, 3, 2, 18, 15))
+        render_order_invoices([self.second.pk])
+        self.second.refresh_from_db()
+
+    def order(self, created_at, location=None, is_paid=True, **fields):
+        order = Order.objects.create(location=location or self.location, is_paid=is_paid,
+                                     status="PAID" if is_paid else "PENDING", total=self.item.price, **fields)
+        OrderItem.objects.create(order=order, menu_item=self.item, quantity=1, unit_price=self.item.price)
+        Order.objects.filter(pk=order.pk).update(created_at=created_at.replace(tzinfo=dt_timezone.utc))
+        return order
+
+    def get(self, params):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        return client.get("/api/orders/invoices/export/", params)
+
+    def test_streamed_zip_holds_one_pdf_per_paid_order_of_the_local_days(self):
+        kept = self.storage.open(self.second.invoice_pdf.name).read()
+        response = self.get({"location": self.location.pk, "from": "2026-03-02", "to": "2026-03-02"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        self.assertIn('filename="invoices-', response["Content-Disposition"])
+
+        with zipfile.ZipFile(BytesIO(b"".join(response.streaming_content))) as archive:
+            self.assertEqual(archive.namelist(), ["INV-2.pdf", f"order-{self.third.pk}.pdf"])
+            self.assertEqual(archive.read("INV-2.pdf"), kept)
+            self.assertTrue(archive.read(f"order-{self.third.pk}.pdf").startswith(b"%PDF"))
+
+        # The missing invoice was rendered once, on the way, and attached to its order.
+        self.third.refresh_from_db()
+        self.assertTrue(self.storage.exists(self.third.invoice_pdf.name))
+        self.first.refresh_from_db()
+        self.assertFalse(self.first.invoice_pdf)
+
+    def test_bad_parameters_are_rejected(self):
+        window = {"location": self.location.pk, "from": "2026-03-01", "to": "2026-03-02"}
+        for params in ({**window, "location": ""}, {**window, "location": "x"}, {**window, "location": 999},
+                       {**window, "from": "2026-02-30"}, {**window, "to": "tomorrow"},
+                       {**window, "from": "2026-03-03"}, {"location": self.location.pk}):
+            self.assertEqual(self.get(params).status_code, 400, params)
+        staff = APIClient()
+        staff.force_authenticate(get_user_model().objects.create_user("waiter", password="x"))
+        self.assertEqual(staff.get("/api/orders/invoices/export/", window).status_code, 403)
+
+    def test_command_writes_the_archive(self):
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), "invoices.zip")
+        out = StringIO()
+        call_command("export_invoices", "--location", self.location.pk, "--from", "2026-03-01",
+                     "--to", "2026-03-01", "-o", path, stdout=out)
+        self.assertIn(f"bytes to {path}", out.getvalue())
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(archive.namelist(), ["INV-1.pdf"])
+
+        for args in (["--from", "2026-02-30", "--to", "2026-03-01"], ["--from", "2026-03-02", "--to", "2026-03-01"]):
+            with self.assertRaisesMessage(CommandError, "--from and --to must be YYYY-MM-DD dates"):
+                call_command("export_invoices", "--location", self.location.pk, *args, "-o", path)
+        with self.assertRaisesMessage(CommandError, "Location 999 not found"):
+            call_command("export_invoices", "--location", 999, "--from", "2026-03-01", "--to", "2026-03-01")
@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path("create-checkout-session/<int:order_id>/", views.create_checkout_session_view, name="create_checkout_session"),
     path("webhook/", views.stripe_webhook, name="stripe_webhook"),
+    path("checkout/<uuid:token>/", views.checkout_status, name="checkout_status"),
     path("success/", views.checkout_success, name="checkout_success"),
     path("cancel/", views.checkout_cancel, name="checkout_cancel"),
 ]
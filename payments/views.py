@@ -1,10 +1,23 @@
-import stripe
-from django.http import HttpResponse, HttpResponseRedirect
+import asyncio
+import logging
+import time
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
 from django.shortcuts import render
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
+from orders.cart import CartStore
 from orders.models import Order
-from payments.services import create_checkout_session, generate_order_invoice_pdf
+from payments.models import CheckoutRequest
+from payments.services import (
+    checkout_state_key,
+    create_checkout_session,
+    stripe_client,
+)
+from payments.tasks import drain_webhook_inbox_task
+from payments.webhooks import record_event
+
+logger = logging.getLogger(__name__)
 
 @csrf_exempt
 def create_checkout_session_view(request, order_id):
@@ -22,31 +35,26 @@ def stripe_webhook(request):
     payload = request.body
     sig_header = request.META.get("HTTP_STRIPE_SIGNATURE")
     try:
-        event = stripe.Webhook.construct_event(payload, sig_header, settings.STRIPE_WEBHOOK_SECRET)
+        event = stripe_client().Webhook.construct_event(payload, sig_header, settings.STRIPE_WEBHOOK_SECRET)
     except Exception:
         return HttpResponse(status=400)
 
-    if event.get("type") == "checkout.session.completed":
-        session = event["data"]["object"]
-        order_id = session.get("metadata", {}).get("order_id")
-        if order_id:
-            try:
-                order = Order.objects.get(id=order_id)
-                order.is_paid = True
-                order.stripe_session_id = session.get("id", "") or order.stripe_session_id
-                order.stripe_payment_intent_id = session.get("payment_intent", "") or order.stripe_payment_intent_id
-                order.status = "PAID"
-                order.save(update_fields=["is_paid", "stripe_session_id", "stripe_payment_intent_id", "status"])
-                # Generate invoice now
-                generate_order_invoice_pdf(order)
-            except Order.DoesNotExist:
-                pass
+    # Verified: store it (idempotent on event id) and ack; a worker applies it
+    record_event(payload)
+    try:
+        drain_webhook_inbox_task.delay()
+    except Exception:
+        # Broker down: the event is durable, `manage.py drain_webhook_inbox` picks it up
+        logger.exception("Could not enqueue webhook inbox drain")
 
     return HttpResponse(status=200)
 
 
 def checkout_success(request):
-    """Payment success page. Clears session cart; template clears localStorage cart."""
+    """
+    Payment success page. Clears this browser's server cart (the buyer's user cart is
+    cleared when the order is paid); the template clears the localStorage cart.
+    """
     order_id = request.GET.get("order_id")
     order = None
     if order_id:
@@ -55,15 +63,46 @@ def checkout_success(request):
         except Order.DoesNotExist:
             pass
 
-    # Clear server-side session cart
-    try:
-        request.session["cart"] = []
-        request.session.modified = True
-    except Exception:
-        pass
+    # Clear the cart this browser carries (anonymous cookie or session login)
+    CartStore.for_request(request).clear()
+
+    # Only the browser coming back from Stripe (matching session id) gets the invoice link
+    invoice_url = None
+    session_id = request.GET.get("session_id")
+    if order and order.invoice_pdf and session_id and session_id == order.stripe_session_id:
+        from orders.views import invoice_download_url
+        invoice_url = invoice_download_url(request, order)
 
-    return render(request, "payments/checkout_success.html", {"order": order})
+    return render(request, "payments/checkout_success.html", {"order": order, "invoice_url": invoice_url})
 
 
 def checkout_cancel(request):
     return render(request, "payments/checkout_cancel.html")
+
+
+async def checkout_status(request, token):
+    """
+    Long-poll for an async checkout: GET /api/payments/checkout/<token>/?wait=<seconds>
+    Returns as soon as the session is ready/failed, or {"status": "pending"} (202) at timeout.
+    Async view: under ASGI the wait does not hold a worker thread.
+    """
+    try:
+        wait = min(max(float(request.GET.get("wait", 0)), 0), settings.CHECKOUT_POLL_TIMEOUT)
+    except ValueError:
+        wait = 0
+    deadline = time.monotonic() + wait
+    key = checkout_state_key(token)
+
+    state = await cache.aget(key)
+    while (state is None or state["status"] == "pending") and time.monotonic() < deadline:
+        await asyncio.sleep(0.25)
+        state = await cache.aget(key)
+
+    if state is None:
+        # Cache evicted/cold: fall back to the row once
+        req = await CheckoutRequest.objects.filter(token=token).afirst()
+        if req is None:
+            return JsonResponse({"detail": "Unknown checkout token."}, status=404)
+        state = {"order_id": req.order_id, "status": req.status, "checkout_url": req.checkout_url or None}
+
+    return JsonResponse(state, status=202 if state["status"] == "pending" else 200)
@@ -0,0 +1,139 @@
+"""
+Stripe webhook inbox.
+
+The HTTP view verifies the signature and calls `record_event` (one idempotent
+INSERT keyed by the Stripe event id) and returns 200 right away. `drain_inbox`
+runs in a worker, claims events in batches and applies them. Duplicate
+deliveries collapse onto the same row, so they are applied only once.
+"""
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from billing.numbering import allocate_invoice_no
+from orders.models import Order
+from payments.models import WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+
+def record_event(payload: bytes):
+    """Insert a verified event; a redelivery of a known event id is a no-op."""
+    data = json.loads(payload)
+    WebhookEvent.objects.bulk_create(
+        [WebhookEvent(event_id=data["id"], type=data.get("type", ""), payload=data)],
+        ignore_conflicts=True,
+    )
+
+
+# ------------------------ Handlers ------------------------
+
+def _checkout_session_completed(event):
+    from payments.services import render_order_invoices
+
+    session = event["data"]["object"]
+    order_id = (session.get("metadata") or {}).get("order_id")
+    if not order_id:
+        return
+    order = Order.objects.select_for_update().filter(id=order_id).first()
+    if order is None or order.is_paid:
+        return
+    order.is_paid = True
+    order.paid_at = timezone.now()
+    order.stripe_session_id = session.get("id", "") or order.stripe_session_id
+    order.stripe_payment_intent_id = session.get("payment_intent", "") or order.stripe_payment_intent_id
+    order.status = "PAID"
+    if not order.invoice_no:
+        order.invoice_no = allocate_invoice_no(order.location_id)
+    order.save(update_fields=["is_paid", "paid_at", "stripe_session_id", "stripe_payment_intent_id", "status",
+                              "invoice_no", "updated_at"])
+    transaction.on_commit(lambda: render_order_invoices([order.id], background=True), robust=True)
+
+
+def _charge_refunded(event):
+    charge = event["data"]["object"]
+    intent = charge.get("payment_intent")
+    # Only full refunds change the order; partial refunds stay with the payment provider.
+    if not intent or not charge.get("refunded"):
+        return
+    order = Order.objects.select_for_update().filter(stripe_payment_intent_id=intent).first()
+    if order is None or not order.is_paid or order.status == "REFUNDED":
+        return
+    order.status = "REFUNDED"
+    order.save(update_fields=["status", "updated_at"])
+
+
+HANDLERS = {
+    "checkout.session.completed": _checkout_session_completed,
+    "charge.refunded": _charge_refunded,
+}
+
+
+# ------------------------ Worker ------------------------
+
+def _claim(batch_size):
+    with transaction.atomic():
+        ids = list(
+            WebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(status=WebhookEvent.RECEIVED)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        WebhookEvent.objects.filter(id__in=ids).update(
+            status=WebhookEvent.PROCESSING, attempts=F("attempts") + 1, updated_at=timezone.now()
+        )
+    return ids
+
+
+def process_event(event):
+    handler = HANDLERS.get(event.type)
+    try:
+        if handler:
+            with transaction.atomic():
+                handler(event.payload)
+    except Exception:
+        logger.exception("Stripe webhook %s (%s) failed", event.event_id, event.type)
+        event.status = WebhookEvent.FAILED
+        event.last_error = traceback.format_exc()[-4000:]
+    else:
+        event.status = WebhookEvent.PROCESSED
+        event.last_error = ""
+        event.processed_at = timezone.now()
+    event.save(update_fields=["status", "last_error", "processed_at", "updated_at"])
+    return event.status == WebhookEvent.PROCESSED
+
+
+def drain_inbox(batch_size=100, max_batches=None):
+    """Apply received events oldest-first; returns (processed, failed)."""
+    processed = failed = batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = _claim(batch_size)
+        if not ids:
+            break
+        batches += 1
+        for event in WebhookEvent.objects.filter(id__in=ids).order_by("id"):
+            if process_event(event):
+                processed += 1
+            else:
+                failed += 1
+    return processed, failed
+
+
+def requeue(event_ids=None, failed=False, stuck_minutes=None):
+    """Put events back in the inbox for another attempt; returns the number requeued."""
+    q = Q()
+    if event_ids:
+        q |= Q(event_id__in=event_ids)
+    if failed:
+        q |= Q(status=WebhookEvent.FAILED)
+    if stuck_minutes is not None:
+        cutoff = timezone.now() - timedelta(minutes=stuck_minutes)
+        q |= Q(status=WebhookEvent.PROCESSING, updated_at__lt=cutoff)
+    if not q:
+        return 0
+    return WebhookEvent.objects.filter(q).update(status=WebhookEvent.RECEIVED, updated_at=timezone.now())
@@ -0,0 +1,123 @@
+"""
+Admin dashboard summary: one payload built from a fixed set of aggregate
+queries (today's DailySales row, open orders by status, upcoming
+reservations, low-stock count, today's top items), whatever the data size.
+
+The payload is micro-cached per location for DASHBOARD_CACHE_SECONDS. When it
+goes stale, one request rebuilds it while concurrent requests keep getting
+the previous payload. On a cold key there is nothing to serve, so the
+requests that lose the rebuild lock wait up to COLD_WAIT_SECONDS for the
+winner's payload; either way many open staff tabs never stampede the database.
+"""
+import time as clock
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from inventory.models import InventoryItem
+from orders.models import Order
+from reservations.models import Reservation
+from .item_sales import top_items
+from .models import DailySales
+from .timeseries import CENT
+
+SALES_FIELDS = ("total_orders", "total_sales", "total_tax", "total_discount", "total_tips",
+                "cash_sales", "card_sales", "upi_sales", "items_sold")
+UPCOMING_STATUSES = ("PENDING", "CONFIRMED")
+OPEN_ORDER_STATUSES = ("PENDING", "FAILED")  # not paid, cancelled or refunded, whenever they were placed
+UPCOMING_LIMIT = 5
+TOP_ITEMS_LIMIT = 5
+COLD_WAIT_SECONDS = 2.0
+COLD_POLL_SECONDS = 0.05
+
+
+def ttl():
+    return int(getattr(settings, "DASHBOARD_CACHE_SECONDS", 5))
+
+
+def _scoped(queryset, location):
+    return queryset.filter(location=location) if location is not None else queryset
+
+
+def summary(location=None):
+    """Compute the dashboard payload (JSON-ready) for one location, or all of them."""
+    tz = location.tzinfo if location is not None else timezone.get_default_timezone()
+    now = timezone.localtime(timezone.now(), tz)
+    today = now.date()
+
+    sales = _scoped(DailySales.objects.filter(date=today), location).aggregate(
+        **{name: Sum(name) for name in SALES_FIELDS}
+    )
+    orders_by_status = dict(
+        _scoped(Order.objects.filter(status__in=OPEN_ORDER_STATUSES), location)
+        .values_list("status").annotate(n=Count("id")).order_by()
+    )
+    upcoming = (
+        _scoped(Reservation.objects.filter(status__in=UPCOMING_STATUSES), location)
+        .filter(Q(reservation_date__gt=today) | Q(reservation_date=today, reservation_time__gte=now.time()))
+    )
+    next_reservations = list(
+        upcoming.order_by("reservation_date", "reservation_time")
+        .values("id", "customer_name", "party_size", "reservation_date", "reservation_time", "status",
+                "table__table_number")[:UPCOMING_LIMIT]
+    )
+    low_stock = _scoped(InventoryItem.objects.filter(is_active=True, current_stock__lte=F("minimum_stock")),
+                        location).count()
+    locations = [location] if location is not None else []
+    paid_orders = sales["total_orders"] or 0
+
+    return {
+        "location": location.pk if location is not None else None,
+        "date": today.isoformat(),
+        "generated_at": timezone.now().isoformat(),
+        "sales": {
+            name: (value or 0) if name in ("total_orders", "items_sold") else str(Decimal(value or 0).quantize(CENT))
+            for name, value in sales.items()
+        },
+        "orders_by_status": orders_by_status,
+        "reservations": {
+            "upcoming": upcoming.count(),
+            "next": [
+                {
+                    "id": r["id"],
+                    "customer_name": r["customer_name"],
+                    "party_size": r["party_size"],
+                    "date": r["reservation_date"].isoformat(),
+                    "time": r["reservation_time"].strftime("%H:%M"),
+                    "status": r["status"],
+                    "table": r["table__table_number"],
+                }
+                for r in next_reservations
+            ],
+        },
+        "low_stock": low_stock,
+        "top_items": top_items(locations, today, today, TOP_ITEMS_LIMIT, orders=paid_orders),
+    }
+
+
+def cached_summary(location=None):
+    key = f"dashboard:summary:{location.pk if location is not None else 'all'}"
+    seconds = ttl()
+    entry = cache.get(key)
+    now = clock.time()
+    if entry is not None:
+        fresh_until, payload = entry
+        # Fresh, or stale while another request is already rebuilding it.
+        if fresh_until > now or not cache.add(f"{key}:refresh", 1, seconds):
+            return payload
+    elif not cache.add(f"{key}:refresh", 1, seconds):
+        # Cold key being built by another request: wait for its payload, then build our own.
+        deadline = now + COLD_WAIT_SECONDS
+        while clock.time() < deadline:
+            clock.sleep(COLD_POLL_SECONDS)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry[1]
+        now = clock.time()
+    payload = summary(location)
+    cache.set(key, (now + seconds, payload), seconds * 12)
+    cache.delete(f"{key}:refresh")
+    return payload
@@ -0,0 +1,24 @@
+from core.exports import Export, register
+from .models import DailySales
+
+register(Export(
+    name="daily-sales",
+    description="DailySales rollup rows, by local business date",
+    queryset=lambda: DailySales.objects.all(),
+    columns=[
+        ("location", "location_id"),
+        ("date", "date"),
+        ("orders", "total_orders"),
+        ("sales", "total_sales"),
+        ("tax", "total_tax"),
+        ("discount", "total_discount"),
+        ("tips", "total_tips"),
+        ("cash", "cash_sales"),
+        ("card", "card_sales"),
+        ("upi", "upi_sales"),
+        ("items_sold", "items_sold"),
+    ],
+    date_field="date",
+    date_only=True,
+    order_by=("date", "location"),
+))
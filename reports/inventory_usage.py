@@ -0,0 +1,77 @@
+"""
+Theoretical vs actual inventory usage.
+
+Theoretical: what the recipes say the orders paid in the range used
+(inventory.consumption.usage over their lines; refunded orders count too,
+since their stock was deducted and the food was made).
+
+Actual: theoretical usage plus recorded waste (WASTE movements in the stock
+ledger) plus whatever stock counts in the range found missing
+(`expected - counted`). Between counts, stock only moves through the ledger,
+so a count's shortfall is usage nobody recorded: over-portioning, unlogged
+waste, theft, missing recipes. Items with no waste or count in the range
+report actual = theoretical. Waste older than STOCK_MOVEMENT_RETENTION_DAYS
+has been compacted away and is no longer counted.
+"""
+from collections import defaultdict
+
+from django.db.models import Count, F, Sum
+
+from core.models import Location
+from inventory.consumption import QUANTITY, ZERO, usage
+from inventory.models import InventoryItem, StockCount, StockMovement
+from orders.models import OrderItem
+from .rollup import paid_orders
+from .timeseries import CENT
+
+
+def usage_report(locations, date_from, date_to):
+    """Per inventory item: theoretical and actual usage, variance and its cost; largest cost first."""
+    theoretical, wasted, shrinkage = defaultdict(lambda: ZERO), defaultdict(lambda: ZERO), defaultdict(lambda: ZERO)
+    counts = {}
+    for location in locations or Location.objects.filter(inventoryitem__isnull=False).distinct():
+        start, end = location.day_window(date_from, date_to)
+        sold = OrderItem.objects.filter(order__in=paid_orders(location, date_from, date_to, refunded=True).values("pk"))
+        for pk, quantity in usage(sold, location.pk).items():
+            theoretical[pk] += quantity
+        missing = (
+            StockCount.objects.filter(inventory_item__location=location, counted_at__gte=start, counted_at__lt=end)
+            .values("inventory_item")
+            .annotate(missing=Sum(F("expected") - F("quantity"), output_field=QUANTITY), n=Count("id"))
+            .order_by()
+        )
+        for row in missing:
+            shrinkage[row["inventory_item"]] += row["missing"]
+            counts[row["inventory_item"]] = row["n"]
+        waste = (
+            StockMovement.objects.filter(inventory_item__location=location, kind="WASTE",
+                                         created_at__gte=start, created_at__lt=end)
+            .values("inventory_item").annotate(total=Sum("quantity")).order_by()
+            .values_list("inventory_item", "total")
+        )
+        for pk, quantity in waste:
+            wasted[pk] -= quantity
+
+    items = InventoryItem.objects.filter(pk__in=set(theoretical) | set(wasted) | set(shrinkage)).values(
+        "id", "name", "sku", "unit", "location", "cost_price"
+    )
+    rows = []
+    for item in items:
+        expected = theoretical[item["id"]]
+        variance = wasted[item["id"]] + shrinkage[item["id"]]
+        cost = variance * item["cost_price"]
+        rows.append((cost, {
+            "inventory_item": item["id"],
+            "name": item["name"],
+            "sku": item["sku"],
+            "unit": item["unit"],
+            "location": item["location"],
+            "theoretical": str(expected.quantize(CENT)),
+            "actual": str((expected + variance).quantize(CENT)),
+            "waste": str(wasted[item["id"]].quantize(CENT)),
+            "variance": str(variance.quantize(CENT)),
+            "variance_cost": str(cost.quantize(CENT)),
+            "counts": counts.get(item["id"], 0),
+        }))
+    rows.sort(key=lambda row: (-row[0], row[1]["inventory_item"]))
+    return [row for _, row in rows]
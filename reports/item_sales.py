@@ -0,0 +1,77 @@
+"""
+Menu item analytics read from ItemSalesDaily (and DailySales for order
+totals); order lines are never scanned.
+
+Attach rate = orders containing the item / all paid orders in the range.
+"""
+from django.db.models import Count, Sum
+
+from .models import DailySales, ItemSalesDaily
+from .timeseries import CENT, fold_weeks
+
+RANKINGS = ("quantity", "revenue", "orders")
+
+
+def _rows(model, locations, date_from, date_to):
+    rows = model.objects.filter(date__gte=date_from, date__lte=date_to)
+    return rows.filter(location__in=locations) if locations else rows
+
+
+def total_orders(locations, date_from, date_to):
+    return _rows(DailySales, locations, date_from, date_to).aggregate(n=Sum("total_orders"))["n"] or 0
+
+
+def top_items(locations, date_from, date_to, limit=10, by="quantity", orders=None):
+    """Best sellers; pass `orders` (paid orders in the range) when already known to skip a query."""
+    rows = (
+        _rows(ItemSalesDaily, locations, date_from, date_to)
+        .values("menu_item", "menu_item__name", "menu_item__category__name")
+        .annotate(quantity=Sum("quantity"), revenue=Sum("revenue"), orders=Sum("orders"))
+        .order_by(f"-{by}", "menu_item")[:limit]
+    )
+    if orders is None:
+        orders = total_orders(locations, date_from, date_to)
+    return [
+        {
+            "menu_item": row["menu_item"],
+            "name": row["menu_item__name"],
+            "category": row["menu_item__category__name"],
+            "quantity": row["quantity"],
+            "revenue": str(row["revenue"].quantize(CENT)),
+            "orders": row["orders"],
+            "attach_rate": round(row["orders"] / orders, 4) if orders else None,
+        }
+        for row in rows
+    ]
+
+
+def item_trend(menu_item, locations, date_from, date_to, bucket="day"):
+    """[(day or monday, quantity, revenue, orders)] for one item; empty buckets are omitted."""
+    days = list(
+        _rows(ItemSalesDaily, locations, date_from, date_to)
+        .filter(menu_item=menu_item)
+        .values("date")
+        .annotate(quantity=Sum("quantity"), revenue=Sum("revenue"), orders=Sum("orders"))
+        .order_by("date")
+        .values_list("date", "quantity", "revenue", "orders")
+    )
+    return days if bucket == "day" else fold_weeks(days)
+
+
+def category_breakdown(locations, date_from, date_to):
+    rows = (
+        _rows(ItemSalesDaily, locations, date_from, date_to)
+        .values("menu_item__category", "menu_item__category__name")
+        .annotate(quantity=Sum("quantity"), revenue=Sum("revenue"), items=Count("menu_item", distinct=True))
+        .order_by("-revenue", "menu_item__category")
+    )
+    return [
+        {
+            "category": row["menu_item__category"],
+            "name": row["menu_item__category__name"],
+            "quantity": row["quantity"],
+            "revenue": str(row["revenue"].quantize(CENT)),
+            "items": row["items"],
+        }
+        for row in rows
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 04:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailysales',
+            index=models.Index(fields=['created_at', 'id'], name='dailysales_created_id_idx'),
+        ),
+    ]
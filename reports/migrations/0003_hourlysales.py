@@ -0,0 +1,32 @@
+# Generated by Django 5.1.2 on 2026-10-18 05:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('reports', '0002_dailysales_dailysales_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HourlySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('date', models.DateField()),
+                ('total_orders', models.PositiveIntegerField(default=0)),
+                ('total_sales', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('items_sold', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.location')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['location', 'date'], name='hourlysales_location_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('location', 'hour'), name='hourlysales_location_hour_uniq')],
+            },
+        ),
+    ]
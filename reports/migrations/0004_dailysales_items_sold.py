@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 05:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_hourlysales'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailysales',
+            name='items_sold',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
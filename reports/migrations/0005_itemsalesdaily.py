@@ -0,0 +1,33 @@
+# Generated by Django 5.1.2 on 2026-10-18 05:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('menu', '0002_menu_search_index'),
+        ('reports', '0004_dailysales_items_sold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemSalesDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('orders', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.location')),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='menu.menuitem')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['menu_item', 'date'], name='itemsales_item_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('location', 'date', 'menu_item'), name='itemsales_loc_date_item_uniq')],
+            },
+        ),
+    ]
@@ -15,15 +15,61 @@ class DailySales(models.Model):
     cash_sales = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     card_sales = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     upi_sales = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    items_sold = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ['location', 'date']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='dailysales_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.location.name} - {self.date}"
 
+class HourlySales(models.Model):
+    """Per-location sales for one local hour, maintained by reports.rollup."""
+    location = models.ForeignKey('core.Location', on_delete=models.CASCADE)
+    hour = models.DateTimeField()  # start of the hour in the location's timezone
+    date = models.DateField()  # local date of `hour`; day/week buckets group on it
+    total_orders = models.PositiveIntegerField(default=0)
+    total_sales = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    items_sold = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['location', 'hour'], name='hourlysales_location_hour_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['location', 'date'], name='hourlysales_location_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.location.name} - {self.hour:%Y-%m-%d %H:%M}"
+
+class ItemSalesDaily(models.Model):
+    """Per-location, per-menu-item sales for one local date, maintained by reports.rollup."""
+    location = models.ForeignKey('core.Location', on_delete=models.CASCADE)
+    menu_item = models.ForeignKey('menu.MenuItem', on_delete=models.CASCADE, related_name='daily_sales')
+    date = models.DateField()
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)  # quantity * unit price, pre-discount
+    orders = models.PositiveIntegerField(default=0)  # orders containing the item (attach rate)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['location', 'date', 'menu_item'], name='itemsales_loc_date_item_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['menu_item', 'date'], name='itemsales_item_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.menu_item.name} - {self.date}"
+
 class ShiftReport(models.Model):
     location = models.ForeignKey('core.Location', on_delete=models.CASCADE)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -33,9 +79,26 @@ class ShiftReport(models.Model):
     closing_cash = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     total_orders = models.PositiveIntegerField(default=0)
     total_sales = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Filled in by reports.shifts.close_shift; read-only once is_closed is set
+    total_tips = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    cash_sales = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    card_sales = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    upi_sales = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    expected_cash = models.DecimalField(max_digits=12, decimal_places=2, default=0)  # opening cash + cash sales
     notes = models.TextField(blank=True)
     is_closed = models.BooleanField(default=False)
+    closed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['location', 'shift_start'], name='shiftreport_loc_start_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.shift_start.date()}"
+
+    @property
+    def cash_difference(self):
+        """Counted minus expected cash; negative means the drawer is short."""
+        return self.closing_cash - self.expected_cash
@@ -0,0 +1,231 @@
+"""
+Sales rollups: DailySales (location, local business date), HourlySales
+(location, local hour) and ItemSalesDaily (location, date, menu item).
+
+Incremental: when an order becomes paid (orders.signals.order_paid) its amounts
+are added to the rows for the day and hour it was paid, in the location's
+timezone, with one `F()` UPDATE per row inside the order's own transaction.
+A refund (order_refunded) subtracts the same amounts from those same rows.
+Concurrent payments never read-modify-write a row, so no increment is lost.
+
+Reconcile: `rebuild()` recomputes a date range from the orders themselves with
+one grouped query per table and location, and replaces the stored rows. Use it
+to backfill, or to repair rows after manual data fixes
+(`manage.py reconcile_sales`).
+
+Tender split: cash and UPI come from billing.Payment rows; whatever else was
+paid (Stripe, card terminals) counts as card.
+"""
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, TruncDate, TruncHour
+from django.utils import timezone
+
+from billing.models import Payment
+from core.models import Location
+from orders.models import Order, OrderItem
+from .models import DailySales, HourlySales, ItemSalesDaily
+
+ZERO = Decimal("0.00")
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+AMOUNT_FIELDS = ("total_sales", "total_tax", "total_discount", "total_tips", "cash_sales", "card_sales", "upi_sales")
+
+
+def paid_local(order):
+    """When the order was paid, in its location's timezone."""
+    return timezone.localtime(order.paid_at or order.created_at, order.location.tzinfo)
+
+
+def business_date(order):
+    """Local date the order counts towards."""
+    return paid_local(order).date()
+
+
+def order_amounts(order):
+    tenders = dict(
+        Payment.objects.filter(order=order, method__in=["CASH", "UPI"])
+        .values_list("method").annotate(amount=Sum("amount")).order_by()
+    )
+    cash, upi = tenders.get("CASH", ZERO), tenders.get("UPI", ZERO)
+    return {
+        "total_sales": order.total,
+        "total_tax": order.tax_amount,
+        "total_discount": order.discount_amount,
+        "total_tips": order.tip_amount,
+        "cash_sales": cash,
+        "upi_sales": upi,
+        "card_sales": order.total - cash - upi,
+    }
+
+
+def item_lines(order):
+    """{menu_item_id: (quantity, revenue)} for the order's lines."""
+    lines = (
+        order.items.values("menu_item")
+        .annotate(qty=Sum("quantity"), revenue=Sum(F("quantity") * F("unit_price"), output_field=MONEY))
+        .order_by()
+    )
+    return {line["menu_item"]: (line["qty"], line["revenue"]) for line in lines}
+
+
+def _bump(model, lookup, values, sign, defaults=None, counter="total_orders"):
+    """Add `sign * values` to the row matching `lookup`; the row is created (with `defaults`) on first use."""
+    rows = model.objects.filter(**lookup)
+    if sign < 0:
+        # Never push a column below zero (e.g. refund of an order paid before the rollup existed).
+        rows.filter(**{f"{counter}__gt": 0}).update(updated_at=timezone.now(), **{
+            name: Greatest(F(name) - amount, Value(0), output_field=model._meta.get_field(name))
+            for name, amount in values.items()
+        })
+        return
+    deltas = {name: F(name) + amount for name, amount in values.items()}
+    deltas["updated_at"] = timezone.now()
+    if rows.update(**deltas):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **(defaults or {}), **values)
+    except IntegrityError:
+        # Another payment created the row first; add to it instead.
+        rows.update(**deltas)
+
+
+def _apply(order, sign):
+    if order.location_id is None:
+        return
+    when = paid_local(order)
+    hour = when.replace(minute=0, second=0, microsecond=0)
+    lines = item_lines(order)
+    items = sum(qty for qty, _ in lines.values())
+    _bump(DailySales, {"location_id": order.location_id, "date": when.date()},
+          {"total_orders": 1, "items_sold": items, **order_amounts(order)}, sign)
+    _bump(HourlySales, {"location_id": order.location_id, "hour": hour},
+          {"total_orders": 1, "total_sales": order.total, "items_sold": items}, sign,
+          defaults={"date": hour.date()})
+    for menu_item_id, (qty, revenue) in lines.items():
+        _bump(ItemSalesDaily, {"location_id": order.location_id, "date": when.date(), "menu_item_id": menu_item_id},
+              {"orders": 1, "quantity": qty, "revenue": revenue}, sign, counter="orders")
+
+
+def record_paid(sender, order, **kwargs):
+    _apply(order, 1)
+
+
+def record_refund(sender, order, **kwargs):
+    _apply(order, -1)
+
+
+# ------------------------ Reconcile ------------------------
+
+def tender(method):
+    """Per-order sum of billing payments with `method` (0 when none), for use inside order aggregates."""
+    paid = (
+        Payment.objects.filter(order=OuterRef("pk"), method=method)
+        .values("order").annotate(amount=Sum("amount")).values("amount")
+    )
+    return Coalesce(Subquery(paid, output_field=MONEY), Value(ZERO), output_field=MONEY)
+
+
+def _items():
+    qty = (
+        OrderItem.objects.filter(order=OuterRef("pk"))
+        .values("order").annotate(n=Sum("quantity")).values("n")
+    )
+    return Coalesce(Subquery(qty, output_field=IntegerField()), Value(0))
+
+
+def paid_orders(location, date_from, date_to, refunded=False):
+    """Orders paid at `location` on local dates date_from..date_to, annotated with `paid_on`."""
+    start, end = location.day_window(date_from, date_to)
+    orders = (
+        Order.objects.filter(location=location, is_paid=True)
+        .annotate(paid_on=Coalesce("paid_at", "created_at"))
+        .filter(paid_on__gte=start, paid_on__lt=end)
+    )
+    return orders if refunded else orders.exclude(status="REFUNDED")
+
+
+def compute(location, date_from, date_to):
+    """DailySales values for `location` over [date_from, date_to], from source orders, in one query."""
+    rows = (
+        paid_orders(location, date_from, date_to)
+        .annotate(day=TruncDate("paid_on", tzinfo=location.tzinfo))
+        .values("day")
+        .annotate(
+            total_orders=Count("id"),
+            total_sales=Sum("total"),
+            total_tax=Sum("tax_amount"),
+            total_discount=Sum("discount_amount"),
+            total_tips=Sum("tip_amount"),
+            cash_sales=Sum(tender("CASH")),
+            upi_sales=Sum(tender("UPI")),
+            items_sold=Sum(_items()),
+        )
+        .order_by("day")
+    )
+    return [
+        DailySales(
+            location=location, date=row["day"], total_orders=row["total_orders"], items_sold=row["items_sold"],
+            card_sales=row["total_sales"] - row["cash_sales"] - row["upi_sales"],
+            **{name: row[name] for name in AMOUNT_FIELDS if name != "card_sales"},
+        )
+        for row in rows
+    ]
+
+
+def compute_hourly(location, date_from, date_to):
+    """HourlySales values for `location` over [date_from, date_to], bucketed with TruncHour in SQL."""
+    tz = location.tzinfo
+    rows = (
+        paid_orders(location, date_from, date_to)
+        .annotate(hour=TruncHour("paid_on", tzinfo=tz))
+        .values("hour")
+        .annotate(total_orders=Count("id"), total_sales=Sum("total"), items_sold=Sum(_items()))
+        .order_by("hour")
+    )
+    return [
+        HourlySales(location=location, hour=row["hour"], date=timezone.localtime(row["hour"], tz).date(),
+                    total_orders=row["total_orders"], total_sales=row["total_sales"], items_sold=row["items_sold"])
+        for row in rows
+    ]
+
+
+def compute_items(location, date_from, date_to):
+    """ItemSalesDaily values for `location` over [date_from, date_to], grouped from order lines in one query."""
+    orders = paid_orders(location, date_from, date_to)
+    rows = (
+        OrderItem.objects.filter(order__in=orders.values("pk"))
+        .annotate(day=TruncDate(Coalesce("order__paid_at", "order__created_at"), tzinfo=location.tzinfo))
+        .values("day", "menu_item")
+        .annotate(
+            qty=Sum("quantity"),
+            revenue=Sum(F("quantity") * F("unit_price"), output_field=MONEY),
+            orders=Count("order", distinct=True),
+        )
+        .order_by("day", "menu_item")
+    )
+    return [
+        ItemSalesDaily(location=location, date=row["day"], menu_item_id=row["menu_item"],
+                       quantity=row["qty"], revenue=row["revenue"], orders=row["orders"])
+        for row in rows
+    ]
+
+
+@transaction.atomic
+def rebuild(location, date_from, date_to):
+    """
+    Replace the stored DailySales, HourlySales and ItemSalesDaily rows for the
+    range with freshly computed ones; returns the number of rows written per table.
+    """
+    location = location if isinstance(location, Location) else Location.objects.get(pk=location)
+    tables = (
+        (DailySales, compute(location, date_from, date_to)),
+        (HourlySales, compute_hourly(location, date_from, date_to)),
+        (ItemSalesDaily, compute_items(location, date_from, date_to)),
+    )
+    for model, rows in tables:
+        model.objects.filter(location=location, date__gte=date_from, date__lte=date_to).delete()
+        model.objects.bulk_create(rows, batch_size=1000)
+    return tuple(len(rows) for _, rows in tables)
@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 from .models import DailySales, ShiftReport
 
@@ -11,7 +13,16 @@ class DailySalesSerializer(serializers.ModelSerializer):
 class ShiftReportSerializer(serializers.ModelSerializer):
     location_name = serializers.CharField(source='location.name', read_only=True)
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
+    cash_difference = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
     
     class Meta:
         model = ShiftReport
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        # Computed by the close action (reports.shifts.close_shift)
+        read_only_fields = ['total_orders', 'total_sales', 'total_tips', 'cash_sales', 'card_sales', 'upi_sales',
+                            'expected_cash', 'is_closed', 'closed_at']
+
+class ShiftCloseSerializer(serializers.Serializer):
+    closing_cash = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0'))
+    shift_end = serializers.DateTimeField(required=False)
+    notes = serializers.CharField(required=False, allow_blank=True)
\ No newline at end of file
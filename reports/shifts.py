@@ -0,0 +1,82 @@
+"""
+Shift close and Z-report.
+
+`close_shift` computes a shift's totals and tender breakdown with a single
+aggregate statement over the location's orders paid inside the shift window
+(index order_loc_paid_idx). Cash and UPI come from billing.Payment via
+correlated subqueries, the rest counts as card, as in the sales rollups. The
+report is then locked: closed shifts are never recomputed or edited.
+
+`z_report` lists every shift of a local business day at a location with their
+sums, next to the day's DailySales row (sales outside any shift show up as
+the difference).
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from orders.models import Order
+from .models import DailySales, ShiftReport
+from .rollup import MONEY, ZERO, tender
+
+SHIFT_TOTALS = ("total_orders", "total_sales", "total_tips", "cash_sales", "card_sales", "upi_sales")
+
+
+class ShiftClosed(Exception):
+    pass
+
+
+def shift_totals(location, start, end):
+    """Totals for orders paid at `location` in [start, end), in one query."""
+    totals = (
+        Order.objects.filter(location=location, is_paid=True, paid_at__gte=start, paid_at__lt=end)
+        .exclude(status="REFUNDED")
+        .aggregate(
+            total_orders=Count("id"),
+            total_sales=Coalesce(Sum("total"), ZERO, output_field=MONEY),
+            total_tips=Coalesce(Sum("tip_amount"), ZERO, output_field=MONEY),
+            cash_sales=Coalesce(Sum(tender("CASH")), ZERO, output_field=MONEY),
+            upi_sales=Coalesce(Sum(tender("UPI")), ZERO, output_field=MONEY),
+        )
+    )
+    totals["card_sales"] = totals["total_sales"] - totals["cash_sales"] - totals["upi_sales"]
+    return totals
+
+
+def close_shift(report, closing_cash, shift_end=None, notes=None):
+    """Compute and lock `report`; raises ShiftClosed if it was closed already."""
+    with transaction.atomic():
+        report = ShiftReport.objects.select_for_update(of=("self",)).select_related("location", "user").get(pk=report.pk)
+        if report.is_closed:
+            raise ShiftClosed(f"Shift report {report.pk} is already closed")
+        report.shift_end = shift_end or timezone.now()
+        for name, value in shift_totals(report.location, report.shift_start, report.shift_end).items():
+            setattr(report, name, value)
+        report.closing_cash = Decimal(closing_cash)
+        report.expected_cash = report.opening_cash + report.cash_sales
+        if notes is not None:
+            report.notes = notes
+        report.is_closed = True
+        report.closed_at = timezone.now()
+        report.save()
+    return report
+
+
+def z_report(location, day):
+    """All shifts that started on local date `day` at `location`, with their sums and the day's rollup."""
+    start, end = location.day_window(day)
+    shifts = list(
+        ShiftReport.objects.filter(location=location, shift_start__gte=start, shift_start__lt=end)
+        .select_related("user").order_by("shift_start")
+    )
+    closed = [s for s in shifts if s.is_closed]
+    sums = {name: sum((getattr(s, name) for s in closed), ZERO) for name in SHIFT_TOTALS if name != "total_orders"}
+    sums["total_orders"] = sum(s.total_orders for s in closed)
+    for name in ("opening_cash", "closing_cash", "expected_cash"):
+        sums[name] = sum((getattr(s, name) for s in closed), ZERO)
+    sums["cash_difference"] = sums["closing_cash"] - sums["expected_cash"]
+    daily = DailySales.objects.filter(location=location, date=day).first()
+    return {"day": day, "shifts": shifts, "open_shifts": len(shifts) - len(closed), "totals": sums, "daily": daily}
@@ -0,0 +1,6 @@
+from orders.signals import order_paid, order_refunded
+
+from . import rollup
+
+order_paid.connect(rollup.record_paid, dispatch_uid="reports-daily-sales-paid")
+order_refunded.connect(rollup.record_refund, dispatch_uid="reports-daily-sales-refund")
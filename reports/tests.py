@@ -0,0 +1,467 @@
+import csv
+import json
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from billing.models import Payment
+from core import exports
+from core.models import Location, Organization
+from inventory.models import InventoryItem
+from menu.models import MenuCategory, MenuItem
+from orders.models import Order, OrderItem
+from payments.models import WebhookEvent
+from payments.webhooks import process_event
+from reservations.models import Reservation, Table
+from . import dashboard, timeseries
+from .models import DailySales, HourlySales, ItemSalesDaily, ShiftReport
+
+DAILY_FIELDS = ("date", "total_orders", "items_sold", "total_sales", "total_tax", "total_discount", "total_tips",
+                "cash_sales", "card_sales", "upi_sales")
+HOURLY_FIELDS = ("hour", "date", "total_orders", "total_sales", "items_sold")
+ITEM_FIELDS = ("date", "menu_item_id", "quantity", "revenue", "orders")
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class SalesFixtures(TestCase):
+    """One Kathmandu location (UTC+05:45) with two menu items; `pay()` marks an order paid like the webhook does."""
+
+    def setUp(self):
+        cache.clear()
+        org = Organization.objects.create(name="Org")
+        self.location = Location.objects.create(organization=org, name="Thamel", timezone="Asia/Kathmandu")
+        category = MenuCategory.objects.create(organization=org, name="Mains")
+        self.momo = MenuItem.objects.create(category=category, name="Momo", price=Decimal("5.00"))
+        self.tea = MenuItem.objects.create(category=category, name="Tea", price=Decimal("1.50"))
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user("admin", password="x", is_staff=True)
+        self.client.force_authenticate(self.admin)
+
+    def pay(self, paid_at, lines, tenders=(), tax="0.00", tip="0.00"):
+        order = Order.objects.create(location=self.location)
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, menu_item=item, quantity=qty, unit_price=item.price) for item, qty in lines
+        )
+        subtotal = sum((item.price * qty for item, qty in lines), Decimal("0.00"))
+        order.subtotal, order.tax_amount, order.tip_amount = subtotal, Decimal(tax), Decimal(tip)
+        order.total = subtotal + order.tax_amount + order.tip_amount
+        order.save()
+        for method, amount in tenders:
+            Payment.objects.create(order=order, method=method, amount=Decimal(amount))
+        order.is_paid, order.status, order.paid_at = True, "PAID", paid_at
+        order.save()
+        return order
+
+    def refund(self, order):
+        order.status = "REFUNDED"
+        order.save()
+
+    def rows(self, model, fields):
+        return sorted(model.objects.filter(location=self.location).values_list(*fields))
+
+
+class SalesRollupTests(SalesFixtures):
+    def test_payment_increments_rollups_in_local_time(self):
+        # 18:30 UTC is 00:15 the next day in Kathmandu.
+        self.pay(utc(2026, 3, 1, 18, 30), [(self.momo, 2), (self.tea, 1)], tenders=[("CASH", "5.00")], tax="1.15")
+        self.pay(utc(2026, 3, 1, 18, 40), [(self.momo, 1)], tenders=[("UPI", "5.00")], tip="1.00")
+
+        day = DailySales.objects.get(location=self.location)
+        self.assertEqual(day.date, date(2026, 3, 2))
+        self.assertEqual((day.total_orders, day.items_sold), (2, 4))
+        self.assertEqual(day.total_sales, Decimal("18.65"))
+        self.assertEqual((day.total_tax, day.total_tips), (Decimal("1.15"), Decimal("1.00")))
+        self.assertEqual((day.cash_sales, day.upi_sales, day.card_sales),
+                         (Decimal("5.00"), Decimal("5.00"), Decimal("8.65")))
+
+        hour = HourlySales.objects.get(location=self.location)
+        self.assertEqual(hour.hour, utc(2026, 3, 1, 18, 15))  # 00:00 local
+        self.assertEqual((hour.date, hour.total_orders, hour.items_sold), (date(2026, 3, 2), 2, 4))
+
+        self.assertEqual(self.rows(ItemSalesDaily, ITEM_FIELDS), sorted([
+            (date(2026, 3, 2), self.momo.pk, 3, Decimal("15.00"), 2),
+            (date(2026, 3, 2), self.tea.pk, 1, Decimal("1.50"), 1),
+        ]))
+
+    def test_refund_decrements_the_same_rows(self):
+        kept = self.pay(utc(2026, 3, 1, 6, 0), [(self.momo, 1)])
+        refunded = self.pay(utc(2026, 3, 1, 6, 10), [(self.momo, 2), (self.tea, 2)], tenders=[("CASH", "13.00")])
+        self.refund(refunded)
+
+        day = DailySales.objects.get(location=self.location)
+        self.assertEqual((day.total_orders, day.items_sold, day.total_sales), (1, 1, kept.total))
+        self.assertEqual((day.cash_sales, day.card_sales), (Decimal("0.00"), kept.total))
+        hour = HourlySales.objects.get(location=self.location)
+        self.assertEqual((hour.total_orders, hour.total_sales, hour.items_sold), (1, kept.total, 1))
+        items = {row.menu_item_id: row for row in ItemSalesDaily.objects.filter(location=self.location)}
+        self.assertEqual((items[self.momo.pk].quantity, items[self.momo.pk].orders), (1, 1))
+        self.assertEqual((items[self.tea.pk].quantity, items[self.tea.pk].orders), (0, 0))
+
+    def test_refund_of_an_order_missing_from_the_rollup(self):
+        self.pay(utc(2026, 3, 1, 6, 0), [(self.tea, 1)])
+        legacy = Order.objects.create(location=self.location, total=Decimal("25.00"), stripe_payment_intent_id="pi_1")
+        OrderItem.objects.create(order=legacy, menu_item=self.tea, quantity=5, unit_price=Decimal("5.00"))
+        # Paid before the rollups existed: no signal ever counted it.
+        Order.objects.filter(pk=legacy.pk).update(is_paid=True, status="PAID", paid_at=utc(2026, 3, 1, 6, 10))
+
+        event = WebhookEvent.objects.create(event_id="evt_1", type="charge.refunded", payload={
+            "data": {"object": {"payment_intent": "pi_1", "refunded": True}},
+        })
+        self.assertTrue(process_event(event))
+
+        legacy.refresh_from_db()
+        self.assertEqual(legacy.status, "REFUNDED")
+        day = DailySales.objects.get(location=self.location)
+        self.assertEqual((day.total_orders, day.items_sold, day.total_sales), (0, 0, Decimal("0.00")))
+        hour = HourlySales.objects.get(location=self.location)
+        self.assertEqual((hour.total_orders, hour.items_sold, hour.total_sales), (0, 0, Decimal("0.00")))
+        tea = ItemSalesDaily.objects.get(location=self.location, menu_item=self.tea)
+        self.assertEqual((tea.orders, tea.quantity, tea.revenue), (0, 0, Decimal("0.00")))
+
+    def test_reconcile_reproduces_incremental_rows(self):
+        self.pay(utc(2026, 3, 1, 18, 30), [(self.momo, 2), (self.tea, 1)], tenders=[("CASH", "5.00")], tax="1.15")
+        self.pay(utc(2026, 3, 2, 3, 0), [(self.tea, 4)], tenders=[("UPI", "2.00")], tip="0.50")
+        self.refund(self.pay(utc(2026, 3, 2, 9, 0), [(self.momo, 1)]))
+        self.pay(utc(2026, 3, 3, 12, 0), [(self.momo, 1), (self.tea, 1)])
+        # Refunds leave zeroed rows behind; reconcile only writes rows that have sales.
+        incremental = [
+            self.rows(DailySales, DAILY_FIELDS),
+            [row for row in self.rows(HourlySales, HOURLY_FIELDS) if row[2]],
+            [row for row in self.rows(ItemSalesDaily, ITEM_FIELDS) if row[4]],
+        ]
+
+        DailySales.objects.all().delete()
+        HourlySales.objects.update(total_sales=0)
+        ItemSalesDaily.objects.update(quantity=99)
+        call_command("reconcile_sales", "--from", "2026-03-01", "--to", "2026-03-04", stdout=StringIO())
+
+        self.assertEqual([
+            self.rows(DailySales, DAILY_FIELDS),
+            self.rows(HourlySales, HOURLY_FIELDS),
+            self.rows(ItemSalesDaily, ITEM_FIELDS),
+        ], incremental)
+
+    def test_reconcile_rejects_dates_that_do_not_parse(self):
+        for args in (["--from", "2026-02-30"], ["--to", "yesterday"], ["--from", "2026-03-02", "--to", "2026-03-01"]):
+            with self.assertRaisesMessage(CommandError, "--from and --to must be YYYY-MM-DD dates"):
+                call_command("reconcile_sales", *args, stdout=StringIO())
+
+
+class TimeseriesTests(SalesFixtures):
+    @override_settings(TIMESERIES_MAX_POINTS=48)
+    def test_bucket_widens_past_max_points(self):
+        self.assertEqual(timeseries.choose_bucket("hour", date(2026, 3, 1), date(2026, 3, 2)), "hour")
+        self.assertEqual(timeseries.choose_bucket("hour", date(2026, 3, 1), date(2026, 3, 3)), "day")
+        self.assertEqual(timeseries.choose_bucket("day", date(2026, 3, 1), date(2026, 4, 17)), "day")
+        self.assertEqual(timeseries.choose_bucket("day", date(2026, 3, 1), date(2026, 4, 18)), "week")
+        self.assertEqual(timeseries.choose_bucket("week", date(2026, 3, 1), date(2026, 3, 1)), "week")
+        # Week is the widest bucket: it is kept even when it is still over the limit.
+        self.assertEqual(timeseries.choose_bucket("hour", date(2020, 1, 1), date(2026, 1, 1)), "week")
+
+    def test_fold_weeks_sums_into_mondays(self):
+        days = [
+            (date(2026, 3, 1), 1, Decimal("2.00"), 3),  # Sunday
+            (date(2026, 3, 2), 4, Decimal("5.00"), 6),
+            (date(2026, 3, 8), 7, Decimal("8.00"), 9),
+        ]
+        self.assertEqual(timeseries.fold_weeks(days), [
+            (date(2026, 2, 23), 1, Decimal("2.00"), 3),
+            (date(2026, 3, 2), 11, Decimal("13.00"), 15),
+        ])
+
+    def test_hourly_points_are_local_to_the_location(self):
+        self.pay(utc(2026, 3, 1, 18, 30), [(self.momo, 2)])
+        self.pay(utc(2026, 3, 1, 19, 20), [(self.tea, 2)])
+        response = self.client.get("/api/reports/timeseries/", {
+            "location": self.location.pk, "from": "2026-03-02", "to": "2026-03-02", "bucket": "hour",
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["points"], [
+            {"t": "2026-03-02T00:00:00+05:45", "orders": 1, "revenue": "10.00", "items": 2},
+            {"t": "2026-03-02T01:00:00+05:45", "orders": 1, "revenue": "3.00", "items": 2},
+        ])
+
+    @override_settings(TIMESERIES_MAX_POINTS=10)
+    def test_auto_bucket_is_widened_by_the_endpoint(self):
+        self.pay(utc(2026, 3, 2, 6, 0), [(self.momo, 1)])
+        self.pay(utc(2026, 3, 9, 6, 0), [(self.momo, 1)])
+        response = self.client.get("/api/reports/timeseries/", {"from": "2026-03-01", "to": "2026-03-14"})
+        self.assertEqual(response.json()["bucket"], "week")
+        self.assertEqual([point["t"] for point in response.json()["points"]], ["2026-03-02", "2026-03-09"])
+        self.assertEqual(self.client.get("/api/reports/timeseries/", {"bucket": "month"}).status_code, 400)
+
+
+class ItemSalesTests(SalesFixtures):
+    def setUp(self):
+        super().setUp()
+        drinks = MenuCategory.objects.create(organization=self.location.organization, name="Drinks")
+        self.tea.category = drinks
+        self.tea.save()
+        self.pay(utc(2026, 3, 1, 6, 0), [(self.momo, 1), (self.tea, 1)])  # Sunday
+        self.pay(utc(2026, 3, 2, 6, 0), [(self.tea, 4)])
+        self.pay(utc(2026, 3, 3, 6, 0), [(self.momo, 2)])
+        self.pay(utc(2026, 3, 3, 7, 0), [(self.tea, 1)])
+        self.range = {"location": self.location.pk, "from": "2026-03-01", "to": "2026-03-07"}
+
+    def test_top_items_by_quantity_and_revenue(self):
+        response = self.client.get("/api/reports/items/top/", self.range)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["total_orders"], 4)
+        self.assertEqual(response.json()["items"], [
+            {"menu_item": self.tea.pk, "name": "Tea", "category": "Drinks", "quantity": 6, "revenue": "9.00",
+             "orders": 3, "attach_rate": 0.75},
+            {"menu_item": self.momo.pk, "name": "Momo", "category": "Mains", "quantity": 3, "revenue": "15.00",
+             "orders": 2, "attach_rate": 0.5},
+        ])
+        by_revenue = self.client.get("/api/reports/items/top/", {**self.range, "by": "revenue", "limit": 1})
+        self.assertEqual([item["name"] for item in by_revenue.json()["items"]], ["Momo"])
+        self.assertEqual(self.client.get("/api/reports/items/top/", {"by": "price"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/reports/items/top/", {"limit": 0}).status_code, 400)
+
+    def test_item_trend_by_day_and_week(self):
+        url = f"/api/reports/items/{self.tea.pk}/trend/"
+        self.assertEqual(self.client.get(url, self.range).json()["points"], [
+            {"t": "2026-03-01", "quantity": 1, "revenue": "1.50", "orders": 1},
+            {"t": "2026-03-02", "quantity": 4, "revenue": "6.00", "orders": 1},
+            {"t": "2026-03-03", "quantity": 1, "revenue": "1.50", "orders": 1},
+        ])
+        self.assertEqual(self.client.get(url, {**self.range, "bucket": "week"}).json()["points"], [
+            {"t": "2026-02-23", "quantity": 1, "revenue": "1.50", "orders": 1},
+            {"t": "2026-03-02", "quantity": 5, "revenue": "7.50", "orders": 2},
+        ])
+        self.assertEqual(self.client.get(url, {"bucket": "hour"}).status_code, 400)
+
+    def test_category_breakdown(self):
+        response = self.client.get("/api/reports/items/categories/", self.range)
+        self.assertEqual([
+            (row["name"], row["quantity"], row["revenue"], row["items"]) for row in response.json()["categories"]
+        ], [("Mains", 3, "15.00", 1), ("Drinks", 6, "9.00", 1)])
+
+
+class ExportTests(SalesFixtures):
+    def test_dates_that_do_not_parse_are_rejected(self):
+        for params in ({"from": "yesterday"}, {"to": "03/01/2026"}, {"from": "2026-02-30"}):
+            response = self.client.get("/api/reports/exports/orders.csv", params)
+            self.assertEqual(response.status_code, 400, params)
+        self.assertEqual(self.client.get("/api/reports/exports/orders.csv", {"from": "2026-03-01"}).status_code, 200)
+
+    def test_command_rejects_dates_that_do_not_parse(self):
+        with self.assertRaisesMessage(CommandError, "--from must be a YYYY-MM-DD date"):
+            call_command("export_data", "orders", "--from", "yesterday")
+
+    def order_at(self, created_at, location=None, **fields):
+        order = Order.objects.create(location=location or self.location, **fields)
+        Order.objects.filter(pk=order.pk).update(created_at=created_at)
+        return order
+
+    def download(self, name, **params):
+        response = self.client.get(f"/api/reports/exports/{name}", params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_does_not_let_spreadsheets_run_user_text(self):
+        order = self.order_at(utc(2026, 3, 1, 6, 0), customer_name='=HYPERLINK("http://evil.example","Pay")',
+                              total=Decimal("12.50"))
+        Payment.objects.create(order=order, method="UPI", amount=Decimal("12.50"), reference="@SUM(A1:A9)")
+        Payment.objects.create(order=order, method="CASH", amount=Decimal("1.00"), reference="-2+3")
+
+        orders = list(csv.DictReader(StringIO(self.download("orders.csv"))))
+        self.assertEqual(orders[0]["customer_name"], '\'=HYPERLINK("http://evil.example","Pay")')
+        self.assertEqual(orders[0]["total"], "12.50")
+        payments = list(csv.DictReader(StringIO(self.download("payments.csv"))))
+        self.assertEqual([row["reference"] for row in payments], ["'@SUM(A1:A9)", "'-2+3"])
+        # JSONL is data, not a spreadsheet: values stay as stored.
+        line = json.loads(self.download("orders.jsonl"))
+        self.assertEqual(line["customer_name"], '=HYPERLINK("http://evil.example","Pay")')
+
+    def test_location_and_local_date_filters(self):
+        other = Location.objects.create(organization=self.location.organization, name="Patan", timezone="UTC")
+        # Kathmandu is UTC+05:45: the 2nd starts locally at 18:15 UTC on the 1st.
+        self.order_at(utc(2026, 3, 1, 18, 10))
+        first = self.order_at(utc(2026, 3, 1, 18, 20))
+        self.order_at(utc(2026, 3, 1, 18, 30), location=other)
+        last = self.order_at(utc(2026, 3, 2, 18, 10))
+        self.order_at(utc(2026, 3, 2, 18, 20))
+
+        rows = [json.loads(line) for line in self.download(
+            "orders.jsonl", location=self.location.pk, **{"from": "2026-03-02", "to": "2026-03-02"}).splitlines()]
+        self.assertEqual([row["id"] for row in rows], [first.pk, last.pk])
+        self.assertEqual({row["location"] for row in rows}, {self.location.pk})
+
+        DailySales.objects.create(location=self.location, date=date(2026, 3, 2), total_orders=2)
+        DailySales.objects.create(location=self.location, date=date(2026, 3, 3), total_orders=1)
+        days = list(csv.DictReader(StringIO(self.download("daily-sales.csv", **{"from": "2026-03-03"}))))
+        self.assertEqual([(row["date"], row["orders"]) for row in days], [("2026-03-03", "1")])
+
+    def test_header_is_sent_before_the_query_runs(self):
+        self.order_at(utc(2026, 3, 1, 6, 0))
+        chunks = exports.stream(exports.discover()["orders"], "csv")
+        with self.assertNumQueries(0):
+            header = next(chunks)
+        self.assertTrue(header.startswith(b"id,invoice_no,location,status"))
+        with self.assertNumQueries(1):
+            self.assertEqual(len(b"".join(chunks).splitlines()), 1)
+
+
+class DashboardTests(SalesFixtures):
+    def test_orders_by_status_counts_open_orders_of_any_day(self):
+        Order.objects.filter(pk=Order.objects.create(location=self.location).pk).update(created_at=utc(2026, 1, 1))
+        Order.objects.create(location=self.location)
+        Order.objects.create(location=self.location, status="FAILED")
+        Order.objects.create(location=self.location, status="CANCELLED")
+        self.refund(self.pay(utc(2026, 3, 1, 6, 0), [(self.tea, 1)]))
+        self.pay(utc(2026, 3, 1, 6, 0), [(self.tea, 1)])
+
+        response = self.client.get("/api/dashboard/summary/", {"location": self.location.pk})
+        self.assertEqual(response.json()["orders_by_status"], {"PENDING": 2, "FAILED": 1})
+
+    def seed(self, day, copies=1):
+        table = Table.objects.create(location=self.location, table_number=f"T{Table.objects.count() + 1}", capacity=4)
+        for n in range(copies):
+            self.pay(utc(2026, 3, 1, 4, n), [(self.momo, 2), (self.tea, 1)], tenders=[("CASH", "11.50")])
+            self.pay(utc(2026, 2, 28, 4, n), [(self.tea, 5)])  # the previous local day
+            for hour, status in ((13, "CONFIRMED"), (9, "CONFIRMED"), (20, "CANCELLED")):
+                Reservation.objects.create(location=self.location, table=table, customer_name=f"Guest {n}",
+                                           customer_phone="1", party_size=2, reservation_date=day,
+                                           reservation_time=time(hour, n), status=status, created_by=self.admin)
+            Reservation.objects.create(location=self.location, customer_name="Tomorrow", customer_phone="1",
+                                       party_size=6, reservation_date=day + timedelta(days=1),
+                                       reservation_time=time(12, n), created_by=self.admin)
+            InventoryItem.objects.bulk_create([
+                InventoryItem(location=self.location, name="Low", sku=f"low-{day}-{n}-{copies}",
+                              current_stock=1, minimum_stock=2),
+                InventoryItem(location=self.location, name="Fine", sku=f"fine-{day}-{n}-{copies}",
+                              current_stock=5, minimum_stock=2),
+            ])
+
+    def test_summary_payload_and_constant_query_count(self):
+        today = date(2026, 3, 1)
+        with mock.patch("django.utils.timezone.now", return_value=utc(2026, 3, 1, 6, 0)):  # 11:45 local
+            self.seed(today)
+            with self.assertNumQueries(6):
+                payload = dashboard.summary(self.location)
+            self.seed(today, copies=20)
+            with self.assertNumQueries(6):
+                grown = dashboard.summary(self.location)
+
+        self.assertEqual((payload["date"], payload["location"]), ("2026-03-01", self.location.pk))
+        self.assertEqual(payload["sales"]["total_orders"], 1)
+        self.assertEqual((payload["sales"]["total_sales"], payload["sales"]["cash_sales"]), ("11.50", "11.50"))
+        self.assertEqual(payload["reservations"]["upcoming"], 2)
+        self.assertEqual(payload["reservations"]["next"][0], {
+            "id": payload["reservations"]["next"][0]["id"], "customer_name": "Guest 0", "party_size": 2,
+            "date": "2026-03-01", "time": "13:00", "status": "CONFIRMED", "table": "T1",
+        })
+        self.assertEqual(payload["low_stock"], 1)
+        self.assertEqual([(row["name"], row["quantity"], row["revenue"], row["attach_rate"])
+                          for row in payload["top_items"]], [("Momo", 2, "10.00", 1.0), ("Tea", 1, "1.50", 1.0)])
+
+        self.assertEqual(grown["sales"]["total_orders"], 21)
+        self.assertEqual(grown["reservations"]["upcoming"], 42)
+        self.assertEqual(len(grown["reservations"]["next"]), dashboard.UPCOMING_LIMIT)
+        self.assertEqual(grown["low_stock"], 21)
+        self.assertEqual([(row["name"], row["quantity"]) for row in grown["top_items"]], [("Momo", 42), ("Tea", 21)])
+
+    def test_cold_key_waits_for_the_request_holding_the_lock(self):
+        key = f"dashboard:summary:{self.location.pk}"
+        cache.add(f"{key}:refresh", 1, 60)
+
+        def finish(seconds):
+            cache.set(key, (0, {"built": "elsewhere"}), 60)
+
+        with mock.patch.object(dashboard.clock, "sleep", side_effect=finish), \
+                mock.patch.object(dashboard, "summary") as build:
+            self.assertEqual(dashboard.cached_summary(self.location), {"built": "elsewhere"})
+        build.assert_not_called()
+
+    def test_cold_key_is_built_when_the_lock_holder_never_finishes(self):
+        cache.add(f"dashboard:summary:{self.location.pk}:refresh", 1, 60)
+        with mock.patch.object(dashboard, "COLD_WAIT_SECONDS", 0.1):
+            payload = dashboard.cached_summary(self.location)
+        self.assertEqual(payload["location"], self.location.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(dashboard.cached_summary(self.location), payload)
+
+
+class ShiftCloseTests(SalesFixtures):
+    def setUp(self):
+        super().setUp()
+        self.start = utc(2026, 3, 1, 3, 0)  # 08:45 local
+        self.shift = ShiftReport.objects.create(location=self.location, user=self.admin, shift_start=self.start,
+                                                shift_end=self.start, opening_cash=Decimal("100.00"))
+        self.url = f"/api/reports/shift-reports/{self.shift.pk}/close/"
+
+    def close(self, closing_cash="0.00", hours=9):
+        end = self.start + timedelta(hours=hours)
+        return self.client.post(self.url, {"closing_cash": closing_cash, "shift_end": end.isoformat()}, format="json")
+
+    def test_close_splits_tenders_within_the_window(self):
+        self.pay(self.start - timedelta(minutes=1), [(self.momo, 4)], tenders=[("CASH", "20.00")])
+        self.pay(self.start, [(self.momo, 2)], tenders=[("CASH", "6.00"), ("UPI", "4.00")], tip="1.00")
+        self.pay(self.start + timedelta(hours=1), [(self.tea, 2)], tenders=[("UPI", "3.00")])
+        self.pay(self.start + timedelta(hours=2), [(self.momo, 1)])
+        self.refund(self.pay(self.start + timedelta(hours=3), [(self.momo, 1)], tenders=[("CASH", "5.00")]))
+        self.pay(self.start + timedelta(hours=9), [(self.tea, 1)], tenders=[("CASH", "1.50")])
+
+        response = self.close(closing_cash="104.00")
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["total_orders"], 3)
+        self.assertEqual(
+            [body[name] for name in ("total_sales", "total_tips", "cash_sales", "upi_sales", "card_sales")],
+            ["19.00", "1.00", "6.00", "7.00", "6.00"],
+        )
+        self.assertEqual((body["expected_cash"], body["cash_difference"]), ("106.00", "-2.00"))
+        self.assertTrue(body["is_closed"])
+
+    def test_orders_paid_without_the_webhook_count(self):
+        # POS and admin paths only flip is_paid; Order.save stamps paid_at for them.
+        order = Order.objects.create(location=self.location, total=Decimal("5.00"))
+        order.is_paid, order.status = True, "PAID"
+        with mock.patch("django.utils.timezone.now", return_value=self.start + timedelta(hours=1)):
+            order.save(update_fields=["is_paid", "status"])
+            created = Order.objects.create(location=self.location, total=Decimal("2.00"), is_paid=True, status="PAID")
+        order.refresh_from_db()
+        self.assertEqual(order.paid_at, self.start + timedelta(hours=1))
+        self.assertEqual(created.paid_at, self.start + timedelta(hours=1))
+
+        body = self.close().json()
+        self.assertEqual((body["total_orders"], body["total_sales"]), (2, "7.00"))
+
+    def test_closed_shift_is_locked(self):
+        self.assertEqual(self.close().status_code, 200)
+        self.pay(self.start + timedelta(hours=1), [(self.momo, 1)], tenders=[("CASH", "5.00")])
+
+        self.assertEqual(self.close().status_code, 409)
+        response = self.client.patch(f"/api/reports/shift-reports/{self.shift.pk}/", {"notes": "late"}, format="json")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.delete(f"/api/reports/shift-reports/{self.shift.pk}/").status_code, 403)
+        self.shift.refresh_from_db()
+        self.assertEqual((self.shift.total_orders, self.shift.cash_sales, self.shift.notes), (0, Decimal("0.00"), ""))
+
+    def test_shift_end_must_follow_shift_start(self):
+        self.assertEqual(self.close(hours=0).status_code, 400)
+        self.shift.refresh_from_db()
+        self.assertFalse(self.shift.is_closed)
+
+    def test_z_report_sums_closed_shifts(self):
+        self.pay(self.start + timedelta(hours=1), [(self.momo, 2)], tenders=[("CASH", "10.00")])
+        self.close(closing_cash="110.00")
+        ShiftReport.objects.create(location=self.location, user=self.admin, shift_end=self.start,
+                                   shift_start=self.start + timedelta(hours=9))
+        response = self.client.get("/api/reports/shift-reports/z-report/",
+                                   {"location": self.location.pk, "date": "2026-03-01"})
+        self.assertEqual(response.json()["open_shifts"], 1)
+        self.assertEqual(response.json()["totals"]["cash_sales"], "10.00")
+        self.assertEqual(response.json()["totals"]["cash_difference"], "0.00")
+        self.assertEqual(len(response.json()["shifts"]), 2)
@@ -0,0 +1,75 @@
+"""
+Sales time series read from the rollup tables, never from orders.
+
+Each bucket reads the coarsest table that can answer it: `hour` groups
+HourlySales, `day` groups DailySales (24x fewer rows), and `week` folds those
+daily points into Monday-based weeks. When a range would produce more than
+TIMESERIES_MAX_POINTS points the bucket is widened (hour -> day -> week), so
+a chart never receives more points than it can draw.
+"""
+import math
+from datetime import timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import DailySales, HourlySales
+
+BUCKETS = ("hour", "day", "week")
+BUCKETS_PER_DAY = {"hour": 24, "day": 1, "week": 1 / 7}
+CENT = Decimal("0.01")
+
+
+def max_points():
+    return int(getattr(settings, "TIMESERIES_MAX_POINTS", 2000))
+
+
+def choose_bucket(requested, date_from, date_to):
+    """Finest bucket, no finer than `requested`, that keeps the series under max_points()."""
+    days = (date_to - date_from).days + 1
+    index = BUCKETS.index(requested) if requested in BUCKETS else 0
+    while index < len(BUCKETS) - 1 and math.ceil(days * BUCKETS_PER_DAY[BUCKETS[index]]) > max_points():
+        index += 1
+    return BUCKETS[index]
+
+
+def _grouped(model, key, locations, date_from, date_to):
+    rows = model.objects.filter(date__gte=date_from, date__lte=date_to)
+    if locations:
+        rows = rows.filter(location__in=locations)
+    return list(
+        rows.values(key)
+        .annotate(orders=Sum("total_orders"), revenue=Sum("total_sales"), items=Sum("items_sold"))
+        .order_by(key)
+        .values_list(key, "orders", "revenue", "items")
+    )
+
+
+def series(locations, date_from, date_to, bucket):
+    """[(bucket start, orders, revenue, items sold)] for local dates [date_from, date_to]; empty buckets are omitted."""
+    if bucket == "hour":
+        return _grouped(HourlySales, "hour", locations, date_from, date_to)
+    days = _grouped(DailySales, "date", locations, date_from, date_to)
+    return days if bucket == "day" else fold_weeks(days)
+
+
+def fold_weeks(days):
+    """Sum date-ordered (date, *values) points into (monday, *totals) points."""
+    weeks = {}
+    for day, *values in days:
+        monday = day - timedelta(days=day.weekday())
+        total = weeks.get(monday)
+        weeks[monday] = values if total is None else [a + b for a, b in zip(total, values)]
+    return [(monday, *total) for monday, total in weeks.items()]
+
+
+def as_json(points, bucket, tz=None):
+    """Chart-ready dicts; hourly points are shown in `tz` (one location) or UTC."""
+    out = []
+    for t, orders, revenue, items in points:
+        if bucket == "hour":
+            t = timezone.localtime(t, tz) if tz else t.astimezone(dt_timezone.utc)
+        out.append({"t": t.isoformat(), "orders": orders, "revenue": str(revenue.quantize(CENT)), "items": items})
+    return out
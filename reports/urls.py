@@ -1,9 +1,21 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import DailySalesViewSet, ShiftReportViewSet
+from .views import (
+    CategorySalesView, DailySalesViewSet, DashboardSummaryView, ExportView, InventoryUsageView, ItemTrendView,
+    ShiftReportViewSet, TimeseriesView, TopItemsView,
+)
 app_name = "reports"
 
 router = DefaultRouter()
 router.register('reports/daily-sales', DailySalesViewSet)
 router.register('reports/shift-reports', ShiftReportViewSet)
 
-urlpatterns = router.urls
\ No newline at end of file
+urlpatterns = [
+    path('dashboard/summary/', DashboardSummaryView.as_view(), name='dashboard-summary'),
+    path('reports/timeseries/', TimeseriesView.as_view(), name='reports-timeseries'),
+    path('reports/items/top/', TopItemsView.as_view(), name='reports-items-top'),
+    path('reports/items/categories/', CategorySalesView.as_view(), name='reports-items-categories'),
+    path('reports/items/<int:menu_item_id>/trend/', ItemTrendView.as_view(), name='reports-items-trend'),
+    path('reports/inventory/usage/', InventoryUsageView.as_view(), name='reports-inventory-usage'),
+    path('reports/exports/<slug:name>.<slug:fmt>', ExportView.as_view(), name='reports-export'),
+] + router.urls
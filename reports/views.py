@@ -1,16 +1,243 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ParseError, PermissionDenied
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
 from django_filters.rest_framework import DjangoFilterBackend
+
+from core import exports
+from core.models import Location
+from core.params import date_param, date_range, location_param
+from . import dashboard, inventory_usage, item_sales, shifts, timeseries
 from .models import DailySales, ShiftReport
-from .serializers import DailySalesSerializer, ShiftReportSerializer
+from .serializers import DailySalesSerializer, ShiftCloseSerializer, ShiftReportSerializer
+
+MAX_TOP_ITEMS = 100
 
 class DailySalesViewSet(viewsets.ReadOnlyModelViewSet):
+    """Precomputed by reports.rollup; never aggregates orders at read time."""
     queryset = DailySales.objects.select_related('location').all()
     serializer_class = DailySalesSerializer
+    permission_classes = [permissions.IsAdminUser]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['location', 'date']
+    filterset_fields = {'location': ['exact'], 'date': ['exact', 'gte', 'lte']}
+    keyset_ordering = ('-date', '-id')  # rows are replaced on reconcile, so created_at is not stable
 
 class ShiftReportViewSet(viewsets.ModelViewSet):
     queryset = ShiftReport.objects.select_related('location', 'user').all()
     serializer_class = ShiftReportSerializer
+    permission_classes = [permissions.IsAdminUser]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['location', 'user', 'is_closed']
\ No newline at end of file
+    filterset_fields = ['location', 'user', 'is_closed']
+
+    def perform_update(self, serializer):
+        if serializer.instance.is_closed:
+            raise PermissionDenied("Closed shift reports are read-only.")
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        if instance.is_closed:
+            raise PermissionDenied("Closed shift reports are read-only.")
+        instance.delete()
+
+    @action(detail=True, methods=['post'])
+    def close(self, request, pk=None):
+        """
+        Compute totals and the tender breakdown for the shift window, then lock the report.
+        Body: {"closing_cash": "1234.50", "shift_end": optional ISO datetime (default now), "notes": optional}
+        """
+        report = self.get_object()
+        params = ShiftCloseSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        shift_end = params.validated_data.get('shift_end')
+        if shift_end is not None and shift_end <= report.shift_start:
+            raise ParseError("shift_end must be after shift_start.")
+        try:
+            report = shifts.close_shift(report, params.validated_data['closing_cash'], shift_end,
+                                        params.validated_data.get('notes'))
+        except shifts.ShiftClosed:
+            return Response({"detail": "Shift report is already closed."}, status=409)
+        return Response(self.get_serializer(report).data)
+
+    @action(detail=False, methods=['get'], url_path='z-report')
+    def z_report(self, request):
+        """
+        End-of-day report: every shift that started on a local date at a location.
+        GET /api/reports/shift-reports/z-report/?location=<id>&date=YYYY-MM-DD (default today)
+        """
+        location = location_param(request.query_params, required=True)
+        today = timezone.localtime(timezone.now(), location.tzinfo).date()
+        report = shifts.z_report(location, date_param(request.query_params, 'date', today))
+        return Response({
+            "location": location.pk,
+            "date": report["day"],
+            "open_shifts": report["open_shifts"],
+            "totals": {
+                name: value if name == 'total_orders' else str(value.quantize(timeseries.CENT))
+                for name, value in report["totals"].items()
+            },
+            "daily_sales": DailySalesSerializer(report["daily"]).data if report["daily"] else None,
+            "shifts": self.get_serializer(report["shifts"], many=True).data,
+        })
+
+
+def report_range(request):
+    """(locations, date_from, date_to) from ?location=1,2&from=YYYY-MM-DD&to=YYYY-MM-DD; default: last 30 days."""
+    params = request.query_params
+    ids = [part for value in params.getlist('location') for part in value.split(',') if part]
+    if not all(part.isdigit() for part in ids):
+        raise ParseError("location must be a comma-separated list of ids.")
+    locations = list(Location.objects.filter(pk__in=ids)) if ids else []
+    if len(locations) != len(set(ids)):
+        raise ParseError("Unknown location.")
+    date_from, date_to = date_range(params, days=30)
+    return locations, date_from, date_to
+
+
+class TimeseriesView(APIView):
+    """
+    Admin: orders, revenue and items sold per bucket, from HourlySales/DailySales.
+    GET /api/reports/timeseries/?location=1,2&from=YYYY-MM-DD&to=YYYY-MM-DD&bucket=hour|day|week
+    Dates are local to each location (default: the last 30 days); without `location` all
+    locations are summed. The bucket is widened when the range would exceed TIMESERIES_MAX_POINTS.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        locations, date_from, date_to = report_range(request)
+        bucket = request.query_params.get('bucket', 'auto')
+        if bucket != 'auto' and bucket not in timeseries.BUCKETS:
+            raise ParseError("bucket must be hour, day, week or auto.")
+
+        bucket = timeseries.choose_bucket(bucket, date_from, date_to)
+        points = timeseries.series(locations, date_from, date_to, bucket)
+        tz = locations[0].tzinfo if len(locations) == 1 else None
+        return Response({
+            "bucket": bucket,
+            "from": date_from,
+            "to": date_to,
+            "locations": [location.pk for location in locations],
+            "points": timeseries.as_json(points, bucket, tz),
+        })
+
+
+class TopItemsView(APIView):
+    """
+    Admin: best sellers from ItemSalesDaily.
+    GET /api/reports/items/top/?location=&from=&to=&limit=10&by=quantity|revenue|orders
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        locations, date_from, date_to = report_range(request)
+        by = request.query_params.get('by', 'quantity')
+        limit = request.query_params.get('limit', '10')
+        if by not in item_sales.RANKINGS:
+            raise ParseError("by must be quantity, revenue or orders.")
+        if not limit.isdigit() or not 1 <= int(limit) <= MAX_TOP_ITEMS:
+            raise ParseError(f"limit must be between 1 and {MAX_TOP_ITEMS}.")
+        return Response({
+            "from": date_from,
+            "to": date_to,
+            "by": by,
+            "total_orders": item_sales.total_orders(locations, date_from, date_to),
+            "items": item_sales.top_items(locations, date_from, date_to, int(limit), by),
+        })
+
+
+class ItemTrendView(APIView):
+    """
+    Admin: one item's daily or weekly sales from ItemSalesDaily.
+    GET /api/reports/items/<menu_item_id>/trend/?location=&from=&to=&bucket=day|week
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, menu_item_id):
+        locations, date_from, date_to = report_range(request)
+        bucket = request.query_params.get('bucket', 'day')
+        if bucket not in ('day', 'week'):
+            raise ParseError("bucket must be day or week.")
+        points = item_sales.item_trend(menu_item_id, locations, date_from, date_to, bucket)
+        return Response({
+            "menu_item": menu_item_id,
+            "bucket": bucket,
+            "from": date_from,
+            "to": date_to,
+            "points": [
+                {"t": t.isoformat(), "quantity": quantity, "revenue": str(revenue.quantize(timeseries.CENT)), "orders": orders}
+                for t, quantity, revenue, orders in points
+            ],
+        })
+
+
+class CategorySalesView(APIView):
+    """
+    Admin: quantity and revenue per menu category from ItemSalesDaily.
+    GET /api/reports/items/categories/?location=&from=&to=
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        locations, date_from, date_to = report_range(request)
+        return Response({
+            "from": date_from,
+            "to": date_to,
+            "categories": item_sales.category_breakdown(locations, date_from, date_to),
+        })
+
+
+class InventoryUsageView(APIView):
+    """
+    Admin: theoretical (recipe) vs actual (recipe + count shortfall) usage per inventory item.
+    GET /api/reports/inventory/usage/?location=&from=&to=
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        locations, date_from, date_to = report_range(request)
+        return Response({
+            "from": date_from,
+            "to": date_to,
+            "items": inventory_usage.usage_report(locations, date_from, date_to),
+        })
+
+
+class ExportView(APIView):
+    """
+    Admin: stream a dataset (see core.exports) as CSV or JSONL.
+    GET /api/reports/exports/<orders|payments|daily-sales>.<csv|jsonl>?location=<id>&from=YYYY-MM-DD&to=YYYY-MM-DD
+    All filters are optional; dates are local to the location (or TIME_ZONE without one).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, name, fmt):
+        export = exports.discover().get(name)
+        if export is None or fmt not in exports.FORMATS:
+            raise NotFound("Unknown export.")
+        location = location_param(request.query_params)
+        date_from, date_to = date_range(request.query_params)
+
+        response = StreamingHttpResponse(
+            exports.stream(export, fmt, location, date_from, date_to), content_type=exports.FORMATS[fmt],
+        )
+        parts = [name] + ([str(location.pk)] if location else []) + [f"{d:%Y%m%d}" for d in (date_from, date_to) if d]
+        response["Content-Disposition"] = content_disposition_header(True, f"{'-'.join(parts)}.{fmt}")
+        return response
+
+
+class DashboardSummaryView(APIView):
+    """
+    Admin: everything the dashboard shows, in one request.
+    GET /api/dashboard/summary/?location=<id>   (omit location for all locations)
+    Micro-cached per location for DASHBOARD_CACHE_SECONDS.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        location = location_param(request.query_params)
+        response = Response(dashboard.cached_summary(location))
+        response['Cache-Control'] = f"private, max-age={dashboard.ttl()}"
+        return response
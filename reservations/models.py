@@ -41,5 +41,10 @@ class Reservation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='reservation_created_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.customer_name} - {self.reservation_date} {self.reservation_time}"
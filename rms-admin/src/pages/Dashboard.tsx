@@ -1,8 +1,84 @@
+import { useQuery } from '@tanstack/react-query'
+import api from '../lib/api'
+import type { DashboardSummary } from '../types/dashboard'
+
+// One request for the whole page; the server micro-caches it, so polling from many tabs stays cheap.
+const REFRESH_MS = 15000
+
+function Stat({ label, value }: { label: string; value: string | number }) {
+return (
+<div className="border rounded-md p-3">
+<div className="text-xs text-gray-600">{label}</div>
+<div className="text-lg font-semibold">{value}</div>
+</div>
+)
+}
+
 export default function Dashboard() {
+const summary = useQuery({
+queryKey: ['dashboard', 'summary'],
+queryFn: async () => (await api.get<DashboardSummary>('/dashboard/summary/')).data,
+refetchInterval: REFRESH_MS,
+})
+
+const data = summary.data
+
 return (
-<div className="space-y-4">
+<div className="space-y-6">
 <h2 className="text-lg font-semibold">Dashboard</h2>
-<p className="text-sm text-gray-600">Welcome to the RMS admin.</p>
+
+{summary.isLoading ? (
+<p>Loading…</p>
+) : summary.isError || !data ? (
+<p className="text-sm text-red-600">Could not load the dashboard.</p>
+) : (
+<>
+<section className="grid grid-cols-2 md:grid-cols-4 gap-3">
+<Stat label="Sales today" value={`Rs. ${data.sales.total_sales}`} />
+<Stat label="Paid orders" value={data.sales.total_orders} />
+<Stat label="Upcoming reservations" value={data.reservations.upcoming} />
+<Stat label="Low-stock items" value={data.low_stock} />
+</section>
+
+<section>
+<h3 className="font-medium mb-2">Open orders by status</h3>
+<ul className="flex flex-wrap gap-2 text-sm">
+{Object.entries(data.orders_by_status).map(([status, count]) => (
+<li key={status} className="border rounded-md px-2 py-1">
+{status}: <span className="font-medium">{count}</span>
+</li>
+))}
+</ul>
+</section>
+
+<section>
+<h3 className="font-medium mb-2">Top items today</h3>
+<ul className="divide-y border rounded-md">
+{data.top_items.map((item) => (
+<li key={item.menu_item} className="p-3 flex items-center justify-between">
+<div>
+<div className="font-medium">{item.name}</div>
+<div className="text-xs text-gray-600">{item.category}</div>
+</div>
+<div className="text-sm">{item.quantity} sold · Rs. {item.revenue}</div>
+</li>
+))}
+</ul>
+</section>
+
+<section>
+<h3 className="font-medium mb-2">Next reservations</h3>
+<ul className="divide-y border rounded-md">
+{data.reservations.next.map((r) => (
+<li key={r.id} className="p-3 flex items-center justify-between text-sm">
+<span>{r.date} {r.time} · {r.customer_name} ({r.party_size})</span>
+<span className="text-gray-600">{r.table ? `Table ${r.table}` : r.status}</span>
+</li>
+))}
+</ul>
+</section>
+</>
+)}
 </div>
 )
-}
\ No newline at end of file
+}
@@ -0,0 +1,44 @@
+import type { ID } from './common'
+
+export interface DashboardSales {
+  total_orders: number
+  total_sales: string
+  total_tax: string
+  total_discount: string
+  total_tips: string
+  cash_sales: string
+  card_sales: string
+  upi_sales: string
+  items_sold: number
+}
+
+export interface DashboardReservation {
+  id: ID
+  customer_name: string
+  party_size: number
+  date: string
+  time: string
+  status: string
+  table: string | null
+}
+
+export interface DashboardTopItem {
+  menu_item: ID
+  name: string
+  category: string
+  quantity: number
+  revenue: string
+  orders: number
+  attach_rate: number | null
+}
+
+export interface DashboardSummary {
+  location: ID | null
+  date: string
+  generated_at: string
+  sales: DashboardSales
+  orders_by_status: Record<string, number>
+  reservations: { upcoming: number; next: DashboardReservation[] }
+  low_stock: number
+  top_items: DashboardTopItem[]
+}
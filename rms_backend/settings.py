@@ -1,8 +1,10 @@
 # rms_backend/settings.py
 import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
+from corsheaders.defaults import default_headers
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -132,9 +134,69 @@ else:
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
+            # On-disk test DB so forked multi-process tests (billing.tests) share it. It lives in the temp
+            # dir, named per test run, so an interrupted run leaves no file in the repo and no
+            # "delete the old test database?" prompt for the next one.
+            "TEST": {"NAME": os.path.join(tempfile.gettempdir(), f"rms_test_{os.getpid()}.sqlite3")},
         }
     }
 
+# ---------------------------------------------------------------------
+# Cache
+#   - Local memory for dev (per process)
+#   - REDIS_URL for a cache shared by all workers in prod
+# ---------------------------------------------------------------------
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Cart store (orders/cart.py): carts live in the cache above, not the session
+CART_TTL = int(os.getenv("CART_TTL", str(7 * 24 * 3600)))  # seconds since the last change
+CART_COOKIE_NAME = os.getenv("CART_COOKIE_NAME", "cart_id")
+# Copy changed carts to the orders.Cart table (debounced Celery task) so they survive a cache flush
+CART_WRITE_BEHIND = os.getenv("CART_WRITE_BEHIND", "0") == "1"
+CART_WRITE_BEHIND_DELAY = int(os.getenv("CART_WRITE_BEHIND_DELAY", "30"))
+
+# Idempotency-Key replay store (core/idempotency.py); needs a shared cache (REDIS_URL) with several workers
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", str(24 * 3600)))
+IDEMPOTENCY_WAIT = int(os.getenv("IDEMPOTENCY_WAIT", "10"))  # max seconds a duplicate waits for the first
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", "60"))
+
+# Invoice numbers (billing/numbering.py): >1 reserves that many numbers per worker at a time (hi-lo);
+# locations whose InvoiceSequence.gapless is set always get strictly consecutive numbers
+INVOICE_NUMBER_BLOCK_SIZE = int(os.getenv("INVOICE_NUMBER_BLOCK_SIZE", "1"))
+
+# ---------------------------------------------------------------------
+# Channels (order event stream, orders/consumers.py)
+#   - In-memory layer for a single process (dev / tests)
+#   - REDIS_URL for a layer shared by all ASGI workers (needs channels-redis)
+# ---------------------------------------------------------------------
+if os.getenv("REDIS_URL"):
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {"hosts": [os.environ["REDIS_URL"]]},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
+        }
+    }
+# Events for one location arriving within this window go out as one WebSocket frame
+ORDER_EVENTS_COALESCE_MS = int(os.getenv("ORDER_EVENTS_COALESCE_MS", "250"))
+
 # ---------------------------------------------------------------------
 # DRF + JWT
 # ---------------------------------------------------------------------
@@ -160,7 +222,11 @@ REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend"
     ],
+    # Keyset pagination on (created_at, id); no OFFSET, deep pages stay cheap
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.KeysetPagination",
+    "PAGE_SIZE": int(os.getenv("API_PAGE_SIZE", "50")),
 }
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "500"))
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
@@ -185,11 +251,15 @@ WHITENOISE_USE_FINDERS = True
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Scheme and host for image URLs in cached menu snapshots (e.g. "https://api.example.com"); they are
+# shared by all clients, so the host cannot come from the request. Empty: image URLs stay relative.
+MEDIA_BASE_URL = os.getenv("MEDIA_BASE_URL", "")
 
 # ---------------------------------------------------------------------
 # CORS (tighten in production)
 # ---------------------------------------------------------------------
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
 # If you need credentials/cookies:
 # CORS_ALLOW_CREDENTIALS = True
 
@@ -225,3 +295,54 @@ STRIPE_PUBLIC_KEY = os.getenv("STRIPE_PUBLIC_KEY", "")
 STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY", "")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET", "")
 STRIPE_CURRENCY = os.getenv("STRIPE_CURRENCY", "npr")  # Stripe expects lowercase codes
+# "stripe" = real API; "fake" = in-process stand-in (payments/fake_stripe.py) for offline load tests
+STRIPE_BACKEND = os.getenv("STRIPE_BACKEND", "stripe")
+STRIPE_FAKE_LATENCY_MS = int(os.getenv("STRIPE_FAKE_LATENCY_MS", "0"))
+# Base URL used for Stripe success/cancel redirects
+DOMAIN = os.getenv("DOMAIN", "http://127.0.0.1:8000")
+
+# Checkout session creation:
+#   - "sync":  inside the order POST (simple, holds the worker for the Stripe round trip)
+#   - "async": order POST returns a pending token; a Celery task creates the session
+CHECKOUT_MODE = os.getenv("CHECKOUT_MODE", "sync")
+CHECKOUT_POLL_TIMEOUT = int(os.getenv("CHECKOUT_POLL_TIMEOUT", "20"))  # max long-poll seconds
+
+# ---------------------------------------------------------------------
+# Celery
+# ---------------------------------------------------------------------
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+CELERY_TASK_ALWAYS_EAGER = os.getenv("CELERY_TASK_ALWAYS_EAGER", "0") == "1"
+CELERY_TASK_IGNORE_RESULT = True
+# PDF rendering gets its own workers: celery -A rms_backend worker -Q pdf
+CELERY_TASK_ROUTES = {"core.tasks.render_pdf_task": {"queue": "pdf"}}
+
+# ---------------------------------------------------------------------
+# PDF rendering (core/pdf.py)
+#   - "process": a bounded pool of worker processes per web process (default)
+#   - "inline":  render in the calling process (tests, single-core hosts)
+# Every web worker gets its own pool, so keep PDF_RENDER_WORKERS small: total processes = web workers x this.
+# Big batches belong on the Celery "pdf" queue, not in a request.
+# ---------------------------------------------------------------------
+PDF_RENDER_BACKEND = os.getenv("PDF_RENDER_BACKEND", "process")
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+PDF_RENDER_MAX_PENDING = int(os.getenv("PDF_RENDER_MAX_PENDING", "16"))
+
+# Invoice/receipt downloads (core/downloads.py): "nginx" = X-Accel-Redirect, "sendfile" = X-Sendfile,
+# empty = stream through Django. The files live in PROTECTED_MEDIA_ROOT, which must not be under MEDIA_ROOT;
+# nginx needs: location /protected-media/ { internal; alias <PROTECTED_MEDIA_ROOT>/; }
+PROTECTED_MEDIA_ROOT = os.getenv("PROTECTED_MEDIA_ROOT", str(BASE_DIR / "protected_media"))
+PROTECTED_MEDIA_SERVER = os.getenv("PROTECTED_MEDIA_SERVER", "")
+PROTECTED_MEDIA_PREFIX = os.getenv("PROTECTED_MEDIA_PREFIX", "/protected-media/")
+DOWNLOAD_LINK_MAX_AGE = int(os.getenv("DOWNLOAD_LINK_MAX_AGE", "600"))  # seconds a signed link stays valid
+
+# ---------------------------------------------------------------------
+# Reports
+# ---------------------------------------------------------------------
+TIMESERIES_MAX_POINTS = int(os.getenv("TIMESERIES_MAX_POINTS", "2000"))  # wider buckets beyond this
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))  # rows per fetch for streaming exports
+DASHBOARD_CACHE_SECONDS = int(os.getenv("DASHBOARD_CACHE_SECONDS", "5"))  # /api/dashboard/summary/ micro-cache
+
+# ---------------------------------------------------------------------
+# Inventory
+# ---------------------------------------------------------------------
+STOCK_MOVEMENT_RETENTION_DAYS = int(os.getenv("STOCK_MOVEMENT_RETENTION_DAYS", "90"))  # compact_stock_movements default
@@ -12,6 +12,8 @@ urlpatterns = [
     path("api/", include(("orders.urls", "orders"), namespace="orders")),
     path("api/payments/", include(("payments.urls", "payments_api"), namespace="payments_api")),
     path("api/", include(("promotions.urls", "promotions"), namespace="promotions")),
+    path("api/", include(("reports.urls", "reports"), namespace="reports")),
+    path("api/", include(("inventory.urls", "inventory"), namespace="inventory")),
 
     # Public payments pages (success/cancel) + storefront
     path("", include(("payments.urls", "payments"), namespace="payments")),
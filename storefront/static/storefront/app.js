@@ -305,6 +305,17 @@ async function loadServerCartAndAdopt(){
 }
 
 // === Checkout (require login) ===
+// Async checkout mode: the order POST returns a poll_url; long-poll it for the Stripe URL.
+async function waitForCheckoutUrl(pollUrl){
+  for (let attempt = 0; attempt < 6; attempt++){
+    const res = await fetch(pollUrl + (pollUrl.includes("?") ? "&" : "?") + "wait=20");
+    const data = await res.json().catch(()=>({}));
+    if (data.status === "ready" && data.checkout_url) return data.checkout_url;
+    if (data.status === "failed" || res.status === 404) throw {data:{detail:"Could not start payment."}};
+  }
+  throw {data:{detail:"Payment is taking too long, please retry."}};
+}
+
 async function placeOrder(evt){
   evt.preventDefault();
 
@@ -347,12 +358,21 @@ async function placeOrder(evt){
   const statusEl = document.getElementById("order-status");
   const payBtn = document.getElementById("pay-now");
 
+  // Same cart + details => same key, so a retried or double-submitted checkout returns the first order.
+  const body = JSON.stringify(payload);
+  let idem = JSON.parse(sessionStorage.getItem("checkout-idem") || "{}");
+  if (idem.body !== body) {
+    idem = { body, key: (crypto.randomUUID ? crypto.randomUUID() : String(Date.now()) + Math.random()) };
+    sessionStorage.setItem("checkout-idem", JSON.stringify(idem));
+  }
+
   try {
-    const order = await api("/api/orders/", { method:"POST", body:JSON.stringify(payload) });
-    // Redirect to Stripe Checkout (server route creates Session)
-    window.location.href = `/create-checkout-session/${order.id}/`;
+    const order = await api("/api/orders/", { method:"POST", body, headers:{ "Idempotency-Key": idem.key } });
     statusEl.textContent = "Redirecting to secure payment…";
     payBtn.style.display="none";
+    // Redirect to Stripe Checkout (session created inline, or queued when checkout is async)
+    const url = order.checkout_url || (order.poll_url ? await waitForCheckoutUrl(order.poll_url) : null);
+    window.location.href = url || `/create-checkout-session/${order.order_id}/`;
   } catch(e) {
     const err = (e && e.data && (e.data.detail || JSON.stringify(e.data))) || (e && e.message) || "Unknown";
     statusEl.textContent = "Order error: " + err;